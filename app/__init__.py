@@ -5,13 +5,21 @@ from datetime import date
 from flask import Flask, request
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
-from flasgger import Swagger
+from sqlalchemy.exc import IntegrityError
 
 from app.models import db, set_up_data
-from app.docs import swagger_template, swagger_config
+from app.docs import init_swagger
 from app.json import CustomJSONProvider
+from app.helpers.pagination import NEXT_CURSOR_HEADER
+from app.helpers.auth import TokenCache
+from app.helpers.passwords import PasswordHasher
+from app.helpers.oauth import CachedRequest
+from app.helpers.calendar_cache import CalendarCache
+from app.helpers.integrity import integrity_error_handler
+from app.middlewares.queries import init_query_stats, SERVER_TIMING_HEADER
+from app.middlewares.metrics import init_metrics
 
-from .config import app_configs, TestingConfig
+from .config import app_configs
 from .exceptions import resource_not_found, internal_server_error, \
     APIException, api_exception_handler, ValidationException, validation_exception_handler, \
     AuthenticationException, authentication_exception_handler, \
@@ -24,20 +32,40 @@ def create_app(app_config=app_configs[os.environ.get("APP_CONFIG")
     Instancing flask app
     """
     app = Flask(__name__)
-    CORS(app, origins=app_config.CORS_ORIGINS, supports_credentials=True)
+    CORS(app,
+         origins=app_config.CORS_ORIGINS,
+         supports_credentials=True,
+         expose_headers=[NEXT_CURSOR_HEADER, SERVER_TIMING_HEADER, "ETag"])
     app.config.from_object(app_config)
 
-    Swagger(app, template=swagger_template, config=swagger_config)
+    if app.config["SWAGGER_ENABLED"]:
+        init_swagger(app)
 
     app.json = CustomJSONProvider(app)
+    app.extensions["token_cache"] = TokenCache(app.config["JWT_CACHE_SIZE"],
+                                               app.config["JWT_CACHE_TTL"])
+    app.extensions["password_hasher"] = PasswordHasher.from_config(app.config)
+    app.extensions["google_request"] = CachedRequest()
+    app.extensions["calendar_cache"] = CalendarCache.from_config(app.config)
 
     db.init_app(app)
     with app.app_context():
-        db.create_all()
-        if app_config != TestingConfig:
+        if app.config["QUERY_STATS_ENABLED"]:
+            init_query_stats(app, db.engines.values())
+        if app.config["METRICS_ENABLED"]:
+            init_metrics(app, db.engines.values())
+
+        if app.config["DB_SETUP_ON_STARTUP"]:
+            db.create_all(bind_key=None)
             set_up_data(db)
 
     from app.routes import bp_api, bp_auth
+    from app.commands import db_cli, occupancy_cli, search_cli, seed_command
+
+    app.cli.add_command(db_cli)
+    app.cli.add_command(occupancy_cli)
+    app.cli.add_command(search_cli)
+    app.cli.add_command(seed_command)
 
     app.register_blueprint(bp_api)
     app.register_blueprint(bp_auth)
@@ -46,6 +74,7 @@ def create_app(app_config=app_configs[os.environ.get("APP_CONFIG")
     app.register_error_handler(APIException, api_exception_handler)
     app.register_error_handler(ValidationException,
                                validation_exception_handler)
+    app.register_error_handler(IntegrityError, integrity_error_handler)
     app.register_error_handler(AuthenticationException,
                                authentication_exception_handler)
     app.register_error_handler(AuthorizationException,
@@ -0,0 +1,259 @@
+"""
+ASGI entry of api, heavy read endpoints are served with an async session while
+any other request falls back to the flask app. Async endpoints go through the
+request pipeline of flask app, so auth, CORS, errors, metrics, query stats,
+calendar cache and etags are the ones of flask routes
+
+    uvicorn --factory app.asgi:create_asgi_app --workers 4
+"""
+import os
+from urllib.parse import parse_qsl
+
+from asgiref.wsgi import WsgiToAsgi
+from flask import Response, current_app, jsonify, request, request_started
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from werkzeug.test import EnvironBuilder
+
+from . import create_app
+from .config import app_configs
+from .helpers.calendar import search_free_days, run_search_async
+from .helpers.etag import versioned, joined_rows_etag, unversioned, etag_headers
+from .helpers.pagination import cursor_headers
+from .helpers.streaming import NDJSON_MIMETYPE
+from .middlewares import authenticate
+from .middlewares.queries import track_queries
+from .utils import useless_params
+from .validations import validate_payload
+from .routes import appointment, calendar, professional
+
+ASYNC_DRIVERS = {"mysql": "mysql+asyncmy", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_database_uri(uri: str) -> str:
+    """
+    Uri of database with driver of asyncio, uri of other databases is kept
+    """
+    url = make_url(uri)
+    drivername = ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+# Handlers #
+
+
+async def get_free_days(session: AsyncSession, params: dict):
+    """
+    Async version of GET /api/calendar/free/days
+    """
+    validate_payload(params, calendar.validators)
+
+    async def execute(stmt):
+        return (await session.execute(stmt)).all()
+
+    return jsonify(await run_search_async(
+        search_free_days(params.get("clinic_id"), params.get("specialty_id"),
+                         params.get("start_date"),
+                         params.get("num_days") or 10,
+                         params.get("first_day_startime") or 0),
+        execute)), 200
+
+
+async def get_available_schedules(session: AsyncSession, params: dict):
+    """
+    Async version of GET /api/calendar/available/schedules
+    """
+    validate_payload(params, calendar.validators, ["specialty_id", "day"])
+
+    clinic_id = params.get("clinic_id")
+    specialty_id = params.get("specialty_id")
+    day = params.get("day")
+
+    cache = current_app.extensions["calendar_cache"]
+    key, content = cache.get("schedules", clinic_id, specialty_id, day)
+    if content is not None:
+        return Response(content, mimetype="application/json"), 200
+
+    stmt = calendar.available_schedules_statement(clinic_id, specialty_id, day)
+
+    response = jsonify(
+        [sc._asdict() for sc in (await session.execute(stmt)).all()])
+    cache.set(key, response.get_data())
+
+    return response, 200
+
+
+async def get_appointments(session: AsyncSession, params: dict):
+    """
+    Async version of GET /api/appointments
+    """
+    useless_params(params.keys(), appointment.PARAMETERS_FOR_GET_APPOINTMENT)
+    validate_payload(params, appointment.get_validators)
+
+    models = appointment.VERSIONED_MODELS
+    rows = (await session.execute(
+        versioned(appointment.appointments_statement(params), *models))).all()
+    return jsonify([unversioned(p) for p in rows]), 200, cursor_headers(
+        appointment.appointments_keyset, rows, params) | etag_headers(
+            joined_rows_etag(rows, len(models)))
+
+
+async def get_professionals(session: AsyncSession, params: dict):
+    """
+    Async version of GET /api/professionals
+    """
+    useless_params(params.keys(), professional.PARAMETERS_FOR_GET_PROFESSIONAL)
+
+    rows = (await session.execute(
+        professional.professionals_statement(params))).scalars().all()
+    actuations = (await session.execute(
+        versioned(professional.actuations_statement([p.id for p in rows]),
+                  *professional.ACTUATIONS_MODELS))).all()
+    return jsonify(professional.with_actuations(
+        rows, actuations)), 200, cursor_headers(
+            professional.professionals_keyset, rows, params) | etag_headers(
+                professional.loaded_professionals_etag(rows, actuations))
+
+
+ASYNC_ROUTES = {
+    "/api/calendar/free/days": get_free_days,
+    "/api/calendar/available/schedules": get_available_schedules,
+    "/api/appointments": get_appointments,
+    "/api/professionals": get_professionals
+}
+
+# END Handlers #
+
+
+class AsyncAPI:
+
+    def __init__(self, app, engine=None):
+        """
+        ASGI application serving ASYNC_ROUTES with async sessions and
+        delegating other requests to app
+            parameters:
+                app (Flask): application
+                engine (AsyncEngine): engine of async sessions, created from
+                    app config whether not given
+        """
+        self.app = app
+        self.wsgi = WsgiToAsgi(app)
+        self.engine = engine or self._create_engine()
+        self.sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+        if app.config["QUERY_STATS_ENABLED"]:
+            track_queries(self.engine.sync_engine)
+
+    def _create_engine(self):
+        config = self.app.config
+        uri = config.get("ASYNC_DATABASE_URI")
+        options = config.get("SQLALCHEMY_ENGINE_OPTIONS") or {}
+
+        if not uri:
+            # handlers only read, so they go to replica whether configured
+            replica = (config.get("SQLALCHEMY_BINDS") or {}).get("replica")
+            if isinstance(replica, dict):
+                replica, options = replica["url"], {
+                    k: v for k, v in replica.items() if k != "url"
+                }
+            uri = async_database_uri(replica or
+                                     config["SQLALCHEMY_DATABASE_URI"])
+
+        if "pool_size" in options:
+            # aiosqlite does not pool connections by default
+            options = {"poolclass": AsyncAdaptedQueuePool, **options}
+        return create_async_engine(uri, **options)
+
+    def _is_async(self, scope) -> bool:
+        if scope["type"] != "http" or scope["method"] != "GET" or scope[
+                "path"] not in ASYNC_ROUTES:
+            return False
+
+        # ndjson streams and conditional requests are only served by flask
+        params = dict(parse_qsl(scope["query_string"].decode("latin-1")))
+        headers = dict(scope["headers"])
+        return ("stream" not in params and NDJSON_MIMETYPE.encode()
+                not in headers.get(b"accept", b"") and
+                b"if-none-match" not in headers)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif self._is_async(scope):
+            await self._handle(scope, send)
+        else:
+            await self.wsgi(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.engine.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def _environ(self, scope) -> dict:
+        """
+        WSGI environ of request, so flask app handles it in its context
+        """
+        host, port = scope.get("server") or ("localhost", 80)
+        return EnvironBuilder(
+            path=scope["path"],
+            base_url=f"{scope.get('scheme', 'http')}://{host}:{port}"
+            f"{scope.get('root_path', '')}",
+            query_string=scope["query_string"].decode("latin-1"),
+            headers=[(k.decode("latin-1"), v.decode("latin-1"))
+                     for k, v in scope["headers"]],
+            environ_overrides={
+                "REMOTE_ADDR": (scope.get("client") or ("", 0))[0]
+            }).get_environ()
+
+    async def _dispatch(self, scope):
+        """
+        Dispatch request as flask full_dispatch_request does, with async
+        handler in place of the view of route
+        """
+        try:
+            request_started.send(self.app)
+            response = self.app.preprocess_request()
+            if response is None:
+                authenticate()
+                async with self.sessions() as session:
+                    response = await ASYNC_ROUTES[scope["path"]](
+                        session, {**request.args})
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            response = self.app.handle_user_exception(e)
+        return self.app.finalize_request(response)
+
+    async def _handle(self, scope, send):
+        environ = self._environ(scope)
+        with self.app.request_context(environ):
+            try:
+                response = await self._dispatch(scope)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                response = self.app.handle_exception(e)
+
+            app_iter, status, headers = response.get_wsgi_response(environ)
+            try:
+                body = b"".join(app_iter)
+            finally:
+                response.close()
+
+        await send({
+            "type": "http.response.start",
+            "status": int(status.split(" ", 1)[0]),
+            "headers": [(k.lower().encode("latin-1"), v.encode("latin-1"))
+                        for k, v in headers]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def create_asgi_app(app_config=None):
+    """
+    Instancing ASGI app over flask app
+    """
+    app_config = app_config or app_configs[os.environ.get("APP_CONFIG")
+                                           or "production"]
+    return AsyncAPI(create_app(app_config))
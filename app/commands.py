@@ -0,0 +1,109 @@
+import click
+from sqlalchemy import inspect, text, String, DateTime, Enum
+from sqlalchemy.schema import CreateColumn
+from flask.cli import AppGroup, with_appcontext
+
+from .models import db, session, set_up_data, Patient, Professional
+from .models.occupancy import rebuild_occupancy
+from .models.search import rebuild_search_index
+
+db_cli = AppGroup("db", help="Manage database schema.")
+
+occupancy_cli = AppGroup("occupancy", help="Manage schedules occupancy.")
+
+search_cli = AppGroup("search", help="Manage search index.")
+
+
+@db_cli.command("init")
+def init_db_command():
+    """
+    Create tables and indexes of a new database
+    """
+    db.create_all(bind_key=None)
+    click.echo("database initialized")
+
+
+def changed_columns(inspector, table) -> list:
+    """
+    Columns of table whose string or datetime type in database differs from
+    its model, as a shorter string or a datetime without fractional seconds
+    """
+    dialect = inspector.bind.dialect
+    existing = {
+        column["name"]: column["type"].compile(dialect=dialect).split(" ")[0]
+        for column in inspector.get_columns(table.name)
+    }
+    return [
+        column for column in table.columns
+        if isinstance(column.type, (String, DateTime))
+        and not isinstance(column.type, Enum) and column.name in existing
+        and existing[column.name] != column.type.compile(dialect=dialect)
+    ]
+
+
+@db_cli.command("upgrade")
+def upgrade_db_command():
+    """
+    Create missing tables and indexes in an existing database, indexes whose
+    columns changed or made unique are created again, the latter fail
+    whether there are duplicated rows. On MySQL columns whose type changed
+    are modified, SQLite neither limits strings nor rounds datetimes
+    """
+    db.create_all(bind_key=None)
+
+    inspector = inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        if db.engine.dialect.name == "mysql":
+            for column in changed_columns(inspector, table):
+                with db.engine.begin() as connection:
+                    connection.execute(
+                        text(f"ALTER TABLE {table.name} MODIFY "
+                             f"{CreateColumn(column).compile(db.engine)}"))
+                click.echo(f"column {column.name} modified on {table.name}")
+
+        existing = {
+            ix["name"]: (bool(ix["unique"]), tuple(ix["column_names"]))
+            for ix in inspector.get_indexes(table.name)
+        }
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(db.engine)
+                click.echo(f"index {index.name} created on {table.name}")
+            elif existing[index.name] != (index.unique, tuple(
+                    column.name for column in index.columns)):
+                index.drop(db.engine)
+                index.create(db.engine)
+                click.echo(f"index {index.name} recreated on {table.name}")
+
+    click.echo("database upgraded")
+
+
+@occupancy_cli.command("rebuild")
+def rebuild_occupancy_command():
+    """
+    Rebuild schedules occupancy from existing appointments
+    """
+    total = rebuild_occupancy()
+    session.commit()
+    click.echo(f"{total} schedule occupancy rows rebuilt")
+
+
+@search_cli.command("rebuild")
+def rebuild_search_command():
+    """
+    Rebuild search index of patients and professionals names
+    """
+    for model in (Patient, Professional):
+        total = rebuild_search_index(model.__tablename__, model.id, model.name)
+        session.commit()
+        click.echo(f"{total} {model.__tablename__} indexed")
+
+
+@click.command("seed")
+@with_appcontext
+def seed_command():
+    """
+    Insert initial clinic and admin user whether database has none
+    """
+    set_up_data(db)
+    click.echo("database seeded")
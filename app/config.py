@@ -7,6 +7,28 @@ finally:
 import os
 
 
+def pool_options() -> dict:
+    """
+    Options of database connection pool from environment
+    """
+    return {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE") or 10),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW") or 10),
+        "pool_timeout": int(os.environ.get("DB_POOL_TIMEOUT") or 30),
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE") or 1800),
+        "pool_pre_ping": (os.environ.get("DB_POOL_PRE_PING")
+                          or "true").lower() == "true"
+    }
+
+
+def replica_binds() -> dict:
+    """
+    Bind of read replica whether its uri is in environment
+    """
+    uri = os.environ.get("DATABASE_REPLICA_URI")
+    return {"replica": {"url": uri, **pool_options()}} if uri else {}
+
+
 class Config():
     APP_URI = os.environ.get("APP_URI")
 
@@ -16,9 +38,24 @@ class Config():
     ACCESS_TOKEN_EXPIRE = int(os.environ.get("ACCESS_TOKEN_EXPIRE"))
     SESSION_TOKEN_EXPIRE = int(os.environ.get("SESSION_TOKEN_EXPIRE"))
 
+    JWT_CACHE_SIZE = int(os.environ.get("JWT_CACHE_SIZE") or 1024)
+    JWT_CACHE_TTL = int(os.environ.get("JWT_CACHE_TTL") or 300)
+
+    # cache of calendar responses, local to each worker, redis shared by all
+    # workers or none
+    CALENDAR_CACHE_BACKEND = os.environ.get("CALENDAR_CACHE_BACKEND") or "local"
+    CALENDAR_CACHE_URL = os.environ.get("CALENDAR_CACHE_URL")
+    CALENDAR_CACHE_SIZE = int(os.environ.get("CALENDAR_CACHE_SIZE") or 4096)
+    CALENDAR_CACHE_TTL = int(os.environ.get("CALENDAR_CACHE_TTL") or 300)
+
     BCRYPT_ROUNDS = os.environ.get("BCRYPT_ROUNDS")
     BCRYPT_PEPPER = os.environ.get("BCRYPT_PEPPER")
 
+    PASSWORD_SCHEME = os.environ.get("PASSWORD_SCHEME") or "pbkdf2_sha256"
+    PASSWORD_ROUNDS = int(os.environ.get("PASSWORD_ROUNDS") or 0) or None
+    PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS") or 4)
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get("PASSWORD_HASH_TIMEOUT") or 5)
+
     DEBUG = False
     TESTING = False
 
@@ -26,23 +63,59 @@ class Config():
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # create tables and initial data on every app start up, prefer running
+    # flask db init and flask seed once per deploy
+    DB_SETUP_ON_STARTUP = (os.environ.get("DB_SETUP_ON_STARTUP")
+                           or "false").lower() == "true"
+
+    JSON_BACKEND = os.environ.get("JSON_BACKEND") or "auto"
+
+    # query stats hook every query, enabled by default only in development
+    # and tests
+    QUERY_STATS_ENABLED = (os.environ.get("QUERY_STATS_ENABLED")
+                           or "false").lower() == "true"
+    QUERY_STATS_MAX_COUNT = int(os.environ.get("QUERY_STATS_MAX_COUNT") or 20)
+    QUERY_STATS_REPEATED = int(os.environ.get("QUERY_STATS_REPEATED") or 5)
+
+    SWAGGER_ENABLED = (os.environ.get("SWAGGER_ENABLED")
+                       or "true").lower() == "true"
+
+    METRICS_ENABLED = (os.environ.get("METRICS_ENABLED")
+                       or "true").lower() == "true"
+    METRICS_PATH = os.environ.get("METRICS_PATH") or "/metrics"
+
+    ASYNC_DATABASE_URI = os.environ.get("ASYNC_DATABASE_URI")
+
+    DB_POOL_WARMUP = int(
+        os.environ.get("DB_POOL_WARMUP") or pool_options()["pool_size"])
+
     GOOGLE_OAUTH_CLIENTID = os.environ.get("GOOGLE_OAUTH_CLIENTID")
     GOOGLE_OAUTH_SECRET_KEY = os.environ.get("GOOGLE_OAUTH_SECRET_KEY")
 
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    QUERY_STATS_ENABLED = (os.environ.get("QUERY_STATS_ENABLED")
+                           or "true").lower() == "true"
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URI")
+    SQLALCHEMY_ENGINE_OPTIONS = pool_options()
+    SQLALCHEMY_BINDS = replica_binds()
     SQLALCHEMY_ECHO = True
 
 
 class TestingConfig(Config):
     TESTING = True
+    QUERY_STATS_ENABLED = (os.environ.get("QUERY_STATS_ENABLED")
+                           or "true").lower() == "true"
     SQLALCHEMY_DATABASE_URI = "sqlite:///"
 
 
 class ProductionConfig(Config):
+    SWAGGER_ENABLED = (os.environ.get("SWAGGER_ENABLED")
+                       or "false").lower() == "true"
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URI")
+    SQLALCHEMY_ENGINE_OPTIONS = pool_options()
+    SQLALCHEMY_BINDS = replica_binds()
 
 
 app_configs = {
@@ -1,6 +1,7 @@
 class ResponseMessages:
     UNEXPECTED_ERROR = "unexpected error ocurred"
     ENTITY_NOT_FOUND = "{} not found"
+    SERVER_BUSY = "server is busy, try again later"
 
     ONLY_ADMIN = "only admin can performs this operation"
     NOT_AUHORIZED_ACCESS = "not authorized to access this data"
@@ -17,6 +18,7 @@ class ValidationMessages:
     INVALID_PHONE = "field is not a email"
     INVALID_EMAIL = "field {} is not a valid phone number"
     INVALID_DATE = "field {} is not a date"
+    INVALID_CURSOR = "field {} is not a valid cursor"
 
     CPF_REGISTERED = "CPF has already been registered"
     REGISTRATION_REGISTERED = "registration has already been registered"
@@ -26,9 +28,13 @@ class ValidationMessages:
     EMAIL_REGISTERED = "email has already been registered"
 
     NO_ENTITY_RELATIONSHIP = "{} referenced by {} not exists"
+    SCHEDULE_FULLY_BOOKED = "schedule of {} at {} is fully booked"
 
     LEAST_CHARACTERS = "field {} must have at least {} characters"
     MOST_CHARACTERS = "field {} must have at most {} characters"
+    MOST_ITEMS = "field {} must have at most {} items"
+    NOT_A_LIST = "field {} is not a non-empty list"
+    NOT_AN_OBJECT = "field {} is not an object"
 
     NOT_A_NUMBER = "field {} is not a number"
     OUT_OF_RANGE = "out of range accepted between {} and {}"
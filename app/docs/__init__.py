@@ -1,3 +1,5 @@
+from flask import Response, current_app
+
 from .clinic_specs import clinic_model
 from .patient_specs import patient_model
 from .user_specs import user_model
@@ -88,3 +90,48 @@ swagger_config = {
     "specs_route":
     "/apidocs/"
 }
+
+
+def swag_from(specs: dict):
+    """
+    Attach specs to view as flasgger reads them, without importing flasgger
+    or wrapping the view, whether docs are disabled it costs nothing
+    """
+
+    def decorator(function):
+        function.specs_dict = specs
+        return function
+
+    return decorator
+
+
+def _cached_spec_view(swagger, endpoint):
+    cache = {}
+
+    def view():
+        """
+        Spec built on first request and kept serialized
+        """
+        content = cache.get(endpoint)
+        if content is None:
+            content = current_app.json.backend.dumps(
+                swagger.get_apispecs(endpoint))
+            if not current_app.debug:
+                cache[endpoint] = content
+        return Response(content, mimetype="application/json")
+
+    return view
+
+
+def init_swagger(app):
+    """
+    Serve api docs in app with spec built lazily on first request
+        parameters:
+            app (Flask): application
+    """
+    from flasgger import Swagger  # pylint: disable=import-outside-toplevel
+
+    swagger = Swagger(app, template=swagger_template, config=swagger_config)
+    for spec in swagger_config["specs"]:
+        app.view_functions[f"flasgger.{spec['endpoint']}"] = _cached_spec_view(
+            swagger, spec["endpoint"])
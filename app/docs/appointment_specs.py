@@ -1,6 +1,7 @@
 from .responses import created_201, updated_200, \
     validation_response_422, unauthenticated_401, not_authorized_403, \
-    list_response_200, unique_entity_200, entity_not_found_404, not_content_success_204
+    list_response_200, unique_entity_200, entity_not_found_404, not_content_success_204, \
+    not_modified_304
 
 appointment_minimal = {
     "type": "object",
@@ -114,6 +115,38 @@ post_appointment = {
     }
 }
 
+post_appointments_bulk = {
+    **tags, "summary": "Create many appointments",
+    "description":
+    "Create many appointments at once, none is created whether any is invalid or its schedule is fully booked",
+    "operationId": "post_appointments_bulk",
+    "security": [{
+        "BearerAuth": []
+    }],
+    "requestBody": {
+        "description": "appointments to create, at most 100",
+        "content": {
+            "application/json": {
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "appointments": {
+                            "type": "array",
+                            "items": appointment_minimal
+                        }
+                    }
+                }
+            }
+        }
+    },
+    "responses": {
+        "201": list_response_200("Appointment"),
+        "422": validation_response_422,
+        "401": unauthenticated_401,
+        "403": not_authorized_403,
+    }
+}
+
 get_appointments = {
     **tags, "summary":
     "Load appointments",
@@ -140,6 +173,22 @@ get_appointments = {
             "type": "integer",
             "default": 20
         }
+    }, {
+        "name": "cursor",
+        "in": "query",
+        "description": "value of X-Next-Cursor header of previous page, replaces page",
+        "required": False,
+        "schema": {
+            "type": "string",
+        }
+    }, {
+        "name": "stream",
+        "in": "query",
+        "description": "whether to stream all rows as ndjson, same as Accept: application/x-ndjson, limited only by limit",
+        "required": False,
+        "schema": {
+            "type": "boolean",
+        }
     }, {
         "name": "acting_id",
         "in": "query",
@@ -200,7 +249,8 @@ get_appointments = {
         }
     }],
     "responses": {
-        "200": list_response_200("Appointment"),
+        "200": list_response_200("Appointment", stream=True),
+        "304": not_modified_304,
         "401": unauthenticated_401,
         "403": not_authorized_403,
     }
@@ -226,6 +276,7 @@ get_appointment_by_id = {
     }],
     "responses": {
         "200": unique_entity_200("Appointment"),
+        "304": not_modified_304,
         "404": entity_not_found_404,
         "401": unauthenticated_401,
         "403": not_authorized_403,
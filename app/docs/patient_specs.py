@@ -1,6 +1,7 @@
 from .responses import created_201, updated_200, \
     validation_response_422, unauthenticated_401, not_authorized_403, \
-    list_response_200, unique_entity_200, entity_not_found_404, not_content_success_204
+    list_response_200, unique_entity_200, entity_not_found_404, not_content_success_204, \
+    not_modified_304
 
 patient_minimal = {
     "type": "object",
@@ -108,9 +109,26 @@ get_patients = {
             "type": "integer",
             "default": 20
         }
+    }, {
+        "name": "cursor",
+        "in": "query",
+        "description": "value of X-Next-Cursor header of previous page, replaces page",
+        "required": False,
+        "schema": {
+            "type": "string",
+        }
+    }, {
+        "name": "stream",
+        "in": "query",
+        "description": "whether to stream all rows as ndjson, same as Accept: application/x-ndjson, limited only by limit",
+        "required": False,
+        "schema": {
+            "type": "boolean",
+        }
     }, {
         "name": "name",
         "in": "query",
+        "description": "part of name, accents and case are ignored",
         "required": False,
         "schema": {
             "type": "string",
@@ -118,6 +136,7 @@ get_patients = {
     }, {
         "name": "cpf",
         "in": "query",
+        "description": "first digits, mask is ignored",
         "required": False,
         "schema": {
             "type": "string",
@@ -132,13 +151,15 @@ get_patients = {
     }, {
         "name": "phone",
         "in": "query",
+        "description": "first digits, mask is ignored",
         "required": False,
         "schema": {
             "type": "string",
         }
     }],
     "responses": {
-        "200": list_response_200("Patient"),
+        "200": list_response_200("Patient", stream=True),
+        "304": not_modified_304,
         "401": unauthenticated_401,
         "403": not_authorized_403,
     }
@@ -164,6 +185,7 @@ get_patient_by_id = {
     }],
     "responses": {
         "200": unique_entity_200("Patient"),
+        "304": not_modified_304,
         "404": entity_not_found_404,
         "401": unauthenticated_401,
         "403": not_authorized_403,
@@ -1,6 +1,7 @@
 from .responses import created_201, updated_200, \
     validation_response_422, unauthenticated_401, not_authorized_403, \
-    list_response_200, unique_entity_200, entity_not_found_404, not_content_success_204
+    list_response_200, unique_entity_200, entity_not_found_404, not_content_success_204, \
+    not_modified_304
 
 professional_acting = {
     "type": "object",
@@ -139,9 +140,18 @@ get_professionals = {
             "type": "integer",
             "default": 20
         }
+    }, {
+        "name": "cursor",
+        "in": "query",
+        "description": "value of X-Next-Cursor header of previous page, replaces page",
+        "required": False,
+        "schema": {
+            "type": "string",
+        }
     }, {
         "name": "name",
         "in": "query",
+        "description": "part of name, accents and case are ignored",
         "required": False,
         "schema": {
             "type": "string",
@@ -149,6 +159,7 @@ get_professionals = {
     }, {
         "name": "phone",
         "in": "query",
+        "description": "first digits, mask is ignored",
         "required": False,
         "schema": {
             "type": "string",
@@ -177,6 +188,7 @@ get_professionals = {
     }],
     "responses": {
         "200": list_response_200("Professional"),
+        "304": not_modified_304,
         "401": unauthenticated_401,
         "403": not_authorized_403,
     }
@@ -202,6 +214,7 @@ get_professional_by_id = {
     }],
     "responses": {
         "200": unique_entity_200("Professional"),
+        "304": not_modified_304,
         "404": entity_not_found_404,
         "401": unauthenticated_401,
         "403": not_authorized_403,
@@ -135,11 +135,11 @@ entity_not_found_404 = {
 }
 
 
-def list_response_200(schema):
+def list_response_200(schema, stream=False):
     """
-    create docs response with list
+    create docs response with list, optionally streamed as ndjson
     """
-    return {
+    response = {
         "description": "list with result of operation",
         "content": {
             "application/json": {
@@ -153,7 +153,21 @@ def list_response_200(schema):
         }
     }
 
+    if stream:
+        response["content"]["application/x-ndjson"] = {
+            "schema": {
+                "$ref": f"#/components/schemas/{schema}"
+            }
+        }
+
+    return response
+
 
 not_content_success_204 = {
     "description": "successful but without content",
 }
+
+not_modified_304 = {
+    "description":
+    "not changed since the response whose ETag header was sent in If-None-Match",
+}
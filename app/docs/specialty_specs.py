@@ -1,6 +1,7 @@
 from .responses import created_201, updated_200, \
     validation_response_422, unauthenticated_401, not_authorized_403, \
-    list_response_200, unique_entity_200, entity_not_found_404, not_content_success_204
+    list_response_200, unique_entity_200, entity_not_found_404, not_content_success_204, \
+    not_modified_304
 
 specialty_minimal = {
     "type": "object",
@@ -87,6 +88,22 @@ get_specialties = {
             "type": "integer",
             "default": 20
         }
+    }, {
+        "name": "cursor",
+        "in": "query",
+        "description": "value of X-Next-Cursor header of previous page, replaces page",
+        "required": False,
+        "schema": {
+            "type": "string",
+        }
+    }, {
+        "name": "stream",
+        "in": "query",
+        "description": "whether to stream all rows as ndjson, same as Accept: application/x-ndjson, limited only by limit",
+        "required": False,
+        "schema": {
+            "type": "boolean",
+        }
     }, {
         "name": "description",
         "in": "query",
@@ -96,7 +113,8 @@ get_specialties = {
         }
     }],
     "responses": {
-        "200": list_response_200("Specialty"),
+        "200": list_response_200("Specialty", stream=True),
+        "304": not_modified_304,
         "401": unauthenticated_401,
         "403": not_authorized_403,
     }
@@ -122,6 +140,7 @@ get_specialty_by_id = {
     }],
     "responses": {
         "200": unique_entity_200("Specialty"),
+        "304": not_modified_304,
         "404": entity_not_found_404,
         "401": unauthenticated_401,
         "403": not_authorized_403,
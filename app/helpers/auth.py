@@ -1,4 +1,8 @@
+import time
+import threading
+
 import jwt
+from cachetools import TLRUCache
 
 from ..exceptions import AuthenticationException
 
@@ -22,3 +26,71 @@ def decode_token(token, secret_key, algo):
         raise AuthenticationException("access token expired") from err
     except jwt.InvalidTokenError as err:
         raise AuthenticationException("access token invalid") from err
+
+
+class TokenCache:
+
+    def __init__(self, maxsize: int, ttl: int):
+        """
+        Thread safe LRU cache of decoded tokens, entries expire with token
+            parameters:
+                maxsize (int): maximum of tokens cached, zero disable cache
+                ttl (int): maximum seconds a token stays cached
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.on_lookup = None
+        self._lock = threading.Lock()
+        self._cache = TLRUCache(maxsize or 1, ttu=self._ttu, timer=time.time)
+
+    def _ttu(self, _, payload, now):
+        return min(payload.get("exp", now + self.ttl), now + self.ttl)
+
+    def decode(self, token, secret_key, algo):
+        """
+        Decode token with cached payload whether token was already decoded
+        """
+        key = (token, algo)
+        with self._lock:
+            payload = self._cache.get(key)
+            if payload is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if self.on_lookup is not None:
+            self.on_lookup(payload is not None)
+        if payload is not None:
+            return payload
+
+        payload = decode_token(token, secret_key, algo)
+
+        if self.maxsize:
+            with self._lock:
+                self._cache[key] = payload
+        return payload
+
+    def invalidate(self, token=None):
+        """
+        Remove token from cache, or all tokens whether none is given
+        """
+        with self._lock:
+            if token is None:
+                self._cache.clear()
+                return
+            for key in [k for k in self._cache if k[0] == token]:
+                self._cache.pop(key, None)
+
+    def stats(self) -> dict:
+        """
+        Obtain cache size, hits and misses
+        """
+        with self._lock:
+            return {
+                "size": len(self._cache),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses
+            }
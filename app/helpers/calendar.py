@@ -0,0 +1,145 @@
+from datetime import date, timedelta
+from collections import defaultdict
+from typing import Callable, Generator
+
+from ..models import Acting, Schedule, ScheduleOccupancy, session, select
+
+# statements yielded by a search are executed by the caller, which sends back
+# their rows, so the same search runs on sync and async sessions
+Search = Generator[object, list, object]
+
+
+def run_search(search: Search, execute: Callable[[object], list] = None):
+    """
+    Run search executing its statements with execute
+        parameters:
+            search (Search): generator of statements
+            execute (callable): statement to rows, session rows by default
+        returns:
+            result of search
+    """
+    execute = execute or (lambda stmt: session.execute(stmt).all())
+    try:
+        stmt = next(search)
+        while True:
+            stmt = search.send(execute(stmt))
+    except StopIteration as stop:
+        return stop.value
+
+
+async def run_search_async(search: Search, execute):
+    """
+    Run search awaiting execute of its statements
+        parameters:
+            search (Search): generator of statements
+            execute (coroutine function): statement to rows
+        returns:
+            result of search
+    """
+    try:
+        stmt = next(search)
+        while True:
+            stmt = search.send(await execute(stmt))
+    except StopIteration as stop:
+        return stop.value
+
+
+def specialty_schedules_statement(clinic_id, specialty_id):
+    """
+    Statement of schedules of a specialty in clinic
+        parameters:
+            clinic_id (int): clinic of schedules
+            specialty_id (int): specialty of schedules
+    """
+    return select(Schedule.id, Schedule.acting_id, Schedule.week_day,
+                  Schedule.start_time, Schedule.end_time,
+                  Schedule.max_visits).join(
+                      Acting, Acting.id == Schedule.acting_id).where(
+                          Acting.clinic_id == clinic_id,
+                          Acting.specialty_id == specialty_id,
+                          Schedule.week_day.is_not(None),
+                          Schedule.max_visits > 0)
+
+
+def full_schedules_statement(schedule_ids, first_day: date, last_day: date):
+    """
+    Statement of schedules with all visits booked between days
+        parameters:
+            schedule_ids (list[int]): schedules to verify
+            first_day (date): first day inclusive
+            last_day (date): last day exclusive
+    """
+    return select(ScheduleOccupancy.schedule_id,
+                  ScheduleOccupancy.scheduled_day).join(
+                      Schedule,
+                      Schedule.id == ScheduleOccupancy.schedule_id).where(
+                          ScheduleOccupancy.schedule_id.in_(schedule_ids),
+                          ScheduleOccupancy.scheduled_day >= first_day,
+                          ScheduleOccupancy.scheduled_day < last_day,
+                          ScheduleOccupancy.booked >= Schedule.max_visits)
+
+
+def search_free_days(clinic_id,
+                     specialty_id,
+                     start_date: date,
+                     num_days: int,
+                     first_day_startime: int = 0) -> Search:
+    """
+    Search of next days with at least one available schedule, see
+    find_free_days
+    """
+    schedules = defaultdict(list)
+    for schedule in (yield specialty_schedules_statement(
+            clinic_id, specialty_id)):
+        schedules[schedule.week_day].append(schedule)
+    if not schedules:
+        return []
+
+    schedule_ids = [sc.id for scs in schedules.values() for sc in scs]
+
+    free_days = []
+    window_start = start_date
+    # enough days to find num_days whether no schedule is full
+    window_size = -(-num_days // len(schedules)) * 7 + 1
+
+    while len(free_days) < num_days:
+        window_end = window_start + timedelta(days=window_size)
+        full_schedules = {(row.schedule_id, row.scheduled_day)
+                          for row in (yield full_schedules_statement(
+                              schedule_ids, window_start, window_end))}
+
+        current_date = window_start
+        while current_date < window_end and len(free_days) < num_days:
+            for schedule in schedules.get(current_date.weekday(), ()):
+                if current_date == start_date and schedule.start_time <= first_day_startime:
+                    continue
+                if (schedule.id, current_date) not in full_schedules:
+                    free_days.append(current_date)
+                    break
+            current_date += timedelta(days=1)
+
+        window_start = window_end
+        window_size *= 2
+
+    return free_days
+
+
+def find_free_days(clinic_id,
+                   specialty_id,
+                   start_date: date,
+                   num_days: int,
+                   first_day_startime: int = 0) -> list[date]:
+    """
+    Find next days with at least one available schedule
+        parameters:
+            clinic_id (int): clinic of schedules
+            specialty_id (int): specialty of schedules
+            start_date (date): first day to search
+            num_days (int): number of free days expected
+            first_day_startime (int): schedules of first day must start after it
+        returns:
+            list of free days ordered ascending
+    """
+    return run_search(
+        search_free_days(clinic_id, specialty_id, start_date, num_days,
+                         first_day_startime))
@@ -0,0 +1,249 @@
+import threading
+
+from cachetools import TTLCache
+from flask import current_app, has_app_context
+from sqlalchemy import event
+
+from ..models import Acting, Schedule, session, select
+from ..models.occupancy import CHANGED_SCHEDULES
+from ..models.routing import RoutingSession
+
+try:
+    import redis
+except ImportError:  # pragma: no cover
+    redis = None
+
+# clinics whose calendar changed in transaction, None stands for all clinics
+PENDING_KEY = "calendar_clinics"
+ALL_CLINICS = "all"
+VERSION_PREFIX = "v:"
+
+
+class NullCacheBackend:
+    """
+    Backend of disabled cache, nothing is stored
+    """
+
+    def get_many(self, keys: list) -> list:
+        return [None] * len(keys)
+
+    def set(self, key, value: bytes, ttl: int):
+        pass
+
+    def incr(self, key) -> int:
+        return 0
+
+
+class LocalCacheBackend:
+
+    def __init__(self, maxsize: int, ttl: int = 300):
+        """
+        Thread safe LRU of one process, versions are never evicted so an entry
+        of a past version is never valid again. Entries expire with ttl since
+        writes handled by other processes do not bump versions of this one
+            parameters:
+                maxsize (int): maximum of entries cached
+                ttl (int): seconds an entry is cached
+        """
+        self._lock = threading.Lock()
+        self._entries = TTLCache(maxsize, ttl)
+        self._versions = {}
+
+    def get_many(self, keys: list) -> list:
+        with self._lock:
+            return [
+                self._versions.get(key) if key.startswith(VERSION_PREFIX) else
+                self._entries.get(key) for key in keys
+            ]
+
+    def set(self, key, value: bytes, ttl: int):
+        with self._lock:
+            self._entries[key] = value
+
+    def incr(self, key) -> int:
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            return self._versions[key]
+
+
+class RedisCacheBackend:
+
+    def __init__(self, client):
+        """
+        Backend shared by all workers in a redis server, entries expire with
+        ttl since redis may evict versions under memory pressure
+            parameters:
+                client (Redis): redis client
+        """
+        self.client = client
+
+    @classmethod
+    def from_url(cls, url: str):
+        """
+        Backend connected to redis url
+        """
+        if redis is None:
+            raise ImportError("redis package is required by redis cache backend")
+        return cls(redis.Redis.from_url(url))
+
+    def get_many(self, keys: list) -> list:
+        return [
+            int(value)
+            if value is not None and key.startswith(VERSION_PREFIX) else value
+            for key, value in zip(keys, self.client.mget(keys))
+        ]
+
+    def set(self, key, value: bytes, ttl: int):
+        self.client.set(key, value, ex=ttl)
+
+    def incr(self, key) -> int:
+        return self.client.incr(key)
+
+
+class CalendarCache:
+
+    def __init__(self, backend, ttl: int = 300):
+        """
+        Serialized calendar responses by clinic, invalidated by version
+        counters of each clinic and of all clinics
+            parameters:
+                backend: storage of entries and versions
+                ttl (int): maximum seconds an entry is cached
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.on_lookup = None
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Cache with backend of app config
+        """
+        name = config["CALENDAR_CACHE_BACKEND"]
+        if name == "redis":
+            backend = RedisCacheBackend.from_url(config["CALENDAR_CACHE_URL"])
+        elif name == "local":
+            backend = LocalCacheBackend(config["CALENDAR_CACHE_SIZE"],
+                                        config["CALENDAR_CACHE_TTL"])
+        else:
+            backend = NullCacheBackend()
+
+        return cls(backend, config["CALENDAR_CACHE_TTL"])
+
+    @staticmethod
+    def _version_key(clinic_id) -> str:
+        return f"{VERSION_PREFIX}calendar:{clinic_id}"
+
+    def get(self, name: str, clinic_id, *params):
+        """
+        Obtain entry of current clinic version
+            returns:
+                key to set entry and content cached or None
+        """
+        global_version, clinic_version = self.backend.get_many([
+            self._version_key(ALL_CLINICS),
+            self._version_key(clinic_id)
+        ])
+        key = ":".join(
+            str(part)
+            for part in ("calendar", name, clinic_id, global_version or 0,
+                         clinic_version or 0, *params))
+        content = self.backend.get_many([key])[0]
+
+        if content is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        if self.on_lookup is not None:
+            self.on_lookup(name, content is not None)
+
+        return key, content
+
+    def set(self, key: str, content: bytes):
+        """
+        Store content under key obtained by get
+        """
+        self.backend.set(key, content, self.ttl)
+
+    def invalidate(self, clinic_ids):
+        """
+        Bump version of clinics, None invalidates all clinics
+        """
+        for clinic_id in clinic_ids:
+            self.backend.incr(
+                self._version_key(
+                    ALL_CLINICS if clinic_id is None else clinic_id))
+
+    def stats(self) -> dict:
+        """
+        Obtain hits and misses
+        """
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def invalidate_clinics(*clinic_ids):
+    """
+    Invalidate calendar of clinics once transaction commits
+    """
+    session.info.setdefault(PENDING_KEY, set()).update(clinic_ids)
+
+
+def invalidate_all():
+    """
+    Invalidate calendar of all clinics once transaction commits
+    """
+    invalidate_clinics(None)
+
+
+def invalidate_actings(*acting_ids):
+    """
+    Invalidate calendar of clinics of actuations once transaction commits
+    """
+    invalidate_clinics(*session.execute(
+        select(Acting.clinic_id).distinct().where(
+            Acting.id.in_(acting_ids))).scalars())
+
+
+def _schedules_clinics(db_session, schedule_ids) -> list:
+    return list(
+        db_session.execute(
+            select(Acting.clinic_id).distinct().join(
+                Schedule, Schedule.acting_id == Acting.id).where(
+                    Schedule.id.in_(schedule_ids))).scalars())
+
+
+def invalidate_schedules(*schedule_ids):
+    """
+    Invalidate calendar of clinics of schedules once transaction commits
+    """
+    invalidate_clinics(*_schedules_clinics(session, schedule_ids))
+
+
+@event.listens_for(RoutingSession, "before_commit")
+def _collect_occupancy_changes(db_session):
+    schedule_ids = db_session.info.pop(CHANGED_SCHEDULES, None)
+    if not schedule_ids:
+        return
+
+    pending = db_session.info.setdefault(PENDING_KEY, set())
+    if None in schedule_ids:
+        pending.add(None)
+    else:
+        pending.update(_schedules_clinics(db_session, schedule_ids))
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _invalidate_committed(db_session):
+    clinic_ids = db_session.info.pop(PENDING_KEY, None)
+    if clinic_ids and has_app_context():
+        current_app.extensions["calendar_cache"].invalidate(clinic_ids)
+
+
+@event.listens_for(RoutingSession, "after_soft_rollback")
+def _discard_rolled_back(db_session, previous_transaction):
+    if previous_transaction.parent is not None:
+        return
+    db_session.info.pop(PENDING_KEY, None)
+    db_session.info.pop(CHANGED_SCHEDULES, None)
@@ -0,0 +1,143 @@
+import hashlib
+
+from flask import current_app, request
+from sqlalchemy import func
+
+from ..models import session, select
+
+
+def make_etag(*parts) -> str:
+    """
+    Strong etag of version parts of a response
+    """
+    return hashlib.sha1(":".join(str(part) for part in parts).encode(),
+                        usedforsecurity=False).hexdigest()
+
+
+def row_version(row):
+    """
+    Last change of row, its creation whether never updated
+    """
+    return row.updated_at or row.created_at
+
+
+def version_columns(*models) -> tuple:
+    """
+    Last change of rows of each model, labeled by position of model
+    """
+    return tuple(
+        func.coalesce(model.updated_at, model.created_at).label(f"version_{i}")
+        for i, model in enumerate(models))
+
+
+def statement_versions(stmt, *models) -> tuple:
+    """
+    Versions of rows of a statement without loading them, in one query
+        parameters:
+            stmt (Select): statement of response, with its filters and page
+            models (list[Model]): models of response, the first one is the
+                model listed and the others the ones joined to it
+        returns:
+            count and sum of ids of first model rows and last change of
+            rows of each model
+    """
+    subquery = stmt.with_only_columns(models[0].id.label("id"),
+                                      *version_columns(*models),
+                                      maintain_column_froms=True).subquery()
+
+    return tuple(
+        session.execute(
+            select(func.count(), func.sum(subquery.c.id),
+                   *(func.max(subquery.c[f"version_{i}"])
+                     for i in range(len(models)))).select_from(subquery)).one())
+
+
+def statement_etag(stmt, *models) -> str:
+    """
+    Etag of rows of a statement, see statement_versions
+    """
+    return make_etag(*statement_versions(stmt, *models))
+
+
+def rows_versions(rows) -> tuple:
+    """
+    Versions of rows already loaded of a single model, equal to versions of
+    their statement
+    """
+    return (len(rows), sum(row.id for row in rows) if rows else None,
+            max((row_version(row) for row in rows), default=None))
+
+
+def rows_etag(rows) -> str:
+    """
+    Etag of rows already loaded of a single model, equal to etag of their
+    statement
+    """
+    return make_etag(*rows_versions(rows))
+
+
+def versioned(stmt, *models):
+    """
+    Statement loading rows along with versions of their models, so the etag
+    of a joined response needs no other query, see joined_rows_versions
+    """
+    return stmt.add_columns(*version_columns(*models))
+
+
+def joined_rows_versions(rows, models_count: int) -> tuple:
+    """
+    Versions of rows loaded by a versioned statement, equal to versions of
+    the statement
+    """
+    return (len(rows), sum(row.id for row in rows) if rows else None,
+            *(max((getattr(row, f"version_{i}") for row in rows), default=None)
+              for i in range(models_count)))
+
+
+def joined_rows_etag(rows, models_count: int) -> str:
+    """
+    Etag of rows loaded by a versioned statement, see joined_rows_versions
+    """
+    return make_etag(*joined_rows_versions(rows, models_count))
+
+
+def unversioned(row) -> dict:
+    """
+    Row of a versioned statement as dict without versions of its models
+    """
+    return {
+        key: value
+        for key, value in row._asdict().items()
+        if not key.startswith("version_")
+    }
+
+
+def conditional_etag(stmt, *models):
+    """
+    Etag of rows of a statement whether request has If-None-Match, so rows
+    of unconditional requests are loaded before their etag is computed
+    """
+    if not request.if_none_match:
+        return None
+    return statement_etag(stmt, *models)
+
+
+def not_modified(etag):
+    """
+    Response 304 whether etag matches request If-None-Match
+        returns:
+            response without body or None
+    """
+    if etag is None or not request.if_none_match.contains_weak(etag):
+        return None
+
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    return response
+
+
+def etag_headers(etag: str) -> dict:
+    """
+    Headers with etag of response
+    """
+    return {"ETag": f'"{etag}"'}
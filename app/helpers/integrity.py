@@ -0,0 +1,105 @@
+import re
+
+from sqlalchemy import UniqueConstraint
+from sqlalchemy.exc import IntegrityError
+
+from ..constants import ValidationMessages
+from ..exceptions import ValidationException, internal_server_error, \
+    validation_exception_handler
+from ..models import db, session
+
+# field and message of each unique constraint by its name
+UNIQUE_MESSAGES = {
+    "uq_patients_cpf": ("cpf", ValidationMessages.CPF_REGISTERED),
+    "uq_patients_registration":
+    ("registration", ValidationMessages.REGISTRATION_REGISTERED),
+    "uq_patients_phone": ("phone", ValidationMessages.PHONE_REGISTERED),
+    "uq_clinics_cnpj": ("cnpj", ValidationMessages.CNPJ_REGISTERED),
+    "uq_clinics_phone": ("phone", ValidationMessages.PHONE_REGISTERED),
+    "uq_professionals_phone": ("phone", ValidationMessages.PHONE_REGISTERED),
+    "ix_professionals_username":
+    ("username", ValidationMessages.USERNAME_REGISTERED),
+    "ix_professionals_email": ("email", ValidationMessages.EMAIL_REGISTERED),
+    "ix_users_username": ("username", ValidationMessages.USERNAME_REGISTERED),
+    "ix_users_email": ("email", ValidationMessages.EMAIL_REGISTERED),
+}
+
+STATEMENT_TABLE = re.compile(r"^\s*(?:INSERT\s+INTO|UPDATE)\s+[`\"]?(\w+)",
+                             re.IGNORECASE)
+# mysql names the key, prefixed by table since 8.0, sqlite lists columns
+MYSQL_DUPLICATE = re.compile(r"Duplicate entry .* for key '(?:\w+\.)?(\w+)'")
+SQLITE_UNIQUE = re.compile(r"UNIQUE constraint failed: ([\w., ]+)")
+
+
+def _unique_constraints(table) -> list:
+    return [
+        constraint for constraint in table.constraints
+        if isinstance(constraint, UniqueConstraint)
+    ] + [index for index in table.indexes if index.unique]
+
+
+def _violated_key(error: IntegrityError):
+    """
+    Constraint name or columns reported by database
+    """
+    diag = getattr(error.orig, "diag", None)
+    if diag is not None and getattr(diag, "constraint_name", None):
+        return diag.constraint_name
+
+    message = str(error.orig)
+    if match := MYSQL_DUPLICATE.search(message):
+        return match.group(1)
+    if match := SQLITE_UNIQUE.search(message):
+        return tuple(
+            column.strip().rsplit(".", 1)[-1]
+            for column in match.group(1).split(","))
+    return None
+
+
+def violated_constraint(error: IntegrityError) -> str or None:
+    """
+    Name of unique constraint violated by statement of error, constraints
+    created unnamed by older schemas are found by their columns
+        returns:
+            constraint name or none whether error is not a unique violation
+    """
+    key = _violated_key(error)
+    if key is None:
+        return None
+    if isinstance(key, str) and key in UNIQUE_MESSAGES:
+        return key
+
+    match = STATEMENT_TABLE.match(error.statement or "")
+    table = db.metadata.tables.get(match.group(1)) if match else None
+    if table is None:
+        return None
+
+    columns = (key, ) if isinstance(key, str) else key
+    for constraint in _unique_constraints(table):
+        if (tuple(column.name for column in constraint.columns) == columns or
+                constraint.name == key):
+            return constraint.name
+    return None
+
+
+def integrity_validation(error: IntegrityError) -> ValidationException or None:
+    """
+    Validation exception with message of unique constraint violated by error
+    """
+    name = violated_constraint(error)
+    if name not in UNIQUE_MESSAGES:
+        return None
+
+    field, message = UNIQUE_MESSAGES[name]
+    return ValidationException({field: message})
+
+
+def integrity_error_handler(error: IntegrityError):
+    """
+    Handle integrity error of a write, unique violations are answered as
+    validation errors of their field
+    """
+    session.rollback()
+    if (exception := integrity_validation(error)) is not None:
+        return validation_exception_handler(exception)
+    return internal_server_error(error)
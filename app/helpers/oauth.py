@@ -0,0 +1,50 @@
+import re
+import time
+import threading
+
+from google.auth import transport
+from google.auth.transport import requests
+
+MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class CachedRequest(transport.Request):
+
+    def __init__(self, request: transport.Request = None, timer=time.monotonic):
+        """
+        Transport of google auth caching GET responses, as certificates of
+        tokens, while their Cache-Control max-age allows
+            parameters:
+                request (Request): transport fetching responses, a requests
+                    session kept open by default
+                timer (callable): clock of expiration in seconds
+        """
+        self._request = request or requests.Request()
+        self._timer = timer
+        self._lock = threading.Lock()
+        self._cache = {}
+
+    def __call__(self, url, method="GET", body=None, headers=None, timeout=None,
+                 **kwargs):
+        if method != "GET":
+            return self._request(url, method, body, headers, timeout, **kwargs)
+
+        with self._lock:
+            expires, response = self._cache.get(url, (0, None))
+        if self._timer() < expires:
+            return response
+
+        response = self._request(url, method, body, headers, timeout, **kwargs)
+        max_age = MAX_AGE.search(response.headers.get("Cache-Control", ""))
+        if response.status == 200 and max_age:
+            with self._lock:
+                self._cache[url] = (self._timer() + int(max_age.group(1)),
+                                    response)
+        return response
+
+    def invalidate(self):
+        """
+        Drop all cached responses
+        """
+        with self._lock:
+            self._cache.clear()
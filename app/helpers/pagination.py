@@ -0,0 +1,160 @@
+import json
+import base64
+import binascii
+from datetime import date, datetime
+
+from sqlalchemy import and_, or_, desc, false
+
+from ..exceptions import ValidationException
+from ..constants import ValidationMessages
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class Keyset:
+
+    def __init__(self, *columns, descending=False, nullable=()):
+        """
+        Sort key of listing used to paginate with cursor, served by an index
+        with the same columns
+            parameters:
+                columns (Column): columns of sort key, last one must be unique
+                descending (bool): whether all columns are sorted descending
+                nullable (tuple[str]): names of columns that may be null, nulls
+                    sort first ascending as in mysql and sqlite
+        """
+        self.columns = columns
+        self.descending = descending
+        self.nullable = set(nullable)
+
+    def order_by(self):
+        """
+        Order by clauses of sort key
+        """
+        if self.descending:
+            return [desc(c) for c in self.columns]
+        return list(self.columns)
+
+    def _equal(self, column, value):
+        return column.is_(None) if value is None else column == value
+
+    def _beyond(self, column, value):
+        """
+        Criteria of column values strictly after value in sort order
+        """
+        is_nullable = column.key in self.nullable
+        if not self.descending:
+            return column.is_not(None) if value is None else column > value
+        if value is None:
+            return false()
+        return or_(column < value, column.is_(None)) if is_nullable else column < value
+
+    def _bound(self, column, value):
+        """
+        Range of first column of rows after value, so the index is scanned
+        from the cursor on
+        """
+        if column.key in self.nullable:
+            return None
+        return column <= value if self.descending else column >= value
+
+    def after(self, cursor: str):
+        """
+        Criteria of rows after cursor, expanded from the row comparison so
+        databases scan a range of the sort key index
+        """
+        pairs = list(zip(self.columns, self.decode(cursor)))
+
+        column, value = pairs[-1]
+        criteria = self._beyond(column, value)
+        for column, value in reversed(pairs[:-1]):
+            criteria = or_(self._beyond(column, value),
+                           and_(self._equal(column, value), criteria))
+
+        column, value = pairs[0]
+        if (bound := self._bound(column, value)) is not None:
+            criteria = and_(bound, criteria)
+        return criteria
+
+    def encode(self, row) -> str:
+        """
+        Encode sort key of row as cursor
+        """
+        values = []
+        for column in self.columns:
+            value = getattr(row, column.key)
+            if isinstance(value, date):
+                value = value.isoformat()
+            values.append(value)
+
+        return base64.urlsafe_b64encode(
+            json.dumps(values).encode()).decode().rstrip("=")
+
+    def decode(self, cursor: str) -> list:
+        """
+        Decode cursor to sort key values
+        """
+        try:
+            values = json.loads(
+                base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            if not isinstance(values, list) or len(values) != len(
+                    self.columns):
+                raise ValueError
+
+            return [
+                self._parse(column, value)
+                for column, value in zip(self.columns, values)
+            ]
+        except (ValueError, TypeError, binascii.Error) as err:
+            raise ValidationException({
+                "cursor":
+                ValidationMessages.INVALID_CURSOR.format("cursor")
+            }) from err
+
+    def _parse(self, column, value):
+        if value is None:
+            if column.key not in self.nullable:
+                raise ValueError
+            return None
+        python_type = column.type.python_type
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is date:
+            return date.fromisoformat(value)
+        if python_type is int:
+            return int(value)
+        return value
+
+
+def paginate(stmt, keyset: Keyset, params, stream=False):
+    """
+    Apply order, limit and page or cursor of request parameters to statement,
+    when streaming the listing is only limited whether limit is given
+    """
+    cursor = params.get("cursor")
+
+    stmt = stmt.order_by(*keyset.order_by())
+    if cursor:
+        stmt = stmt.where(keyset.after(cursor))
+
+    if stream and not params.get("limit"):
+        return stmt
+
+    limit = int(params.get("limit") or 20)
+    stmt = stmt.limit(limit)
+
+    if cursor:
+        return stmt
+
+    page = int(params.get("page") or 1)
+    return stmt.offset((page - 1) * limit)
+
+
+def cursor_headers(keyset: Keyset, rows: list, params) -> dict:
+    """
+    Headers with cursor to next page whether the page is full
+    """
+    limit = int(params.get("limit") or 20)
+    if rows and len(rows) >= limit:
+        return {NEXT_CURSOR_HEADER: keyset.encode(rows[-1])}
+    return {}
@@ -0,0 +1,96 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from flask import current_app
+from passlib.context import CryptContext
+
+from ..constants import ResponseMessages
+from ..exceptions import APIException
+
+# scheme of hashes already stored, kept verifiable whether another is configured
+LEGACY_SCHEME = "pbkdf2_sha256"
+
+
+class PasswordHasher:
+
+    def __init__(self,
+                 scheme=LEGACY_SCHEME,
+                 rounds: int = None,
+                 workers: int = 4,
+                 timeout: float = 5):
+        """
+        Hash and verify passwords in a bounded pool of threads, so bursts of
+        logins wait for a free thread instead of taking all cpus
+            parameters:
+                scheme (str): passlib scheme of new hashes
+                rounds (int): rounds of new hashes, passlib default whether none
+                workers (int): maximum of hashes computed at same time
+                timeout (float): maximum seconds waiting for a hash
+        """
+        options = {}
+        if rounds:
+            # hashes with other rounds, lower or higher, are rehashed
+            options = {
+                f"{scheme}__default_rounds": rounds,
+                f"{scheme}__min_rounds": rounds,
+                f"{scheme}__max_rounds": rounds
+            }
+        try:
+            self.context = CryptContext(
+                schemes=list(dict.fromkeys([scheme, LEGACY_SCHEME])),
+                deprecated="auto",
+                **options)
+        except KeyError as err:
+            raise ValueError(f"Unknown password scheme {scheme}.") from err
+
+        handler = self.context.handler(scheme)
+        if hasattr(handler, "has_backend") and not handler.has_backend():
+            raise ValueError(
+                f"Password scheme {scheme} has no backend available, "
+                "install its package listed in requirements.txt.")
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers,
+                                            thread_name_prefix="password")
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Hasher with parameters of app config
+        """
+        scheme = config["PASSWORD_SCHEME"]
+        rounds = config["PASSWORD_ROUNDS"]
+        if not rounds and scheme == "bcrypt" and config.get("BCRYPT_ROUNDS"):
+            rounds = int(config["BCRYPT_ROUNDS"])
+
+        return cls(scheme, rounds, config["PASSWORD_HASH_WORKERS"],
+                   config["PASSWORD_HASH_TIMEOUT"])
+
+    def _run(self, fn, *args):
+        future = self._executor.submit(fn, *args)
+        try:
+            return future.result(self.timeout)
+        except FutureTimeoutError as err:
+            future.cancel()
+            raise APIException(ResponseMessages.SERVER_BUSY,
+                               status_code=503) from err
+
+    def hash(self, password: str) -> str:
+        """
+        Hash password with configured parameters
+        """
+        return self._run(self.context.hash, password)
+
+    def verify(self, password: str, hashed: str) -> tuple[bool, str]:
+        """
+        Verify password against hash
+            returns:
+                whether password matches and new hash of password whether
+                stored hash parameters differ from configured ones
+        """
+        return self._run(self.context.verify_and_update, password, hashed)
+
+
+def hash_password(password: str) -> str:
+    """
+    Hash password with hasher of current app
+    """
+    return current_app.extensions["password_hasher"].hash(password)
@@ -0,0 +1,61 @@
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+
+from ..models import db
+
+
+def pool_stats(engine) -> dict:
+    """
+    Obtain usage of engine connection pool
+        returns:
+            dict with size, connections checked in, checked out and overflow
+    """
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"size": 0, "checked_in": 0, "checked_out": 0, "overflow": 0}
+
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0)
+    }
+
+
+def warm_up_pool(engine, connections: int) -> int:
+    """
+    Open connections of pool before first requests, so they do not wait
+    connecting to database
+        parameters:
+            engine (Engine): engine of pool
+            connections (int): connections to open, at most the pool size
+        returns:
+            number of connections opened
+    """
+    connections = min(
+        connections,
+        engine.pool.size() if isinstance(engine.pool, QueuePool) else 1)
+
+    opened = []
+    try:
+        for _ in range(connections):
+            conn = engine.connect()
+            opened.append(conn)
+            conn.execute(text("SELECT 1"))
+    finally:
+        for conn in opened:
+            conn.close()
+
+    return len(opened)
+
+
+def warm_up_app(app) -> int:
+    """
+    Warm up pools of all engines of app with DB_POOL_WARMUP connections
+        returns:
+            number of connections opened
+    """
+    with app.app_context():
+        return sum(
+            warm_up_pool(engine, app.config["DB_POOL_WARMUP"])
+            for engine in db.engines.values())
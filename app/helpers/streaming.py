@@ -0,0 +1,39 @@
+from flask import Response, current_app, request, stream_with_context
+
+from ..models import session
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+STREAM_BATCH_SIZE = 500
+
+
+def wants_stream(params) -> bool:
+    """
+    Whether listing was requested as ndjson, by stream parameter or Accept header
+    """
+    if str(params.get("stream", "")).lower() == "true":
+        return True
+
+    return request.accept_mimetypes.best_match(
+        ["application/json", NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+
+def stream_rows(stmt, scalars=False, batch_size=STREAM_BATCH_SIZE) -> Response:
+    """
+    Response writing one json line per row while rows are fetched from database
+        parameters:
+            stmt (Select): statement of listing
+            scalars (bool): whether rows are models instead of columns
+            batch_size (int): number of rows fetched at a time by cursor
+    """
+    backend = current_app.json.backend
+
+    def generate():
+        result = session.execute(stmt.execution_options(yield_per=batch_size))
+        if scalars:
+            result = result.scalars()
+
+        for row in result:
+            obj = row.as_dict() if scalars else row._asdict()
+            yield backend.dumps(obj, separators=(",", ":")) + b"\n"
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
@@ -1,10 +1,15 @@
 import json
-from datetime import date
+from datetime import date, time, timedelta
 
 from flask.json.provider import DefaultJSONProvider
 
 from app.models import ClinicType
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
 
 def _custom_default(o):
     """
@@ -12,17 +17,84 @@ def _custom_default(o):
     """
     if isinstance(o, ClinicType):
         return int(o.value)
-    if isinstance(o, date):
+    if isinstance(o, (date, time)):
         return o.isoformat()
+    if isinstance(o, timedelta):
+        return str(o)
 
     return DefaultJSONProvider.default(o)
 
 
+class StdlibBackend:
+    name = "stdlib"
+
+    @staticmethod
+    def dumps(obj, **kwargs) -> bytes:
+        """
+        Serialize with json module, unknown types go through default
+        """
+        kwargs.setdefault("default", _custom_default)
+        return json.dumps(obj, **kwargs).encode()
+
+
+class OrjsonBackend:
+    name = "orjson"
+
+    @staticmethod
+    def dumps(obj, **kwargs) -> bytes:
+        """
+        Serialize with orjson, date, time and enums are native types
+        """
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys"):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_custom_default, option=option)
+
+
+JSON_BACKENDS = {StdlibBackend.name: StdlibBackend}
+if orjson is not None:
+    JSON_BACKENDS[OrjsonBackend.name] = OrjsonBackend
+
+
+def get_json_backend(name: str = None):
+    """
+    Obtain json backend by name, auto prefers orjson whether installed
+    """
+    if not name or name == "auto":
+        return JSON_BACKENDS.get(OrjsonBackend.name, StdlibBackend)
+    return JSON_BACKENDS[name]
+
+
 class CustomJSONProvider(DefaultJSONProvider):
     default = staticmethod(_custom_default)
 
+    def __init__(self, app):
+        super().__init__(app)
+        self.backend = get_json_backend(app.config.get("JSON_BACKEND"))
+
     def dumps(self, obj, **kwargs):
         kwargs.setdefault("default", self.default)
         kwargs.setdefault("ensure_ascii", self.ensure_ascii)
         kwargs.setdefault("sort_keys", self.sort_keys)
         return json.dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        """
+        Serialize data straight to response bytes with json backend
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        dump_args = {"sort_keys": self.sort_keys}
+
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            dump_args["indent"] = 2
+        else:
+            dump_args["separators"] = (",", ":")
+
+        if self.backend is StdlibBackend:
+            dump_args["ensure_ascii"] = self.ensure_ascii
+
+        return self._app.response_class(self.backend.dumps(obj, **dump_args) +
+                                        b"\n",
+                                        mimetype=self.mimetype)
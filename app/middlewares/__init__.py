@@ -1 +1 @@
-from .auth import token_required, only_admin
+from .auth import authenticate, token_required, only_admin
@@ -1,11 +1,28 @@
 from functools import wraps
 from flask import request, current_app
 
-from ..helpers.auth import get_header_token, decode_token
+from ..helpers.auth import get_header_token
 from ..exceptions import AuthorizationException
 from ..constants import ResponseMessages
 
 
+def authenticate() -> dict:
+    """
+    Verify token of current request
+        returns:
+            current user of token
+    """
+    auth_token = get_header_token(request.headers.get("Authorization"))
+
+    payload = current_app.extensions["token_cache"].decode(
+        auth_token, current_app.config["JWT_SECRET_KEY"], "HS256")
+    return {
+        "id": payload["id"],
+        "name": payload["name"],
+        "admin": payload["admin"]
+    }
+
+
 def token_required(f):
     """
     Verify if user is authtenticated and token is valid
@@ -13,16 +30,7 @@ def token_required(f):
 
     @wraps(f)
     def decorated(*args, **kwargs):
-        auth_token = get_header_token(request.headers.get("Authorization"))
-
-        payload = decode_token(auth_token,
-                               current_app.config["JWT_SECRET_KEY"], "HS256")
-        return f(
-            {
-                "id": payload["id"],
-                "name": payload["name"],
-                "admin": payload["admin"]
-            }, *args, **kwargs)
+        return f(authenticate(), *args, **kwargs)
 
     return decorated
 
@@ -0,0 +1,177 @@
+import os
+import time
+from contextvars import ContextVar
+
+from flask import Response, g, request
+from sqlalchemy import event
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, \
+    CONTENT_TYPE_LATEST, generate_latest, multiprocess
+
+from ..helpers.pool import pool_stats
+from ..models.routing import RoutingSession
+
+MULTIPROCESS_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+# metrics of multiprocess mode are files created along with them
+if multiprocess_dir := os.environ.get(MULTIPROCESS_DIR_ENV):
+    os.makedirs(multiprocess_dir, exist_ok=True)
+
+REQUEST_LATENCY = Histogram("http_request_duration_seconds",
+                            "Latency of requests by route and status",
+                            ["method", "route", "status"])
+REQUESTS_IN_PROGRESS = Gauge("http_requests_in_progress",
+                             "Requests being handled",
+                             multiprocess_mode="livesum")
+DB_POOL_WAIT = Histogram("db_pool_checkout_wait_seconds",
+                         "Wait to check out a connection from pool",
+                         buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1,
+                                  .25, .5, 1, 2.5, 5))
+DB_POOL_CONNECTIONS = Gauge("db_pool_connections",
+                            "Connections of pool by state when requests start",
+                            ["state"],
+                            multiprocess_mode="livesum")
+DB_REQUEST_TIME = Histogram("db_request_duration_seconds",
+                            "Time spent in SQL by request", ["route"])
+DB_REQUEST_QUERIES = Histogram("db_request_queries",
+                               "Number of SQL queries by request", ["route"],
+                               buckets=(1, 2, 3, 5, 10, 20, 50, 100))
+JWT_CACHE_LOOKUPS = Counter("jwt_cache_lookups_total",
+                            "Lookups of decoded tokens cache", ["result"])
+CALENDAR_CACHE_LOOKUPS = Counter("calendar_cache_lookups_total",
+                                 "Lookups of calendar responses cache",
+                                 ["endpoint", "result"])
+SERIALIZATION_TIME = Histogram("json_serialization_seconds",
+                               "Time serializing json responses",
+                               buckets=(.0001, .0005, .001, .0025, .005, .01,
+                                        .025, .05, .1, .25, .5, 1))
+
+
+def _route():
+    return request.url_rule.rule if request.url_rule else "unmatched"
+
+
+def _start_request():
+    g.metrics_start = time.perf_counter()
+    REQUESTS_IN_PROGRESS.inc()
+
+
+def _observe_response(response):
+    if (start := g.get("metrics_start")) is not None:
+        REQUEST_LATENCY.labels(request.method, _route(),
+                               response.status_code).observe(
+                                   time.perf_counter() - start)
+    return response
+
+
+def _finish_request(_):
+    if g.pop("metrics_start", None) is None:
+        return
+
+    REQUESTS_IN_PROGRESS.dec()
+    if (stats := g.get("last_query_stats")) is not None:
+        route = _route()
+        DB_REQUEST_TIME.labels(route).observe(stats.duration)
+        DB_REQUEST_QUERIES.labels(route).observe(stats.count)
+
+
+# start of the checkout of the connection of a session transaction
+_checkout_start = ContextVar("checkout_start", default=None)
+
+
+def _start_checkout(_, transaction):
+    if transaction.parent is None:
+        _checkout_start.set(time.perf_counter())
+
+
+def _end_checkout(_, transaction):
+    if transaction.parent is None:
+        _checkout_start.set(None)
+
+
+def _observe_checkout(*_):
+    if (start := _checkout_start.get()) is not None:
+        _checkout_start.set(None)
+        DB_POOL_WAIT.observe(time.perf_counter() - start)
+
+
+def _time_pool_checkouts(engines):
+    """
+    Time from the begin of a session transaction to the checkout of its
+    connection, the wait for the pool when it is exhausted
+    """
+    for target, name, listener in (
+        (RoutingSession, "after_transaction_create", _start_checkout),
+        (RoutingSession, "after_transaction_end", _end_checkout),
+    ):
+        if not event.contains(target, name, listener):
+            event.listen(target, name, listener)
+
+    # listeners of pool are kept when engine is disposed and its pool recreated
+    for engine in engines:
+        event.listen(engine, "checkout", _observe_checkout)
+
+
+def _observe_pools(engines):
+
+    def observe():
+        stats = [pool_stats(engine) for engine in engines]
+        for state in stats[0] if stats else ():
+            DB_POOL_CONNECTIONS.labels(state).set(
+                sum(engine_stats[state] for engine_stats in stats))
+
+    return observe
+
+
+def _time_serialization(provider):
+    response = provider.response
+
+    def timed_response(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return response(*args, **kwargs)
+        finally:
+            SERIALIZATION_TIME.observe(time.perf_counter() - start)
+
+    provider.response = timed_response
+
+
+def _count_token_lookup(hit: bool):
+    JWT_CACHE_LOOKUPS.labels("hit" if hit else "miss").inc()
+
+
+def _count_calendar_lookup(name: str, hit: bool):
+    CALENDAR_CACHE_LOOKUPS.labels(name, "hit" if hit else "miss").inc()
+
+
+def metrics_view():
+    """
+    Metrics in prometheus text format, aggregated across all workers whether
+    running in multiprocess mode
+    """
+    registry = REGISTRY
+    if os.environ.get(MULTIPROCESS_DIR_ENV):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+def init_metrics(app, engines):
+    """
+    Collect metrics of requests, database, caches and serialization of app and expose them in /metrics
+        parameters:
+            app (Flask): application
+            engines (list[Engine]): engines of app to instrument
+    """
+    engines = list(engines)
+    _time_pool_checkouts(engines)
+
+    _time_serialization(app.json)
+    app.extensions["token_cache"].on_lookup = _count_token_lookup
+    app.extensions["calendar_cache"].on_lookup = _count_calendar_lookup
+
+    app.before_request(_observe_pools(engines))
+    app.before_request(_start_request)
+    app.after_request(_observe_response)
+    app.teardown_request(_finish_request)
+    app.add_url_rule(app.config["METRICS_PATH"], "metrics", metrics_view)
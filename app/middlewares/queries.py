@@ -0,0 +1,145 @@
+import re
+import json
+import time
+import logging
+from collections import Counter
+
+from flask import g, request, has_app_context
+from sqlalchemy import event
+
+SERVER_TIMING_HEADER = "Server-Timing"
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+IN_LIST = re.compile(r"\bIN \((?:\?, )*\?\)", re.IGNORECASE)
+WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Normalize statement so the same query with other parameters is equal
+    """
+    statement = STRING_LITERAL.sub("?", statement)
+    statement = NUMBER_LITERAL.sub("?", statement)
+    statement = WHITESPACE.sub(" ", statement).strip()
+    return IN_LIST.sub("IN (...)", statement)
+
+
+class QueryStats:
+
+    def __init__(self):
+        """
+        Queries issued in a request
+        """
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def record(self, statement: str, duration: float):
+        """
+        Register a query executed with its duration in seconds
+        """
+        self.count += 1
+        self.duration += duration
+        self.statements[fingerprint(statement)] += 1
+
+    def repeated(self, threshold=2) -> dict[str, int]:
+        """
+        Statements executed at least threshold times, usually a N+1
+        """
+        return {
+            statement: count
+            for statement, count in self.statements.most_common()
+            if count >= threshold
+        }
+
+    def report(self) -> str:
+        """
+        Readable summary of queries by statement
+        """
+        lines = [f"{self.count} queries in {self.duration * 1000:.1f}ms"]
+        lines += [
+            f"{count}x {statement}"
+            for statement, count in self.statements.most_common()
+        ]
+        return "\n".join(lines)
+
+
+def _before_cursor_execute(conn, cursor, *_):
+    conn.info.setdefault("query_start", {})[cursor] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, *_):
+    start = conn.info["query_start"].pop(cursor)
+    if has_app_context() and (stats := g.get("query_stats")) is not None:
+        stats.record(statement, time.perf_counter() - start)
+
+
+def _discard_query_start(context):
+    """
+    Drop start of a failed statement, so it is not left in pooled connection
+    """
+    if context.connection is not None and context.execution_context is not None:
+        context.connection.info.get("query_start", {}).pop(
+            context.execution_context.cursor, None)
+
+
+def _start_query_stats():
+    g.query_stats = QueryStats()
+
+
+def _finish_query_stats(app):
+
+    def finish(response):
+        stats = g.pop("query_stats", None)
+        if stats is None:
+            return response
+
+        response.headers.add(
+            SERVER_TIMING_HEADER,
+            f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries"')
+
+        repeated = stats.repeated(app.config["QUERY_STATS_REPEATED"])
+        level = logging.WARNING if repeated or stats.count > app.config[
+            "QUERY_STATS_MAX_COUNT"] else logging.DEBUG
+        if app.logger.isEnabledFor(level):
+            app.logger.log(
+                level,
+                json.dumps({
+                    "event": "query_stats",
+                    "method": request.method,
+                    "path": request.path,
+                    "status": response.status_code,
+                    "queries": stats.count,
+                    "db_ms": round(stats.duration * 1000, 2),
+                    "repeated": repeated
+                }))
+
+        g.last_query_stats = stats
+        return response
+
+    return finish
+
+
+def track_queries(engine):
+    """
+    Record queries of engine in stats of current request
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _discard_query_start)
+
+
+def init_query_stats(app, engines):
+    """
+    Count queries and database time of each request of app, exposed in
+    Server-Timing header and logged when there are too many or repeated
+        parameters:
+            app (Flask): application
+            engines (list[Engine]): engines of app to instrument
+    """
+    for engine in engines:
+        track_queries(engine)
+
+    app.before_request(_start_query_stats)
+    app.after_request(_finish_query_stats(app))
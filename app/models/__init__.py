@@ -1,9 +1,11 @@
 from datetime import datetime, date, time, timedelta
 
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import Column, Integer, DateTime
+from sqlalchemy import Column, Integer, DateTime, inspect
+from sqlalchemy.dialects import mysql
 from sqlalchemy.orm import DeclarativeBase
 from .enums import ClinicType
+from .routing import RoutingSession
 
 
 class DefaultModel(DeclarativeBase):
@@ -26,23 +28,43 @@ class DefaultModel(DeclarativeBase):
         """
         obj_dict = self.as_dict()
 
-        for key, value in obj_dict.items():
-            if isinstance(value, (
-                    date,
-                    time,
-            )):
-                obj_dict[key] = value.isoformat()
-            elif isinstance(value, timedelta):
-                obj_dict[key] = str(value)
-            elif isinstance(value, tuple):
-                obj_dict[key] = list(value)
+        for key, convert in json_converters(type(self)).items():
+            if obj_dict.get(key) is not None:
+                obj_dict[key] = convert(obj_dict[key])
 
         return obj_dict
 
 
+_JSON_CONVERTERS = {}
+
+
+def json_converters(model) -> dict:
+    """
+    Obtain converters to json of model attributes by column type, computed once by model
+    """
+    converters = _JSON_CONVERTERS.get(model)
+    if converters is None:
+        converters = {}
+        for attr in inspect(model).column_attrs:
+            try:
+                python_type = attr.columns[0].type.python_type
+            except NotImplementedError:
+                continue
+            if issubclass(python_type, (date, time)):
+                converters[attr.key] = python_type.isoformat
+            elif issubclass(python_type, timedelta):
+                converters[attr.key] = str
+        _JSON_CONVERTERS[model] = converters
+    return converters
+
+
+# datetime with microseconds, etags of rows changed twice in a second differ
+Timestamp = DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql")
+
+
 class TimestampMixin():
-    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
-    updated_at = Column(DateTime, onupdate=datetime.utcnow)
+    created_at = Column(Timestamp, nullable=False, default=datetime.utcnow)
+    updated_at = Column(Timestamp, onupdate=datetime.utcnow)
 
 
 def result_to_json(result, first=False, **serialize):
@@ -71,7 +93,8 @@ def result_to_json(result, first=False, **serialize):
     return rows
 
 
-db = SQLAlchemy(model_class=DefaultModel)
+db = SQLAlchemy(model_class=DefaultModel,
+                session_options={"class_": RoutingSession})
 
 session = db.session
 select = db.select
@@ -87,5 +110,7 @@ from .acting import Acting
 from .schedule import Schedule
 from .patient import Patient
 from .appointment import Appointment
+from .occupancy import ScheduleOccupancy
+from .search import SearchDocument, SearchTrigram
 
 from .init_data import set_up_data
@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, Column, ForeignKey
+from sqlalchemy import Integer, Column, ForeignKey, Index
 
 from . import db, TimestampMixin
 
@@ -14,3 +14,7 @@ class Acting(TimestampMixin, db.Model):
                           ForeignKey('specialties.id'),
                           nullable=False)
     clinic_id = Column(Integer, ForeignKey('clinics.id'), nullable=False)
+
+    __table_args__ = (Index("ix_actuations_clinic_specialty", "clinic_id",
+                            "specialty_id"),
+                      Index("ix_actuations_created_at_id", "created_at", "id"))
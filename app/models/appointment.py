@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Text, SmallInteger, Integer, Date
+from sqlalchemy import Column, ForeignKey, Text, SmallInteger, Integer, Date, Index
 
 from . import db, TimestampMixin
 from ..validations import Validator
@@ -16,6 +16,11 @@ class Appointment(TimestampMixin, db.Model):
     patient_id = Column(Integer, ForeignKey('patients.id'), nullable=False)
     acting_id = Column(Integer, ForeignKey('actuations.id'), nullable=False)
 
+    __table_args__ = (Index("ix_appointments_acting_day_start", "acting_id",
+                            "scheduled_day", "start_time"),
+                      Index("ix_appointments_day_start_end", "scheduled_day",
+                            "start_time", "end_time", "id"))
+
     validators = {
         "scheduled_day": Validator("scheduled_day").required().date(),
         "start_time": Validator("start_time").required().number(),
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, CHAR, Enum
+from sqlalchemy import Column, String, CHAR, Enum, Index, UniqueConstraint
 
 from . import db, TimestampMixin, ClinicType
 from ..validations import Validator
@@ -8,13 +8,17 @@ class Clinic(TimestampMixin, db.Model):
     __tablename__ = "clinics"
 
     name = Column(String(255), nullable=False)
-    phone = Column(CHAR(10), nullable=False, unique=True)
-    cnpj = Column(CHAR(14), nullable=False, unique=True)
+    phone = Column(CHAR(10), nullable=False)
+    cnpj = Column(CHAR(14), nullable=False)
     type = Column(Enum(ClinicType))
     address = Column(String(255), nullable=False)
     longitude = Column(String(45))
     latitude = Column(String(45))
 
+    __table_args__ = (UniqueConstraint("phone", name="uq_clinics_phone"),
+                      UniqueConstraint("cnpj", name="uq_clinics_cnpj"),
+                      Index("ix_clinics_created_at_id", "created_at", "id"))
+
     validators = {
         "name": Validator("name").required().length(2, 255),
         "phone": Validator("phone").required().phone(),
@@ -1,7 +1,7 @@
 from flask import Flask
-from passlib.hash import pbkdf2_sha256
 
 from . import User, Clinic
+from ..helpers.passwords import hash_password
 
 
 def set_up_data(db):
@@ -25,7 +25,7 @@ def set_up_data(db):
         user = User(name="Admin",
                     username="admin",
                     email="admin@consuchat.com",
-                    password=pbkdf2_sha256.hash("admin"),
+                    password=hash_password("admin"),
                     clinic_id=clinic_id)
         db.session.add(user)
         db.session.commit()
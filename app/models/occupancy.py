@@ -0,0 +1,306 @@
+from datetime import date
+from collections import defaultdict
+
+from sqlalchemy import Column, ForeignKey, SmallInteger, Integer, Date, UniqueConstraint, func, bindparam, tuple_, or_
+
+from . import db, session, select, delete, insert, update
+from .schedule import Schedule
+from .appointment import Appointment
+
+# schedules whose occupancy changed in transaction, None stands for all
+# schedules, read by caches of calendar
+CHANGED_SCHEDULES = "occupancy_changed_schedules"
+
+
+class ScheduleOccupancy(db.Model):
+    __tablename__ = "schedule_occupancy"
+
+    schedule_id = Column(Integer,
+                         ForeignKey('schedules.id', ondelete="CASCADE"),
+                         nullable=False)
+    scheduled_day = Column(Date, nullable=False)
+    booked = Column(SmallInteger, nullable=False, default=0)
+
+    __table_args__ = (UniqueConstraint("schedule_id",
+                                       "scheduled_day",
+                                       name="uq_schedule_occupancy_day"), )
+
+
+def mark_changed(*schedule_ids):
+    """
+    Record schedules whose occupancy changed in current transaction
+    """
+    session.info.setdefault(CHANGED_SCHEDULES, set()).update(schedule_ids)
+
+
+def get_schedules_of_appointment(acting_id, scheduled_day: date,
+                                 start_time: int) -> list[int]:
+    """
+    Obtain ids of schedules that cover an appointment
+    """
+    return list(
+        session.execute(
+            select(Schedule.id).where(
+                Schedule.acting_id == acting_id,
+                Schedule.week_day == scheduled_day.weekday(),
+                Schedule.start_time <= start_time,
+                Schedule.end_time > start_time)).scalars())
+
+
+def get_schedules_capacity(acting_id, scheduled_day: date,
+                           start_time: int) -> dict[int, int]:
+    """
+    Obtain max visits of schedules that cover an appointment
+        returns:
+            dict with schedule id as key and max visits as value
+    """
+    return dict(
+        session.execute(
+            select(Schedule.id, Schedule.max_visits).where(
+                Schedule.acting_id == acting_id,
+                Schedule.week_day == scheduled_day.weekday(),
+                Schedule.start_time <= start_time,
+                Schedule.end_time > start_time)).tuples().all())
+
+
+def get_actings_schedules(acting_ids) -> dict[int, list]:
+    """
+    Obtain weekly schedules of actings
+        returns:
+            dict with acting id as key and list of schedules rows as value
+    """
+    schedules = defaultdict(list)
+    for schedule in session.execute(
+            select(Schedule.id, Schedule.acting_id, Schedule.week_day,
+                   Schedule.start_time, Schedule.end_time,
+                   Schedule.max_visits).where(
+                       Schedule.acting_id.in_(acting_ids),
+                       Schedule.week_day.is_not(None))).all():
+        schedules[schedule.acting_id].append(schedule)
+
+    return schedules
+
+
+def get_booked_visits(schedule_ids, first_day: date,
+                      last_day: date) -> dict[tuple[int, date], int]:
+    """
+    Obtain booked visits of schedules in period
+        returns:
+            dict with (schedule id, day) as key and booked visits as value
+    """
+    return {(row.schedule_id, row.scheduled_day): row.booked
+            for row in session.execute(
+                select(ScheduleOccupancy.schedule_id,
+                       ScheduleOccupancy.scheduled_day,
+                       ScheduleOccupancy.booked).where(
+                           ScheduleOccupancy.schedule_id.in_(schedule_ids),
+                           ScheduleOccupancy.scheduled_day.between(
+                               first_day, last_day))).all()}
+
+
+def existing_occupancies(keys) -> set[tuple[int, date]]:
+    """
+    Obtain (schedule id, day) of keys whose occupancy rows exist
+    """
+    return set(
+        session.execute(
+            select(ScheduleOccupancy.schedule_id,
+                   ScheduleOccupancy.scheduled_day).where(
+                       tuple_(ScheduleOccupancy.schedule_id,
+                              ScheduleOccupancy.scheduled_day).in_(
+                                  list(keys)))).tuples())
+
+
+def create_occupancies(keys):
+    """
+    Create occupancy rows of schedules in days with no visits booked, in
+    current transaction
+        parameters:
+            keys (list[tuple[int, date]]): (schedule id, day) of rows
+    """
+    # rows created meanwhile by concurrent bookings are kept
+    stmt = insert(ScheduleOccupancy).prefix_with(
+        "OR IGNORE", dialect="sqlite").prefix_with("IGNORE", dialect="mysql")
+    session.execute(stmt, [{
+        "schedule_id": schedule_id,
+        "scheduled_day": scheduled_day,
+        "booked": 0
+    } for schedule_id, scheduled_day in sorted(keys)])
+
+
+def _add_within_max_visits(amounts: dict[tuple[int, date], int],
+                           max_visits: dict[int, int]) -> bool:
+    table = ScheduleOccupancy.__table__
+    # visits reserved and released in one pass, so rows are locked in the
+    # same order by every transaction, rolled back whether any row is not
+    # updated
+    savepoint = session.begin_nested()
+    rowcount = session.connection().execute(
+        update(table).where(
+            table.c.schedule_id == bindparam("b_schedule_id"),
+            table.c.scheduled_day == bindparam("b_scheduled_day"),
+            or_(
+                bindparam("b_amount") < 0,
+                table.c.booked <= bindparam("b_max_booked"))).values(
+                    booked=table.c.booked + bindparam("b_amount")), [{
+                        "b_schedule_id": schedule_id,
+                        "b_scheduled_day": scheduled_day,
+                        "b_amount": amount,
+                        "b_max_booked": max_visits.get(schedule_id, 0) - amount
+                    } for (schedule_id, scheduled_day), amount in sorted(
+                        amounts.items())]).rowcount
+
+    if rowcount == len(amounts):
+        savepoint.commit()
+        return True
+    savepoint.rollback()
+    return False
+
+
+def reserve_occupancies(amounts: dict[tuple[int, date], int],
+                        max_visits: dict[int, int],
+                        missing=()) -> bool:
+    """
+    Add amounts to booked visits of schedules in days whether reserved ones
+    stay within max visits of schedules. Each row is checked and updated by
+    one conditional statement, so concurrent reservations of a day wait only
+    on its row and never overbook it
+        parameters:
+            amounts (dict[tuple[int, date], int]): visits to add, or to
+                release whether negative, by (schedule id, day)
+            max_visits (dict[int, int]): max visits by schedule id
+            missing (list[tuple[int, date]]): (schedule id, day) read before
+                as not booked yet, whose rows are created first
+        returns:
+            whether all amounts were added, otherwise some schedule is fully
+            booked in day and none was added
+    """
+    if not amounts:
+        return True
+
+    if missing:
+        create_occupancies(missing)
+    if not _add_within_max_visits(amounts, max_visits):
+        # some row is missing or fully booked, tried again with rows of days
+        # reserved created and days released without row skipped
+        existing = existing_occupancies(amounts.keys())
+        if created := {key
+                       for key, amount in amounts.items()
+                       if amount > 0} - existing:
+            create_occupancies(created)
+        amounts = {
+            key: amount
+            for key, amount in amounts.items() if amount > 0 or key in existing
+        }
+        if amounts and not _add_within_max_visits(amounts, max_visits):
+            return False
+
+    mark_changed(*{schedule_id for schedule_id, _ in amounts})
+    return True
+
+
+def reserve(acting_id, scheduled_day: date, start_time: int) -> bool:
+    """
+    Reserve a visit of a new appointment in every schedule that covers it
+        returns:
+            whether reserved, otherwise some schedule is fully booked and
+            transaction must be rolled back
+    """
+    max_visits = get_schedules_capacity(acting_id, scheduled_day, start_time)
+    return reserve_occupancies(
+        {(schedule_id, scheduled_day): 1
+         for schedule_id in max_visits}, max_visits)
+
+
+def reserve_move(previous: tuple, acting_id, scheduled_day: date,
+                 start_time: int) -> bool:
+    """
+    Move visit of an appointment to schedules that cover its new time,
+    reserving schedules not covering previous time and releasing the ones
+    no longer covering it at once
+        parameters:
+            previous (tuple): acting id, day and start time of appointment
+        returns:
+            whether reserved, see reserve
+    """
+    previous_keys = {
+        (schedule_id, previous[1])
+        for schedule_id in get_schedules_of_appointment(*previous)
+    }
+    max_visits = get_schedules_capacity(acting_id, scheduled_day, start_time)
+    keys = {(schedule_id, scheduled_day) for schedule_id in max_visits}
+
+    amounts = {key: 1 for key in keys - previous_keys}
+    amounts.update({key: -1 for key in previous_keys - keys})
+    return reserve_occupancies(amounts, max_visits)
+
+
+def release(acting_id, scheduled_day: date, start_time: int):
+    """
+    Unregister a removed appointment from occupancy of its schedules
+    """
+    reserve_occupancies({(schedule_id, scheduled_day): -1
+                         for schedule_id in get_schedules_of_appointment(
+                             acting_id, scheduled_day, start_time)}, {})
+
+
+def count_schedule_occupancy(schedule) -> list[dict]:
+    """
+    Count appointments of schedule grouped by day
+    """
+    stmt = select(Appointment.scheduled_day,
+                  func.count(Appointment.id).label("booked")).where(
+                      Appointment.acting_id == schedule.acting_id,
+                      Appointment.start_time >= schedule.start_time,
+                      Appointment.start_time < schedule.end_time).group_by(
+                          Appointment.scheduled_day)
+
+    return [{
+        "schedule_id": schedule.id,
+        "scheduled_day": row.scheduled_day,
+        "booked": row.booked
+    } for row in session.execute(stmt).all()
+        if row.scheduled_day.weekday() == schedule.week_day]
+
+
+def refresh_schedule_occupancy(schedule_id):
+    """
+    Recount occupancy of a schedule after it is created or changed
+    """
+    session.execute(
+        delete(ScheduleOccupancy).where(
+            ScheduleOccupancy.schedule_id == schedule_id))
+
+    schedule = session.execute(
+        select(Schedule.id, Schedule.acting_id, Schedule.week_day,
+               Schedule.start_time,
+               Schedule.end_time).where(Schedule.id == schedule_id)).first()
+
+    if schedule is not None and schedule.week_day is not None:
+        rows = count_schedule_occupancy(schedule)
+        if rows:
+            session.execute(insert(ScheduleOccupancy), rows)
+
+    mark_changed(schedule_id)
+
+
+def rebuild_occupancy() -> int:
+    """
+    Rebuild occupancy of all schedules from existing appointments
+        returns:
+            number of occupancy rows created
+    """
+    session.execute(delete(ScheduleOccupancy))
+
+    total = 0
+    for schedule in session.execute(
+            select(Schedule.id, Schedule.acting_id, Schedule.week_day,
+                   Schedule.start_time, Schedule.end_time).where(
+                       Schedule.week_day.is_not(None))).all():
+        rows = count_schedule_occupancy(schedule)
+        if rows:
+            session.execute(insert(ScheduleOccupancy), rows)
+            total += len(rows)
+
+    mark_changed(None)
+    return total
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Date, String, CHAR
+from sqlalchemy import Column, Date, String, CHAR, Index, UniqueConstraint
 
 from . import db, TimestampMixin
 from ..validations import Validator
@@ -8,12 +8,18 @@ class Patient(TimestampMixin, db.Model):
 
     __tablename__ = "patients"
     name = Column(String(255), nullable=False)
-    cpf = Column(CHAR(11), unique=True)
-    registration = Column(String(20), unique=True)
-    phone = Column(CHAR(10), nullable=False, unique=True)
+    cpf = Column(CHAR(11))
+    registration = Column(String(20))
+    phone = Column(CHAR(10), nullable=False)
     address = Column(String(255), default=None)
     birthdate = Column(Date, default=None)
 
+    __table_args__ = (UniqueConstraint("cpf", name="uq_patients_cpf"),
+                      UniqueConstraint("registration",
+                                       name="uq_patients_registration"),
+                      UniqueConstraint("phone", name="uq_patients_phone"),
+                      Index("ix_patients_created_at_id", "created_at", "id"))
+
     validators = {
         "name": Validator("name").required().length(2, 255),
         "cpf": Validator("cpf").cpf(),
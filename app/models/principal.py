@@ -0,0 +1,32 @@
+from sqlalchemy import select, union_all, literal, desc
+
+from . import User, Professional
+
+
+def principal_statement(username: str = None, email: str = None):
+    """
+    Statement of the login principal, active user or else professional, whose
+    username or email match. Each branch is a lookup in one index so login is
+    a single round trip
+        parameters:
+            username (str): username searched
+            email (str): email searched
+        returns:
+            select of id, name, username, email, picture, password and admin,
+            true for users, limited to one row
+    """
+    branches = []
+    for model, admin in ((User, True), (Professional, False)):
+        columns = (model.id, model.name, model.username, model.email,
+                   model.picture, model.password,
+                   literal(admin).label("admin"))
+        criteria = (User.active, ) if model is User else ()
+
+        if username is not None:
+            branches.append(
+                select(*columns).where(model.username == username, *criteria))
+        if email is not None:
+            branches.append(
+                select(*columns).where(model.email == email, *criteria))
+
+    return union_all(*branches).order_by(desc("admin")).limit(1)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, CHAR
+from sqlalchemy import Column, String, CHAR, Index, UniqueConstraint
 
 from . import db, TimestampMixin
 from ..validations import Validator
@@ -8,13 +8,20 @@ class Professional(TimestampMixin, db.Model):
 
     __tablename__ = "professionals"
     name = Column(String(255), nullable=False)
-    phone = Column(CHAR(10), nullable=False, unique=True)
+    phone = Column(CHAR(10), nullable=False)
     reg_number = Column(String(40))
     username = Column(String(45), nullable=False)
     email = Column(String(255), nullable=False)
-    password = Column(CHAR(87))
+    password = Column(String(255))
     picture = Column(String(255))
 
+    __table_args__ = (UniqueConstraint("phone", name="uq_professionals_phone"),
+                      Index("ix_professionals_username", "username",
+                            unique=True),
+                      Index("ix_professionals_email", "email", unique=True),
+                      Index("ix_professionals_created_at_id", "created_at",
+                            "id"))
+
     validators = {
         "name": Validator("name").required().length(2, 255),
         "phone": Validator("phone").required().phone(),
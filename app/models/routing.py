@@ -0,0 +1,27 @@
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+
+REPLICA_BIND = "replica"
+
+
+def use_replica():
+    """
+    Route reads of current request to read replica, until it writes
+    """
+    g.read_replica = True
+
+
+class RoutingSession(Session):
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        """
+        Select read replica engine for reads of requests routed to it whether
+        configured, writes and reads after them stay on primary
+        """
+        if bind is None and has_app_context() and g.get("read_replica"):
+            if self._flushing or (clause is not None and clause.is_dml):
+                g.read_replica = False
+            elif REPLICA_BIND in self._db.engines:
+                return self._db.engines[REPLICA_BIND]
+
+        return super().get_bind(mapper, clause, bind, **kwargs)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, SmallInteger, Integer, Date
+from sqlalchemy import Column, ForeignKey, SmallInteger, Integer, Date, Index
 
 from . import db, TimestampMixin
 from ..validations import Validator
@@ -16,6 +16,9 @@ class Schedule(TimestampMixin, db.Model):
 
     acting_id = Column(Integer, ForeignKey('actuations.id'), nullable=False)
 
+    __table_args__ = (Index("ix_schedules_acting_week_day", "acting_id",
+                            "week_day", "start_time", "id"), )
+
     validators = {
         "start_date": Validator("start_date").required().date(),
         "end_date": Validator("end_date").date(),
@@ -0,0 +1,175 @@
+import re
+import unicodedata
+
+from sqlalchemy import Column, Integer, String, Index, UniqueConstraint, func, false
+
+from . import db, session, select, delete, insert
+from ..utils import remove_mask
+
+NOT_ALPHANUMERIC = re.compile(r"[^a-z0-9]+")
+
+
+class SearchDocument(db.Model):
+    __tablename__ = "search_documents"
+
+    entity = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    content = Column(String(255), nullable=False)
+
+    __table_args__ = (UniqueConstraint("entity",
+                                       "entity_id",
+                                       name="uq_search_documents_entity"), )
+
+
+class SearchTrigram(db.Model):
+    __tablename__ = "search_trigrams"
+
+    entity = Column(String(20), nullable=False)
+    trigram = Column(String(3), nullable=False)
+    document_id = Column(Integer, nullable=False)
+
+    __table_args__ = (Index("ix_search_trigrams_entity_trigram", "entity",
+                            "trigram", "document_id"),
+                      Index("ix_search_trigrams_document", "document_id"))
+
+
+def normalize(text: str) -> str:
+    """
+    Fold accents, lower case and collapse everything not alphanumeric in a space
+    """
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return NOT_ALPHANUMERIC.sub(" ", text.lower()).strip()
+
+
+def trigrams(content: str) -> set[str]:
+    """
+    Obtain all sequences of three characters in normalized content
+    """
+    return {content[i:i + 3] for i in range(len(content) - 2)}
+
+
+def remove_documents(entity: str, entity_ids):
+    """
+    Remove documents of entities from search index
+    """
+    document_ids = select(SearchDocument.id).where(
+        SearchDocument.entity == entity,
+        SearchDocument.entity_id.in_(entity_ids)).scalar_subquery()
+
+    session.execute(
+        delete(SearchTrigram).where(SearchTrigram.document_id.in_(document_ids)))
+    session.execute(
+        delete(SearchDocument).where(SearchDocument.entity == entity,
+                                     SearchDocument.entity_id.in_(entity_ids)))
+
+
+def add_documents(entity: str, texts: dict[int, str]):
+    """
+    Add documents of entities not indexed yet to search index
+        parameters:
+            entity (str): name of entity, usually its table
+            texts (dict[int, str]): text to index by entity id
+    """
+    if not texts:
+        return
+
+    contents = {
+        entity_id: normalize(text)[:255]
+        for entity_id, text in texts.items()
+    }
+    session.execute(insert(SearchDocument), [{
+        "entity": entity,
+        "entity_id": entity_id,
+        "content": content
+    } for entity_id, content in contents.items()])
+
+    documents = session.execute(
+        select(SearchDocument.id, SearchDocument.entity_id).where(
+            SearchDocument.entity == entity,
+            SearchDocument.entity_id.in_(contents.keys()))).all()
+
+    rows = [{
+        "entity": entity,
+        "trigram": trigram,
+        "document_id": document.id
+    } for document in documents
+        for trigram in trigrams(contents[document.entity_id])]
+    if rows:
+        session.execute(insert(SearchTrigram), rows)
+
+
+def index_document(entity: str, entity_id: int, text: str):
+    """
+    Index or reindex text of an entity
+    """
+    remove_documents(entity, [entity_id])
+    add_documents(entity, {entity_id: text})
+
+
+def remove_document(entity: str, entity_id: int):
+    """
+    Remove an entity from search index
+    """
+    remove_documents(entity, [entity_id])
+
+
+def search_text(entity: str, id_column, text: str):
+    """
+    Criteria of entities whose indexed text contains the text searched
+        parameters:
+            entity (str): name of entity
+            id_column (Column): id column of entity
+            text (str): text searched, accents and case are ignored
+    """
+    term = normalize(text)
+
+    stmt = select(SearchDocument.entity_id).where(
+        SearchDocument.entity == entity,
+        SearchDocument.content.contains(term, autoescape=True))
+
+    if grams := trigrams(term):
+        stmt = stmt.where(
+            SearchDocument.id.in_(
+                select(SearchTrigram.document_id).where(
+                    SearchTrigram.entity == entity,
+                    SearchTrigram.trigram.in_(grams)).group_by(
+                        SearchTrigram.document_id).having(
+                            func.count(SearchTrigram.trigram) == len(grams))))
+
+    return id_column.in_(stmt)
+
+
+def search_digits(column, text: str):
+    """
+    Criteria of column starting with digits of text, a LIKE prefix served by
+    column index whatever the collation orders punctuation and digits
+    """
+    digits = remove_mask(text)
+    if not digits:
+        return false()
+
+    return column.startswith(digits, autoescape=True)
+
+
+def rebuild_search_index(entity: str, id_column, text_column,
+                         batch_size=1000) -> int:
+    """
+    Rebuild search index of all rows of an entity
+        returns:
+            number of documents indexed
+    """
+    session.execute(delete(SearchTrigram).where(SearchTrigram.entity == entity))
+    session.execute(
+        delete(SearchDocument).where(SearchDocument.entity == entity))
+
+    total = 0
+    last_id = 0
+    while rows := session.execute(
+            select(id_column, text_column).where(id_column > last_id).order_by(
+                id_column).limit(batch_size)).all():
+        add_documents(entity, {row[0]: row[1] for row in rows})
+        total += len(rows)
+        last_id = rows[-1][0]
+
+    return total
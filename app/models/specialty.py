@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String
+from sqlalchemy import Column, String, Index
 
 from . import db, TimestampMixin
 from ..validations import Validator
@@ -9,6 +9,9 @@ class Specialty(TimestampMixin, db.Model):
     __tablename__ = "specialties"
     description = Column(String(255), nullable=False)
 
+    __table_args__ = (Index("ix_specialties_created_at_id", "created_at",
+                            "id"), )
+
     validators = {
         "description": Validator("description").required().length(4, 255),
     }
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, CHAR, Integer, Boolean , ForeignKey
+from sqlalchemy import Column, String, Integer, Boolean , ForeignKey, Index
 
 from . import db, TimestampMixin
 from ..validations import Validator
@@ -10,12 +10,16 @@ class User(TimestampMixin, db.Model):
     name = Column(String(255), nullable=False)
     username = Column(String(45), nullable=False)
     email = Column(String(255), nullable=False)
-    password = Column(CHAR(87))
+    password = Column(String(255))
     picture = Column(String(255))
     active = Column(Boolean, nullable=False, default=True)
 
     clinic_id = Column(Integer, ForeignKey('clinics.id'), nullable=False)
 
+    __table_args__ = (Index("ix_users_username", "username", unique=True),
+                      Index("ix_users_email", "email", unique=True),
+                      Index("ix_users_created_at_id", "created_at", "id"))
+
     validators = {
         "name": Validator("name").required().length(2, 255),
         "username": Validator("username").required().length(5, 45),
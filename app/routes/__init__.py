@@ -1,8 +1,20 @@
 from flask import Blueprint, jsonify, request
 
+from ..models.routing import use_replica
+
 bp_api = Blueprint("api", "api", url_prefix="/api")
 bp_auth = Blueprint("auth", "auth", url_prefix="/auth")
 
+
+@bp_api.before_request
+def route_reads_to_replica():
+    """
+    Read from replica in GET requests, whether it is configured
+    """
+    if request.method == "GET":
+        use_replica()
+
+
 from . import patient, clinic, auth, user, \
     professional, specialty, acting, \
     schedule, appointment, calendar
@@ -1,6 +1,5 @@
 from flask import request, jsonify
-from sqlalchemy import desc, inspect
-from flasgger import swag_from
+from sqlalchemy import inspect
 
 from . import bp_api
 from ..models import Acting, Clinic, Professional, Specialty, session, select, delete, update
@@ -8,13 +7,19 @@ from ..exceptions import APIException, ValidationException, AuthorizationExcepti
 from ..utils import useless_params
 from ..constants import ResponseMessages, ValidationMessages
 from ..middlewares import token_required, only_admin
+from ..helpers.pagination import Keyset, paginate, cursor_headers
+from ..helpers.streaming import wants_stream, stream_rows
+from ..helpers.etag import conditional_etag, not_modified, etag_headers, versioned, joined_rows_etag, \
+    unversioned
+from ..helpers.calendar_cache import invalidate_actings, invalidate_clinics
 
-from ..docs import acting_specs
+from ..docs import swag_from, acting_specs
 
 PARAMETERS_FOR_POST_ACTING = ["professional_id", "clinic_id", "specialty_id"]
 
 PARAMETERS_FOR_GET_ACTING = [
-    "professional_id", "clinic_id", "specialty_id", "limit", "page", "order_by"
+    "professional_id", "clinic_id", "specialty_id", "limit", "page", "cursor",
+    "stream", "order_by"
 ]
 
 PARAMETERS_FOR_PUT_ACTING = ["professional_id", "clinic_id", "specialty_id"]
@@ -31,6 +36,11 @@ base_query = select(*inspect(Acting).attrs, *clinic_cols,
                             Acting.professional_id == Professional.id).join(
                                 Specialty, Acting.specialty_id == Specialty.id)
 
+# models whose rows are part of actuations responses
+VERSIONED_MODELS = (Acting, Clinic, Professional, Specialty)
+
+actuations_keyset = Keyset(Acting.created_at, Acting.id, descending=True)
+
 
 @bp_api.route("/actuations", methods=["POST"])
 @swag_from(acting_specs.post_acting)
@@ -91,15 +101,13 @@ def get_actuations(_):
     """
     params = request.args
     useless_params(params.keys(), PARAMETERS_FOR_GET_ACTING)
+    stream = wants_stream(params)
 
-    page = int(params.get("page") or 1)
-    limit = int(params.get("limit") or 20)
     professional_id = params.get("professional_id")
     clinic_id = params.get("clinic_id")
     specialty_id = params.get("specialty_id")
 
-    stmt = base_query.limit(limit).offset(
-        (page - 1) * limit).order_by(desc(Acting.created_at))
+    stmt = paginate(base_query, actuations_keyset, params, stream=stream)
 
     if professional_id is not None:
         stmt = stmt.filter(Acting.professional_id == professional_id)
@@ -108,8 +116,17 @@ def get_actuations(_):
     elif specialty_id is not None:
         stmt = stmt.filter(Acting.specialty_id == specialty_id)
 
-    actuations = [p._asdict() for p in session.execute(stmt).all()]
-    return jsonify(actuations), 200
+    if stream:
+        return stream_rows(stmt)
+
+    etag = conditional_etag(stmt, *VERSIONED_MODELS)
+    if (response := not_modified(etag)) is not None:
+        return response
+
+    actuations = session.execute(versioned(stmt, *VERSIONED_MODELS)).all()
+    return jsonify([unversioned(p) for p in actuations]), 200, cursor_headers(
+        actuations_keyset, actuations, params) | etag_headers(
+            etag or joined_rows_etag(actuations, len(VERSIONED_MODELS)))
 
 
 @bp_api.route("/actuations/<int:acting_id>", methods=["GET"])
@@ -120,13 +137,19 @@ def get_acting_by_id(_, acting_id):
     Get acting by id
     """
     stmt = base_query.filter(Acting.id == acting_id)
-    acting = session.execute(stmt).first()
+
+    etag = conditional_etag(stmt, *VERSIONED_MODELS)
+    if (response := not_modified(etag)) is not None:
+        return response
+
+    acting = session.execute(versioned(stmt, *VERSIONED_MODELS)).first()
 
     if acting is None:
         raise APIException(ResponseMessages.ENTITY_NOT_FOUND.format("Acting"),
                            status_code=404)
 
-    return jsonify(acting._asdict())
+    return jsonify(unversioned(acting)), 200, etag_headers(
+        etag or joined_rows_etag([acting], len(VERSIONED_MODELS)))
 
 
 # END GET actuations #
@@ -173,8 +196,12 @@ def update_acting(current_user, acting_id):
                 "specialty", body["specialty_id"])
         })
 
+    # clinic of schedules before acting moves to another clinic
+    invalidate_actings(acting_id)
     stmt = update(Acting).where(Acting.id == acting_id).values(**body)
     rowcount = session.execute(stmt).rowcount
+    if rowcount:
+        invalidate_clinics(body["clinic_id"])
     session.commit()
 
     if not rowcount:
@@ -198,6 +225,7 @@ def delete_acting(_, acting_id):
     """
     Delete acting by id
     """
+    invalidate_actings(acting_id)
     stmt = delete(Acting).where(Acting.id == acting_id)
     session.execute(stmt)
     session.commit()
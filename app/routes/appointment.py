@@ -1,25 +1,38 @@
+from collections import defaultdict
+
 from flask import request, jsonify
 from sqlalchemy import inspect, and_, or_
-from flasgger import swag_from
 
 from . import bp_api
-from ..models import Appointment, Acting, Patient, Clinic, Specialty, Professional, session, select, delete, update
+from ..models import Appointment, Acting, Patient, Clinic, Specialty, Professional, session, select, delete, insert, update
+from ..models.occupancy import release, reserve, reserve_move, reserve_occupancies, \
+    get_actings_schedules, get_booked_visits
 from ..exceptions import APIException, ValidationException, AuthorizationException
 from ..utils import useless_params
 from ..constants import ResponseMessages, ValidationMessages
 from ..validations import validate_payload, Validator
 from ..middlewares import token_required
+from ..helpers.pagination import Keyset, paginate, cursor_headers
+from ..helpers.streaming import wants_stream, stream_rows
+from ..helpers.etag import conditional_etag, not_modified, etag_headers, versioned, joined_rows_etag, \
+    unversioned
 
-from ..docs import appointment_specs
+from ..docs import swag_from, appointment_specs
 
 PARAMETERS_FOR_POST_APPOINTMENT = [
     "complaint", "prescription", "scheduled_day", "start_time", "end_time",
     "patient_id", "acting_id"
 ]
 
+PARAMETERS_FOR_POST_APPOINTMENTS_BULK = ["appointments"]
+
+MAX_BULK_APPOINTMENTS = 100
+BULK_RESERVE_ATTEMPTS = 3
+
 PARAMETERS_FOR_GET_APPOINTMENT = [
-    "acting_id", "patient_id", "limit", "page", "order_by", "professional_id",
-    "clinic_id", "specialty_id", "start_date", "end_date", "start_time"
+    "acting_id", "patient_id", "limit", "page", "cursor", "stream", "order_by",
+    "professional_id", "clinic_id", "specialty_id", "start_date", "end_date",
+    "start_time"
 ]
 
 PARAMETERS_FOR_PUT_APPOINTMENT = [
@@ -39,6 +52,12 @@ get_validators = {
     "start_time": Validator("start_time").number()
 }
 
+bulk_validators = {
+    **Appointment.validators,
+    "patient_id": Validator("patient_id").required().number(),
+    "acting_id": Validator("acting_id").required().number()
+}
+
 #  END Validators  #
 
 # QUERIES #
@@ -60,6 +79,16 @@ base_query = select(
                 Professional, Acting.professional_id == Professional.id).join(
                     Specialty, Acting.specialty_id == Specialty.id)
 
+# models whose rows are part of appointments responses
+VERSIONED_MODELS = (Appointment, Patient, Acting, Clinic, Professional,
+                    Specialty)
+
+appointments_keyset = Keyset(Appointment.scheduled_day,
+                             Appointment.start_time,
+                             Appointment.end_time,
+                             Appointment.id,
+                             nullable=("end_time", ))
+
 # END QUERIES #
 
 # POST appointment #
@@ -100,6 +129,15 @@ def create_appointment(current_user):
             "admin"] and acting.professional_id != current_user["id"]:
         raise AuthorizationException(ResponseMessages.NOT_AUHORIZED_OPERATION)
 
+    if not reserve(body["acting_id"], body["scheduled_day"],
+                   body["start_time"]):
+        session.rollback()
+        raise ValidationException({
+            "start_time":
+            ValidationMessages.SCHEDULE_FULLY_BOOKED.format(
+                body["scheduled_day"].isoformat(), body["start_time"])
+        })
+
     appointment = Appointment(**body)
     session.add(appointment)
     session.commit()
@@ -109,24 +147,199 @@ def create_appointment(current_user):
     return jsonify(appointment._asdict()), 201
 
 
-# END POST appointment #
+def validate_bulk_items(items: list) -> dict[str, str]:
+    """
+    Validate every appointment of bulk payload
+        returns:
+            validation messages by field prefixed with item position
+    """
+    errors = {}
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors[f"appointments[{i}]"] = \
+                ValidationMessages.NOT_AN_OBJECT.format(f"appointments[{i}]")
+            continue
+
+        useless_params(item.keys(), PARAMETERS_FOR_POST_APPOINTMENT)
+        try:
+            validate_payload(item, bulk_validators)
+        except ValidationException as err:
+            errors.update({
+                f"appointments[{i}].{field}": message
+                for field, message in err.errors.items()
+            })
+
+    return errors
+
+
+def check_bulk_capacity(items: list, schedules: dict,
+                        booked: dict) -> tuple[dict, dict]:
+    """
+    Check visits of appointments in their schedules, including the ones
+    reserved by previous items
+        returns:
+            validation messages of items whose schedule is fully booked and
+            visits to add by (schedule id, day)
+    """
+    errors = {}
+    reserved = defaultdict(int)
+    for i, item in enumerate(items):
+        day = item["scheduled_day"]
+        covering = [
+            sc for sc in schedules[item["acting_id"]]
+            if sc.week_day == day.weekday() and
+            sc.start_time <= item["start_time"] < sc.end_time
+        ]
+
+        if any(
+                booked.get((sc.id, day), 0) + reserved[(sc.id, day)] >=
+                sc.max_visits for sc in covering):
+            errors[f"appointments[{i}].start_time"] = \
+                ValidationMessages.SCHEDULE_FULLY_BOOKED.format(
+                    day.isoformat(), item["start_time"])
+            continue
+
+        for sc in covering:
+            reserved[(sc.id, day)] += 1
+
+    return errors, reserved
+
+
+def reserve_bulk_capacity(items: list, acting_ids) -> dict[str, str]:
+    """
+    Reserve visits of appointments checked as free, checking them again
+    whether concurrent bookings took them meanwhile
+        returns:
+            validation messages of items whose schedule is fully booked, all
+            items whether visits keep being taken after every attempt
+    """
+    schedules = get_actings_schedules(acting_ids)
+    schedule_ids = [sc.id for acting in schedules.values() for sc in acting]
+    max_visits = {
+        sc.id: sc.max_visits
+        for acting in schedules.values() for sc in acting
+    }
+    days = [item["scheduled_day"] for item in items]
+
+    for _ in range(BULK_RESERVE_ATTEMPTS):
+        booked = get_booked_visits(schedule_ids, min(days), max(days))
+        errors, reserved = check_bulk_capacity(items, schedules, booked)
+        if errors or reserve_occupancies(reserved, max_visits,
+                                         reserved.keys() - booked.keys()):
+            return errors
+        session.rollback()
+
+    return {
+        f"appointments[{i}].start_time":
+        ValidationMessages.SCHEDULE_FULLY_BOOKED.format(
+            item["scheduled_day"].isoformat(), item["start_time"])
+        for i, item in enumerate(items)
+    }
+
+
+def insert_appointments(items: list) -> list[int]:
+    """
+    Insert appointments in one statement
+        returns:
+            ids of appointments inserted
+    """
+    items = [{
+        field: item.get(field)
+        for field in PARAMETERS_FOR_POST_APPOINTMENT
+    } for item in items]
 
-# GET appointments #
+    stmt = insert(Appointment).values(items)
+    if session.get_bind().dialect.insert_returning:
+        return list(session.execute(stmt.returning(Appointment.id)).scalars())
 
+    # without RETURNING the ids of a multi row insert are not reliable
+    appointments = [Appointment(**item) for item in items]
+    session.add_all(appointments)
+    session.flush()
+    return [appointment.id for appointment in appointments]
 
-@bp_api.route("/appointments", methods=["GET"])
-@swag_from(appointment_specs.get_appointments)
+
+@bp_api.route("/appointments/bulk", methods=["POST"])
+@swag_from(appointment_specs.post_appointments_bulk)
 @token_required
-def get_appointments(_):
+def create_appointments_bulk(current_user):
     """
-    Get appointments
+    Create many appointments at once, none is created whether any is invalid
     """
-    params = {**request.args}
-    useless_params(params.keys(), PARAMETERS_FOR_GET_APPOINTMENT)
-    validate_payload(params, get_validators)
+    body = request.get_json()
+
+    useless_params(body.keys(), PARAMETERS_FOR_POST_APPOINTMENTS_BULK)
+
+    items = body.get("appointments")
+    if not isinstance(items, list) or not items:
+        raise ValidationException({
+            "appointments":
+            ValidationMessages.NOT_A_LIST.format("appointments")
+        })
+    if len(items) > MAX_BULK_APPOINTMENTS:
+        raise ValidationException({
+            "appointments":
+            ValidationMessages.MOST_ITEMS.format("appointments",
+                                                 MAX_BULK_APPOINTMENTS)
+        })
+
+    if errors := validate_bulk_items(items):
+        raise ValidationException(errors)
+
+    patient_ids = set(
+        session.execute(
+            select(Patient.id).where(
+                Patient.id.in_({item["patient_id"]
+                                for item in items}))).scalars())
+    actings = {
+        acting.id: acting
+        for acting in session.execute(
+            select(Acting.id, Acting.professional_id).where(
+                Acting.id.in_({item["acting_id"]
+                               for item in items}))).all()
+    }
+
+    errors = {}
+    for i, item in enumerate(items):
+        if item["patient_id"] not in patient_ids:
+            errors[f"appointments[{i}].patient_id"] = \
+                ValidationMessages.NO_ENTITY_RELATIONSHIP.format(
+                    "patient", item["patient_id"])
+        if item["acting_id"] not in actings:
+            errors[f"appointments[{i}].acting_id"] = \
+                ValidationMessages.NO_ENTITY_RELATIONSHIP.format(
+                    "acting", item["acting_id"])
+    if errors:
+        raise ValidationException(errors)
+
+    if not current_user["admin"]:
+        for acting in actings.values():
+            if acting.professional_id != current_user["id"]:
+                raise AuthorizationException(
+                    ResponseMessages.NOT_AUHORIZED_OPERATION)
+
+    if errors := reserve_bulk_capacity(items, actings.keys()):
+        session.rollback()
+        raise ValidationException(errors)
+
+    appointment_ids = insert_appointments(items)
+    session.commit()
+
+    stmt = base_query.filter(Appointment.id.in_(appointment_ids)).order_by(
+        Appointment.id)
+    appointments = session.execute(stmt).all()
+    return jsonify([p._asdict() for p in appointments]), 201
+
+
+# END POST appointment #
+
+# GET appointments #
 
-    page = int(params.get("page") or 1)
-    limit = int(params.get("limit") or 20)
+
+def appointments_statement(params: dict, stream=False):
+    """
+    Statement of appointments page filtered by validated params
+    """
     start_date = params.get("start_date")
     end_date = params.get("end_date")
     start_time = params.get("start_time")
@@ -136,10 +349,7 @@ def get_appointments(_):
     professional_id = params.get("professional_id")
     specialty_id = params.get("specialty_id")
 
-    stmt = base_query.limit(limit).offset(
-        (page - 1) * limit).order_by(Appointment.scheduled_day,
-                                     Appointment.start_time,
-                                     Appointment.end_time)
+    stmt = paginate(base_query, appointments_keyset, params, stream=stream)
 
     if start_date is not None:
         stmt = stmt.filter(Appointment.scheduled_day >= start_date)
@@ -162,8 +372,34 @@ def get_appointments(_):
     if specialty_id is not None:
         stmt = stmt.filter(Specialty.id == specialty_id)
 
-    appointments = [p._asdict() for p in session.execute(stmt).all()]
-    return jsonify(appointments), 200
+    return stmt
+
+
+@bp_api.route("/appointments", methods=["GET"])
+@swag_from(appointment_specs.get_appointments)
+@token_required
+def get_appointments(_):
+    """
+    Get appointments
+    """
+    params = {**request.args}
+    useless_params(params.keys(), PARAMETERS_FOR_GET_APPOINTMENT)
+    validate_payload(params, get_validators)
+    stream = wants_stream(params)
+
+    stmt = appointments_statement(params, stream)
+
+    if stream:
+        return stream_rows(stmt)
+
+    etag = conditional_etag(stmt, *VERSIONED_MODELS)
+    if (response := not_modified(etag)) is not None:
+        return response
+
+    appointments = session.execute(versioned(stmt, *VERSIONED_MODELS)).all()
+    return jsonify([unversioned(p) for p in appointments]), 200, cursor_headers(
+        appointments_keyset, appointments, params) | etag_headers(
+            etag or joined_rows_etag(appointments, len(VERSIONED_MODELS)))
 
 
 @bp_api.route("/appointments/<int:appointment_id>", methods=["GET"])
@@ -174,14 +410,20 @@ def get_appointment_by_id(_, appointment_id):
     Get appointment by id
     """
     stmt = base_query.filter(Appointment.id == appointment_id)
-    appointment = session.execute(stmt).first()
+
+    etag = conditional_etag(stmt, *VERSIONED_MODELS)
+    if (response := not_modified(etag)) is not None:
+        return response
+
+    appointment = session.execute(versioned(stmt, *VERSIONED_MODELS)).first()
 
     if appointment is None:
         raise APIException(
             ResponseMessages.ENTITY_NOT_FOUND.format("Appointment"),
             status_code=404)
 
-    return jsonify(appointment._asdict())
+    return jsonify(unversioned(appointment)), 200, etag_headers(
+        etag or joined_rows_etag([appointment], len(VERSIONED_MODELS)))
 
 
 # END GET appointments #
@@ -231,6 +473,22 @@ def update_appointment(current_user, appointment_id):
             raise AuthorizationException(
                 ResponseMessages.NOT_AUHORIZED_OPERATION)
 
+    # locked until commit, so concurrent moves of appointment wait for it
+    previous = session.execute(
+        select(Appointment.acting_id, Appointment.scheduled_day,
+               Appointment.start_time).where(
+                   Appointment.id == appointment_id).with_for_update()).first()
+
+    if previous is not None and not reserve_move(
+            tuple(previous), body["acting_id"], body["scheduled_day"],
+            body["start_time"]):
+        session.rollback()
+        raise ValidationException({
+            "start_time":
+            ValidationMessages.SCHEDULE_FULLY_BOOKED.format(
+                body["scheduled_day"].isoformat(), body["start_time"])
+        })
+
     stmt = update(Appointment).where(Appointment.id == appointment_id).values(
         **body)
     rowcount = session.execute(stmt).rowcount
@@ -265,9 +523,17 @@ def delete_appointment(current_user, appointment_id):
             raise AuthorizationException(
                 ResponseMessages.NOT_AUHORIZED_OPERATION)
 
-    stmt = delete(Appointment).where(Appointment.id == appointment_id)
-    session.execute(stmt)
-    session.commit()
+    # locked until commit, so concurrent deletes release its visit once
+    previous = session.execute(
+        select(Appointment.acting_id, Appointment.scheduled_day,
+               Appointment.start_time).where(
+                   Appointment.id == appointment_id).with_for_update()).first()
+
+    if previous is not None:
+        stmt = delete(Appointment).where(Appointment.id == appointment_id)
+        if session.execute(stmt).rowcount:
+            release(*previous)
+        session.commit()
 
     return "", 204
 
@@ -2,18 +2,15 @@ import datetime
 
 import jwt
 from flask import request, jsonify, current_app
-from passlib.hash import pbkdf2_sha256
-from sqlalchemy import or_, and_
-from flasgger import swag_from
 
 from google.oauth2 import id_token
-from google.auth.transport import requests
 
 from . import bp_auth
-from ..models import session, select, update, User, Professional
+from ..models import session, update, User, Professional
+from ..models.principal import principal_statement
 from ..helpers.auth import get_header_token, decode_token
 
-from ..docs import auth_specs
+from ..docs import swag_from, auth_specs
 
 
 @bp_auth.route("/signin", methods=["POST"])
@@ -34,22 +31,27 @@ def signin():
     if not username or not password:
         return jsonify({"message": "credentials required"}), 401
 
-    admin = True
-    first_part_stmt = or_(User.username == username, User.email == username)
-    user = session.execute(select(User).where(and_(first_part_stmt, User.active))).scalar()
+    user = session.execute(principal_statement(username, username)).first()
 
-    if user is None:
-        admin = False
-        user = session.execute(select(Professional).where(
-            or_(Professional.username == username, Professional.email == username))).scalar()
+    verified, new_hash = current_app.extensions["password_hasher"].verify(
+        password, user.password) if user and user.password else (False, None)
 
-    if user and user.password and pbkdf2_sha256.verify(password, user.password):
-        access_token = get_jwt_token(user, admin, current_app.config["ACCESS_TOKEN_EXPIRE"], "HS256")
+    if verified:
+        tokens = {
+            "access_token":
+            get_jwt_token(user, user.admin, current_app.config["ACCESS_TOKEN_EXPIRE"], "HS256")
+        }
         if remember_me and remember_me != "false":
-            session_token = get_jwt_token(user, admin, current_app.config["SESSION_TOKEN_EXPIRE"], "HS512")
-            return jsonify({"access_token": access_token, "session_token": session_token}), 200
+            tokens["session_token"] = get_jwt_token(user, user.admin, current_app.config["SESSION_TOKEN_EXPIRE"], "HS512")
 
-        return jsonify({"access_token": access_token}), 200
+        if new_hash is not None:
+            # stored hash has other parameters than configured ones
+            model = User if user.admin else Professional
+            session.execute(
+                update(model).where(model.id == user.id).values(password=new_hash))
+            session.commit()
+
+        return jsonify(tokens), 200
 
     return jsonify({"message": "username or password wrong"}), 401
 
@@ -107,20 +109,18 @@ def signin_google():
         return jsonify({"message": "credentials required"}), 401
 
     try:
-        user_google_info = id_token.verify_oauth2_token(token, requests.Request(),
+        user_google_info = id_token.verify_oauth2_token(token, current_app.extensions["google_request"],
                                                         current_app.config["GOOGLE_OAUTH_CLIENTID"])
 
-        admin = True
-        user = session.execute(select(User).where(and_(User.email == user_google_info["email"], User.active))).scalar()
-
-        if user is None:
-            admin = False
-            user = session.execute(select(Professional).where(Professional.email == user_google_info["email"])).scalar()
+        stmt = principal_statement(email=user_google_info["email"])
+        user = session.execute(stmt).first()
+        admin = user is not None and user.admin
 
         if user and not user.picture and "picture" in user_google_info:
-            user.picture = user_google_info["picture"]
-            session.execute(update(user.__class__).where(user.__class__.id == user.id).values(picture=user.picture))
+            model = User if admin else Professional
+            session.execute(update(model).where(model.id == user.id).values(picture=user_google_info["picture"]))
             session.commit()
+            user = session.execute(stmt).first()
 
         if user:
             access_token = get_jwt_token(user, admin, current_app.config["ACCESS_TOKEN_EXPIRE"], "HS256")
@@ -135,7 +135,7 @@ def signin_google():
     return jsonify({"message": "not authorized user"}), 401
 
 
-def get_jwt_token(user: User, admin: bool, expire, algorithm):
+def get_jwt_token(user, admin: bool, expire, algorithm):
     '''
     Get access token
     '''
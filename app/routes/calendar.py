@@ -1,15 +1,13 @@
-from datetime import timedelta
-
-from flask import request, jsonify
-from sqlalchemy import desc, func, inspect
-from flasgger import swag_from
+from flask import Response, current_app, request, jsonify
+from sqlalchemy import desc, func, inspect, and_
 
 from . import bp_api
-from ..models import Appointment, Acting, Specialty, Professional, Schedule, session, select
+from ..models import Acting, Specialty, Professional, Schedule, ScheduleOccupancy, session, select
 from ..middlewares import token_required
 from ..validations import Validator, validate_payload
+from ..helpers.calendar import find_free_days
 
-from ..docs import calendar_specs
+from ..docs import swag_from, calendar_specs
 
 #  Validators  #
 
@@ -36,10 +34,25 @@ SCHEDULE_FIELDS = (
     Specialty.description.label("specialty_description"),
 )
 
-COUNT_APPOINTMENTS = select(func.count(Appointment.id)).where(
-    Appointment.start_time >= Schedule.start_time,
-    Appointment.start_time < Schedule.end_time,
-    Appointment.acting_id == Acting.id)
+
+def available_schedules_statement(clinic_id, specialty_id, day):
+    """
+    Statement of schedules of specialty in clinic with visits to book in day
+    """
+    return select(*SCHEDULE_FIELDS).distinct().join(
+        Acting, Acting.id == Schedule.acting_id
+    ).join(Professional, Acting.professional_id == Professional.id).join(
+        Specialty, Acting.specialty_id == Specialty.id).outerjoin(
+            ScheduleOccupancy,
+            and_(ScheduleOccupancy.schedule_id == Schedule.id,
+                 ScheduleOccupancy.scheduled_day == day)).where(
+                     Acting.clinic_id == clinic_id,
+                     Acting.specialty_id == specialty_id,
+                     Schedule.week_day == day.weekday(),
+                     Schedule.max_visits > func.coalesce(
+                         ScheduleOccupancy.booked, 0)).order_by(
+                             Schedule.start_time)
+
 
 # END QUERIES #
 
@@ -56,6 +69,11 @@ def get_specialties_availables(_):
 
     clinic_id = params.get("clinic_id")
 
+    cache = current_app.extensions["calendar_cache"]
+    key, content = cache.get("specialties", clinic_id)
+    if content is not None:
+        return Response(content, mimetype="application/json"), 200
+
     stmt = select(*SPECIALTY_FIELDS).distinct().join(
         Acting, Acting.specialty_id == Specialty.id).join(
             Schedule, Acting.id == Schedule.acting_id).where(
@@ -64,7 +82,10 @@ def get_specialties_availables(_):
 
     specialties = [p._asdict() for p in session.execute(stmt).all()]
 
-    return jsonify(specialties), 200
+    response = jsonify(specialties)
+    cache.set(key, response.get_data())
+
+    return response, 200
 
 
 @bp_api.route("/calendar/free/days", methods=["GET"])
@@ -83,42 +104,8 @@ def get_free_days(_):
     start_date = params.get("start_date")
     first_day_startime = params.get("first_day_startime") or 0
 
-    free_days = []
-
-    stmt = select(Schedule.week_day).distinct().join(
-        Acting, Acting.id == Schedule.acting_id).where(
-            Acting.clinic_id == clinic_id,
-            Acting.specialty_id == specialty_id).order_by(Schedule.week_day)
-
-    week_days = list(session.execute(stmt).scalars())
-    base_stmt = select(Schedule.id).join(
-        Acting, Acting.id == Schedule.acting_id).where(
-            Acting.clinic_id == clinic_id, Acting.specialty_id == specialty_id)
-
-    if start_date.weekday() in week_days:
-        stmt = base_stmt.where(
-            Schedule.week_day == start_date.weekday(),
-            Schedule.start_time > first_day_startime,
-            Schedule.max_visits > COUNT_APPOINTMENTS.where(
-                Appointment.scheduled_day == start_date).scalar_subquery())
-
-        if session.execute(stmt).first():
-            free_days.append(start_date)
-            num_days -= 1
-
-    current_date = start_date
-    while week_days and num_days > 0:
-        current_date = current_date + timedelta(days=1)
-        if current_date.weekday() not in week_days:
-            continue
-        stmt = base_stmt.where(
-            Schedule.week_day == current_date.weekday(),
-            Schedule.max_visits > COUNT_APPOINTMENTS.where(
-                Appointment.scheduled_day == current_date).scalar_subquery())
-
-        if session.execute(stmt).first():
-            free_days.append(current_date)
-            num_days -= 1
+    free_days = find_free_days(clinic_id, specialty_id, start_date, num_days,
+                               first_day_startime)
 
     return jsonify(free_days), 200
 
@@ -137,16 +124,16 @@ def get_available_schedules(_):
     specialty_id = params.get("specialty_id")
     day = params.get("day")
 
-    stmt = select(*SCHEDULE_FIELDS).distinct().join(
-        Acting, Acting.id == Schedule.acting_id
-    ).join(Professional, Acting.professional_id == Professional.id).join(
-        Specialty, Acting.specialty_id == Specialty.id).where(
-            Acting.clinic_id == clinic_id, Acting.specialty_id == specialty_id,
-            Schedule.week_day == day.weekday(),
-            Schedule.max_visits > COUNT_APPOINTMENTS.where(
-                Appointment.scheduled_day == day).scalar_subquery()).order_by(
-                    Schedule.start_time)
+    cache = current_app.extensions["calendar_cache"]
+    key, content = cache.get("schedules", clinic_id, specialty_id, day)
+    if content is not None:
+        return Response(content, mimetype="application/json"), 200
+
+    stmt = available_schedules_statement(clinic_id, specialty_id, day)
 
     free_schedules = [sc._asdict() for sc in session.execute(stmt).all()]
 
-    return jsonify(free_schedules), 200
+    response = jsonify(free_schedules)
+    cache.set(key, response.get_data())
+
+    return response, 200
@@ -1,29 +1,34 @@
 from flask import request, jsonify
-from sqlalchemy import desc
-from flasgger import swag_from
 
 from . import bp_api
 from ..models import Clinic, session, select, delete, update, ClinicType
-from ..exceptions import APIException, ValidationException
+from ..exceptions import APIException
 from ..utils import useless_params
-from ..constants import ResponseMessages, ValidationMessages
+from ..constants import ResponseMessages
 from ..validations import validate_payload
 from ..middlewares import token_required, only_admin
+from ..helpers.pagination import Keyset, paginate, cursor_headers
+from ..helpers.streaming import wants_stream, stream_rows
+from ..helpers.etag import conditional_etag, not_modified, etag_headers, rows_etag
+from ..helpers.calendar_cache import invalidate_clinics
 
-from ..docs import clinic_specs
+from ..docs import swag_from, clinic_specs
 
 PARAMETERS_FOR_POST_CLINIC = [
     "name", "cnpj", "phone", "type", "address", "latitude", "longitude"
 ]
 
 PARAMETERS_FOR_GET_CLINIC = [
-    "name", "cnpj", "phone", "limit", "type", "page", "order_by"
+    "name", "cnpj", "phone", "limit", "type", "page", "cursor", "stream",
+    "order_by"
 ]
 
 PARAMETERS_FOR_PUT_CLINIC = [
     "name", "cnpj", "phone", "address", "type", "latitude", "longitude"
 ]
 
+clinics_keyset = Keyset(Clinic.created_at, Clinic.id, descending=True)
+
 # POST clinic #
 
 
@@ -40,20 +45,12 @@ def create_clinic(_):
     useless_params(body.keys(), PARAMETERS_FOR_POST_CLINIC)
     validate_payload(body, Clinic.validators)
 
-    if session.query(
-            Clinic.id).filter(Clinic.cnpj == body["cnpj"]).first() is not None:
-        raise ValidationException({"cnpj": ValidationMessages.CNPJ_REGISTERED})
-    if session.query(Clinic.id).filter(
-            Clinic.phone == body["phone"]).first() is not None:
-        raise ValidationException(
-            {"phone": ValidationMessages.PHONE_REGISTERED})
-
     clinic = Clinic(**body)
     session.add(clinic)
     session.commit()
     session.refresh(clinic)
 
-    return jsonify(clinic.as_json()), 201
+    return jsonify(clinic.as_dict()), 201
 
 
 # END POST clinic #
@@ -70,16 +67,14 @@ def get_clinics(_):
     """
     params = request.args
     useless_params(params.keys(), PARAMETERS_FOR_GET_CLINIC)
+    stream = wants_stream(params)
 
-    page = int(params.get("page") or 1)
-    limit = int(params.get("limit") or 20)
     name = params.get("name")
     cnpj = params.get("cnpj")
     phone = params.get("phone")
     clinic_type = params.get("type")
 
-    stmt = select(Clinic).limit(limit).offset(
-        (page - 1) * limit).order_by(desc(Clinic.created_at))
+    stmt = paginate(select(Clinic), clinics_keyset, params, stream=stream)
 
     if name is not None:
         stmt = stmt.filter(Clinic.name.like("%" + name + "%"))
@@ -93,9 +88,18 @@ def get_clinics(_):
     if clinic_type is not None:
         stmt = stmt.filter(Clinic.type == ClinicType(int(clinic_type)))
 
-    clinics = [p.as_json() for p in session.execute(stmt).scalars()]
+    if stream:
+        return stream_rows(stmt, scalars=True)
+
+    etag = conditional_etag(stmt, Clinic)
+    if (response := not_modified(etag)) is not None:
+        return response
 
-    return jsonify(clinics), 200
+    clinics = session.execute(stmt).scalars().all()
+
+    return jsonify([p.as_dict() for p in clinics]), 200, cursor_headers(
+        clinics_keyset, clinics, params) | etag_headers(
+            etag or rows_etag(clinics))
 
 
 @bp_api.route("/clinics/<int:clinic_id>", methods=["GET"])
@@ -106,13 +110,19 @@ def get_clinic_by_id(_, clinic_id):
     """
     Get clinic by id
     """
+    etag = conditional_etag(
+        select(Clinic).where(Clinic.id == clinic_id), Clinic)
+    if (response := not_modified(etag)) is not None:
+        return response
+
     clinic = session.get(Clinic, clinic_id)
 
     if clinic is None:
         raise APIException(ResponseMessages.ENTITY_NOT_FOUND.format("Clinic"),
                            status_code=404)
 
-    return jsonify(clinic.as_json())
+    return jsonify(clinic.as_dict()), 200, etag_headers(
+        etag or rows_etag([clinic]))
 
 
 @bp_api.route("/clinics/<string:clinic_cnpj>/cnpj", methods=["GET"])
@@ -130,7 +140,7 @@ def get_clinic_by_cnpj(_, clinic_cnpj):
         raise APIException(ResponseMessages.ENTITY_NOT_FOUND.format("Clinic"),
                            status_code=404)
 
-    return jsonify(clinic.as_json())
+    return jsonify(clinic.as_dict())
 
 
 @bp_api.route("/clinics/<string:clinic_phone>/phone", methods=["GET"])
@@ -148,7 +158,7 @@ def get_clinic_by_phone(_, clinic_phone):
         raise APIException(ResponseMessages.ENTITY_NOT_FOUND.format("Clinic"),
                            status_code=404)
 
-    return jsonify(clinic.as_json())
+    return jsonify(clinic.as_dict())
 
 
 # END GET clinics #
@@ -169,16 +179,6 @@ def update_clinic(_, clinic_id):
     useless_params(body.keys(), PARAMETERS_FOR_PUT_CLINIC)
     validate_payload(body, Clinic.validators)
 
-    if session.query(
-            Clinic.id).filter(Clinic.cnpj == body["cnpj"],
-                              Clinic.id != clinic_id).first() is not None:
-        raise ValidationException({"cnpj": ValidationMessages.CNPJ_REGISTERED})
-    if session.query(
-            Clinic.id).filter(Clinic.phone == body["phone"],
-                              Clinic.id != clinic_id).first() is not None:
-        raise ValidationException(
-            {"phone": ValidationMessages.PHONE_REGISTERED})
-
     stmt = update(Clinic).where(Clinic.id == clinic_id).values(**body)
     rowcount = session.execute(stmt).rowcount
     session.commit()
@@ -188,7 +188,7 @@ def update_clinic(_, clinic_id):
 
     clinic = session.get(Clinic, clinic_id)
 
-    return jsonify(clinic.as_json()), 200
+    return jsonify(clinic.as_dict()), 200
 
 
 # END PUT clinic #
@@ -206,6 +206,7 @@ def delete_clinic(_, clinic_id):
     """
     stmt = delete(Clinic).where(Clinic.id == clinic_id)
     session.execute(stmt)
+    invalidate_clinics(clinic_id)
     session.commit()
 
     return "", 204
@@ -1,25 +1,30 @@
 from flask import request, jsonify
-from sqlalchemy import desc
-from flasgger import swag_from
 
 from . import bp_api
 from ..models import Patient, session, select, delete, update
-from ..exceptions import APIException, ValidationException
+from ..models.search import index_document, remove_document, search_text, search_digits
+from ..exceptions import APIException
 from ..utils import useless_params
-from ..constants import ResponseMessages, ValidationMessages
+from ..constants import ResponseMessages
 from ..validations import validate_payload
 from ..middlewares import token_required
+from ..helpers.pagination import Keyset, paginate, cursor_headers
+from ..helpers.streaming import wants_stream, stream_rows
+from ..helpers.etag import conditional_etag, not_modified, etag_headers, rows_etag
 
-from ..docs import patient_specs
+from ..docs import swag_from, patient_specs
 
 PARAMETERS_FOR_POST_PATIENT = ["name", "cpf", "phone", "birthdate", "address", "registration"]
 
 PARAMETERS_FOR_GET_PATIENT = [
-    "name", "cpf", "phone", "limit", "page", "order_by", "registration"
+    "name", "cpf", "phone", "limit", "page", "cursor", "stream", "order_by",
+    "registration"
 ]
 
 PARAMETERS_FOR_PUT_PATIENT = ["name", "cpf", "phone", "birthdate", "registration"]
 
+patients_keyset = Keyset(Patient.created_at, Patient.id, descending=True)
+
 # POST patient #
 
 
@@ -35,23 +40,14 @@ def create_patient(_):
     useless_params(body.keys(), PARAMETERS_FOR_POST_PATIENT)
     validate_payload(body, Patient.validators)
 
-    if "cpf" in body and session.query(
-            Patient.id).filter(Patient.cpf == body["cpf"]).first() is not None:
-        raise ValidationException({"cpf": ValidationMessages.CPF_REGISTERED})
-    if "registration" in body and session.query(
-            Patient.id).filter(Patient.registration == body["registration"]).first() is not None:
-        raise ValidationException({"registration": ValidationMessages.REGISTRATION_REGISTERED})
-    if session.query(Patient.id).filter(
-            Patient.phone == body["phone"]).first() is not None:
-        raise ValidationException(
-            {"phone": ValidationMessages.PHONE_REGISTERED})
-
     patient = Patient(**body)
     session.add(patient)
+    session.flush()
+    index_document(Patient.__tablename__, patient.id, patient.name)
     session.commit()
     session.refresh(patient)
 
-    return jsonify(patient.as_json()), 201
+    return jsonify(patient.as_dict()), 201
 
 
 # END POST patient #
@@ -67,32 +63,39 @@ def get_patients(_):
     """
     params = request.args
     useless_params(params.keys(), PARAMETERS_FOR_GET_PATIENT)
+    stream = wants_stream(params)
 
-    page = int(params.get("page") or 1)
-    limit = int(params.get("limit") or 20)
     name = params.get("name")
     cpf = params.get("cpf")
     registration = params.get("registration")
     phone = params.get("phone")
 
-    stmt = select(Patient).limit(limit).offset(
-        (page - 1) * limit).order_by(desc(Patient.created_at))
+    stmt = paginate(select(Patient), patients_keyset, params, stream=stream)
 
     if name is not None:
-        stmt = stmt.filter(Patient.name.like("%" + name + "%"))
+        stmt = stmt.filter(search_text(Patient.__tablename__, Patient.id, name))
 
     if cpf is not None:
-        stmt = stmt.filter(Patient.cpf.like("%" + cpf + "%"))
+        stmt = stmt.filter(search_digits(Patient.cpf, cpf))
 
     if registration is not None:
         stmt = stmt.filter(Patient.registration.like("%" + registration + "%"))
 
     if phone is not None:
-        stmt = stmt.filter(Patient.phone.like("%" + phone + "%"))
+        stmt = stmt.filter(search_digits(Patient.phone, phone))
+
+    if stream:
+        return stream_rows(stmt, scalars=True)
 
-    patients = [p.as_json() for p in session.execute(stmt).scalars()]
+    etag = conditional_etag(stmt, Patient)
+    if (response := not_modified(etag)) is not None:
+        return response
 
-    return jsonify(patients), 200
+    patients = session.execute(stmt).scalars().all()
+
+    return jsonify([p.as_dict() for p in patients]), 200, cursor_headers(
+        patients_keyset, patients, params) | etag_headers(
+            etag or rows_etag(patients))
 
 
 @bp_api.route("/patients/<int:patient_id>", methods=["GET"])
@@ -102,13 +105,19 @@ def get_patient_by_id(_, patient_id):
     """
     Get patient by id
     """
+    etag = conditional_etag(
+        select(Patient).where(Patient.id == patient_id), Patient)
+    if (response := not_modified(etag)) is not None:
+        return response
+
     patient = session.get(Patient, patient_id)
 
     if patient is None:
         raise APIException(ResponseMessages.ENTITY_NOT_FOUND.format("Patient"),
                            status_code=404)
 
-    return jsonify(patient.as_json())
+    return jsonify(patient.as_dict()), 200, etag_headers(
+        etag or rows_etag([patient]))
 
 
 @bp_api.route("/patients/<string:patient_cpf>/cpf", methods=["GET"])
@@ -125,7 +134,7 @@ def get_patient_by_cpf(_, patient_cpf):
         raise APIException(ResponseMessages.ENTITY_NOT_FOUND.format("Patient"),
                            status_code=404)
 
-    return jsonify(patient.as_json())
+    return jsonify(patient.as_dict())
 
 
 @bp_api.route("/patients/<string:patient_registration>/registration", methods=["GET"])
@@ -142,7 +151,7 @@ def get_patient_by_registration(_, patient_registration):
         raise APIException(ResponseMessages.ENTITY_NOT_FOUND.format("Patient"),
                            status_code=404)
 
-    return jsonify(patient.as_json())
+    return jsonify(patient.as_dict())
 
 
 @bp_api.route("/patients/<string:patient_phone>/phone", methods=["GET"])
@@ -159,7 +168,7 @@ def get_patient_by_phone(_, patient_phone):
         raise APIException(ResponseMessages.ENTITY_NOT_FOUND.format("Patient"),
                            status_code=404)
 
-    return jsonify(patient.as_json())
+    return jsonify(patient.as_dict())
 
 
 # END GET patients #
@@ -179,21 +188,10 @@ def update_patient(_, patient_id):
     useless_params(body.keys(), PARAMETERS_FOR_POST_PATIENT)
     validate_payload(body, Patient.validators)
 
-    if "cpf" in body and session.query(
-            Patient.id).filter(Patient.cpf == body["cpf"],
-                               Patient.id != patient_id).first() is not None:
-        raise ValidationException({"cpf": ValidationMessages.CPF_REGISTERED})
-    if "registration" in body and session.query(
-            Patient.id).filter(Patient.registration == body["registration"]).first() is not None:
-        raise ValidationException({"registration": ValidationMessages.REGISTRATION_REGISTERED})
-    if session.query(
-            Patient.id).filter(Patient.phone == body["phone"],
-                               Patient.id != patient_id).first() is not None:
-        raise ValidationException(
-            {"phone": ValidationMessages.PHONE_REGISTERED})
-
     stmt = update(Patient).where(Patient.id == patient_id).values(**body)
     rowcount = session.execute(stmt).rowcount
+    if rowcount:
+        index_document(Patient.__tablename__, patient_id, body["name"])
     session.commit()
 
     if not rowcount:
@@ -201,7 +199,7 @@ def update_patient(_, patient_id):
 
     patient = session.get(Patient, patient_id)
 
-    return jsonify(patient.as_json()), 200
+    return jsonify(patient.as_dict()), 200
 
 
 # END PUT patient #
@@ -218,6 +216,7 @@ def delete_patient(_, patient_id):
     """
     stmt = delete(Patient).where(Patient.id == patient_id)
     session.execute(stmt)
+    remove_document(Patient.__tablename__, patient_id)
     session.commit()
 
     return "", 204
@@ -1,17 +1,20 @@
 from flask import request, jsonify
-from sqlalchemy import desc
-from passlib.hash import pbkdf2_sha256
-from flasgger import swag_from
 
 from . import bp_api
 from ..models import Professional, Acting, Specialty, Clinic, session, select, delete, update
-from ..exceptions import APIException, ValidationException, AuthorizationException
+from ..models.search import index_document, remove_document, search_text, search_digits
+from ..exceptions import APIException, AuthorizationException
 from ..utils import useless_params
-from ..constants import ResponseMessages, ValidationMessages
+from ..constants import ResponseMessages
 from ..validations import validate_payload
 from ..middlewares import token_required, only_admin
+from ..helpers.passwords import hash_password
+from ..helpers.pagination import Keyset, paginate, cursor_headers
+from ..helpers.calendar_cache import invalidate_all
+from ..helpers.etag import make_etag, statement_versions, not_modified, etag_headers, rows_versions, versioned, \
+    joined_rows_versions, unversioned
 
-from ..docs import professional_specs
+from ..docs import swag_from, professional_specs
 
 PARAMETERS_FOR_POST_PROFESSIONAL = [
     "name", "phone", "reg_number", "username", "email", "password"
@@ -19,13 +22,17 @@ PARAMETERS_FOR_POST_PROFESSIONAL = [
 
 PARAMETERS_FOR_GET_PROFESSIONAL = [
     "name", "phone", "reg_number", "username", "email", "limit", "page",
-    "order_by"
+    "cursor", "order_by"
 ]
 
 PARAMETERS_FOR_PUT_PROFESSIONAL = [
     "name", "phone", "reg_number", "username", "email", "password"
 ]
 
+professionals_keyset = Keyset(Professional.created_at,
+                              Professional.id,
+                              descending=True)
+
 # POST professional #
 query_actuations = select(
     Acting.id, Acting.professional_id, Acting.clinic_id,
@@ -34,6 +41,9 @@ query_actuations = select(
         Clinic, Acting.clinic_id == Clinic.id).join(
             Specialty, Acting.specialty_id == Specialty.id)
 
+# models whose rows are part of actuations of professionals responses
+ACTUATIONS_MODELS = (Acting, Clinic, Specialty)
+
 
 @bp_api.route("/professionals", methods=["POST"])
 @swag_from(professional_specs.post_professional)
@@ -48,57 +58,42 @@ def create_professional(_):
     useless_params(body.keys(), PARAMETERS_FOR_POST_PROFESSIONAL)
     validate_payload(body, Professional.validators)
 
-    if session.query(Professional.id).filter(
-            Professional.username == body["username"]).first() is not None:
-        raise ValidationException(
-            {"username": ValidationMessages.USERNAME_REGISTERED})
-    if session.query(Professional.id).filter(
-            Professional.email == body["email"]).first() is not None:
-        raise ValidationException(
-            {"email": ValidationMessages.EMAIL_REGISTERED})
-
     if "password" in body:
-        body["password"] = pbkdf2_sha256.hash(body["password"])
+        body["password"] = hash_password(body["password"])
 
     professional = Professional(**body)
     session.add(professional)
+    session.flush()
+    index_document(Professional.__tablename__, professional.id,
+                   professional.name)
     session.commit()
     session.refresh(professional)
 
-    return jsonify(professional.as_json()), 201
+    return jsonify(professional.as_dict()), 201
 
 
 # END POST professional #
 
 
 # GET professionals #
-@bp_api.route("/professionals", methods=["GET"])
-@swag_from(professional_specs.get_professionals)
-@token_required
-def get_professionals(_):
+def professionals_statement(params):
     """
-    Get professionals
+    Statement of professionals page filtered by params
     """
-
-    params = request.args
-    useless_params(params.keys(), PARAMETERS_FOR_GET_PROFESSIONAL)
-
-    page = int(params.get("page") or 1)
-    limit = int(params.get("limit") or 20)
     name = params.get("name")
     phone = params.get("phone")
     reg_number = params.get("reg_number")
     username = params.get("username")
     email = params.get("email")
 
-    stmt = select(Professional).limit(limit).offset(
-        (page - 1) * limit).order_by(desc(Professional.created_at))
+    stmt = paginate(select(Professional), professionals_keyset, params)
 
     if name is not None:
-        stmt = stmt.filter(Professional.name.like("%" + name + "%"))
+        stmt = stmt.filter(
+            search_text(Professional.__tablename__, Professional.id, name))
 
     if phone is not None:
-        stmt = stmt.filter(Professional.phone.like("%" + phone + "%"))
+        stmt = stmt.filter(search_digits(Professional.phone, phone))
 
     if reg_number is not None:
         stmt = stmt.filter(Professional.reg_number.like("%" + reg_number +
@@ -110,18 +105,80 @@ def get_professionals(_):
     if email is not None:
         stmt = stmt.filter(Professional.email.like("%" + email + "%"))
 
-    professionals = {}
+    return stmt
+
 
-    for p in session.execute(stmt).scalars():
-        professionals[p.id] = {**p.as_json(), "actuations": []}
+def actuations_statement(professional_ids):
+    """
+    Statement of actuations of professionals
+    """
+    return query_actuations.filter(
+        Acting.professional_id.in_(professional_ids)).order_by(
+            Acting.professional_id)
 
-    for act in session.execute(
-            query_actuations.filter(
-                Acting.professional_id.in_(professionals.keys())).order_by(
-                    Acting.professional_id)).all():
-        professionals[act.professional_id]["actuations"].append(act._asdict())
 
-    return jsonify(list(professionals.values())), 200
+def with_actuations(professionals, actuations) -> list[dict]:
+    """
+    Professionals as dict with their actuations rows
+    """
+    result = {p.id: {**p.as_dict(), "actuations": []} for p in professionals}
+    for act in actuations:
+        result[act.professional_id]["actuations"].append(unversioned(act))
+
+    return list(result.values())
+
+
+def professionals_etag(stmt) -> str or None:
+    """
+    Etag of professionals of statement with their actuations whether request
+    has If-None-Match, so rows of unconditional requests are loaded before
+    their etag is computed
+    """
+    if not request.if_none_match:
+        return None
+
+    professional_ids = select(stmt.subquery().c.id)
+    return make_etag(
+        *statement_versions(stmt, Professional),
+        *statement_versions(actuations_statement(professional_ids),
+                            *ACTUATIONS_MODELS))
+
+
+def loaded_professionals_etag(professionals, actuations) -> str:
+    """
+    Etag of professionals already loaded with their versioned actuations,
+    equal to etag of their statement
+    """
+    return make_etag(
+        *rows_versions(professionals),
+        *joined_rows_versions(actuations, len(ACTUATIONS_MODELS)))
+
+
+@bp_api.route("/professionals", methods=["GET"])
+@swag_from(professional_specs.get_professionals)
+@token_required
+def get_professionals(_):
+    """
+    Get professionals
+    """
+
+    params = request.args
+    useless_params(params.keys(), PARAMETERS_FOR_GET_PROFESSIONAL)
+
+    stmt = professionals_statement(params)
+
+    etag = professionals_etag(stmt)
+    if (response := not_modified(etag)) is not None:
+        return response
+
+    rows = session.execute(stmt).scalars().all()
+    actuations = session.execute(
+        versioned(actuations_statement([p.id for p in rows]),
+                  *ACTUATIONS_MODELS)).all()
+
+    return jsonify(with_actuations(rows, actuations)), 200, cursor_headers(
+        professionals_keyset, rows, params) | etag_headers(
+            etag or loaded_professionals_etag(rows, actuations))
 
 
 @bp_api.route("/professionals/<int:professional_id>", methods=["GET"])
@@ -134,6 +191,11 @@ def get_professional_by_id(current_user, professional_id):
     if not current_user["admin"] and current_user["id"] != professional_id:
         raise AuthorizationException(ResponseMessages.NOT_AUHORIZED_ACCESS)
 
+    etag = professionals_etag(
+        select(Professional).where(Professional.id == professional_id))
+    if (response := not_modified(etag)) is not None:
+        return response
+
     professional = session.get(Professional, professional_id)
 
     if professional is None:
@@ -141,14 +203,16 @@ def get_professional_by_id(current_user, professional_id):
             ResponseMessages.ENTITY_NOT_FOUND.format("Professional"),
             status_code=404)
 
-    professional = professional.as_json()
-    professional["actuations"] = [
-        a._asdict() for a in session.execute(
-            query_actuations.where(
-                Acting.professional_id == professional_id)).all()
-    ]
+    actuations = session.execute(
+        versioned(
+            query_actuations.where(Acting.professional_id == professional_id),
+            *ACTUATIONS_MODELS)).all()
+    etag = etag or loaded_professionals_etag([professional], actuations)
 
-    return jsonify(professional), 200
+    professional = professional.as_dict()
+    professional["actuations"] = [unversioned(a) for a in actuations]
+
+    return jsonify(professional), 200, etag_headers(etag)
 
 
 @bp_api.route("/professionals/<string:professional_username>/username",
@@ -169,7 +233,7 @@ def get_professional_by_username(_, professional_username):
             ResponseMessages.ENTITY_NOT_FOUND.format("Professional"),
             status_code=404)
 
-    professional = professional.as_json()
+    professional = professional.as_dict()
     professional["actuations"] = [
         a._asdict() for a in session.execute(
             query_actuations.where(
@@ -196,7 +260,7 @@ def get_professional_by_email(_, professional_email):
             ResponseMessages.ENTITY_NOT_FOUND.format("Professional"),
             status_code=404)
 
-    professional = professional.as_json()
+    professional = professional.as_dict()
     professional["actuations"] = [
         a._asdict() for a in session.execute(
             query_actuations.where(
@@ -223,7 +287,7 @@ def get_professional_by_phone(_, professional_phone):
             ResponseMessages.ENTITY_NOT_FOUND.format("Professional"),
             status_code=404)
 
-    professional = professional.as_json()
+    professional = professional.as_dict()
     professional["actuations"] = [
         a._asdict() for a in session.execute(
             query_actuations.where(
@@ -254,23 +318,16 @@ def update_professional(current_user, professional_id):
     validate_payload(body, Professional.validators_update,
                      PARAMETERS_FOR_PUT_PROFESSIONAL)
 
-    if session.query(Professional.id).filter(
-            Professional.username == body["username"],
-            Professional.id != professional_id).first() is not None:
-        raise ValidationException(
-            {"username": ValidationMessages.USERNAME_REGISTERED})
-    if session.query(Professional.id).filter(
-            Professional.email == body["email"],
-            Professional.id != professional_id).first() is not None:
-        raise ValidationException(
-            {"email": ValidationMessages.EMAIL_REGISTERED})
-
     if "password" in body:
-        body["password"] = pbkdf2_sha256.hash(body["password"])
+        body["password"] = hash_password(body["password"])
 
     stmt = update(Professional).where(
         Professional.id == professional_id).values(**body)
     rowcount = session.execute(stmt).rowcount
+    if rowcount and "name" in body:
+        index_document(Professional.__tablename__, professional_id,
+                       body["name"])
+        invalidate_all()
     session.commit()
 
     if not rowcount:
@@ -278,7 +335,7 @@ def update_professional(current_user, professional_id):
 
     professional = session.get(Professional, professional_id)
 
-    return jsonify(professional.as_json()), 200
+    return jsonify(professional.as_dict()), 200
 
 
 # END PUT professional #
@@ -296,6 +353,8 @@ def delete_professional(_, professional_id):
     """
     stmt = delete(Professional).where(Professional.id == professional_id)
     session.execute(stmt)
+    remove_document(Professional.__tablename__, professional_id)
+    invalidate_all()
     session.commit()
 
     return "", 204
@@ -1,16 +1,18 @@
 from flask import request, jsonify
 from sqlalchemy import inspect
-from flasgger import swag_from
 
 from . import bp_api
 from ..models import Schedule, Acting, Clinic, Professional, Specialty, session, select, delete, update
+from ..models.occupancy import ScheduleOccupancy, refresh_schedule_occupancy
 from ..exceptions import APIException, ValidationException, AuthorizationException
 from ..utils import useless_params
 from ..constants import ResponseMessages, ValidationMessages
 from ..validations import validate_payload
 from ..middlewares import token_required
+from ..helpers.pagination import Keyset, paginate, cursor_headers
+from ..helpers.calendar_cache import invalidate_schedules
 
-from ..docs import schedule_specs
+from ..docs import swag_from, schedule_specs
 
 PARAMETERS_FOR_POST_SCHEDULE = [
     "start_date", "end_date", "start_time", "end_time", "max_visits",
@@ -18,8 +20,8 @@ PARAMETERS_FOR_POST_SCHEDULE = [
 ]
 
 PARAMETERS_FOR_GET_SCHEDULE = [
-    "acting_id", "limit", "page", "order_by", "professional_id", "clinic_id",
-    "specialty_id"
+    "acting_id", "limit", "page", "cursor", "order_by", "professional_id",
+    "clinic_id", "specialty_id"
 ]
 
 PARAMETERS_FOR_PUT_SCHEDULE = [
@@ -41,6 +43,11 @@ base_query = select(
             Professional, Acting.professional_id == Professional.id).join(
                 Specialty, Acting.specialty_id == Specialty.id)
 
+schedules_keyset = Keyset(Schedule.week_day,
+                          Schedule.start_time,
+                          Schedule.id,
+                          nullable=("week_day", ))
+
 
 @bp_api.route("/schedules", methods=["POST"])
 @swag_from(schedule_specs.post_schedule)
@@ -68,6 +75,8 @@ def create_schedule(current_user):
 
     schedule = Schedule(**body)
     session.add(schedule)
+    session.flush()
+    refresh_schedule_occupancy(schedule.id)
     session.commit()
 
     stmt = base_query.filter(Schedule.id == schedule.id)
@@ -90,15 +99,12 @@ def get_schedules(current_user):
     params = request.args
     useless_params(params.keys(), PARAMETERS_FOR_GET_SCHEDULE)
 
-    page = int(params.get("page") or 1)
-    limit = int(params.get("limit") or 20)
     acting_id = params.get("acting_id")
     clinic_id = params.get("clinic_id")
     professional_id = params.get("professional_id")
     specialty_id = params.get("specialty_id")
 
-    stmt = base_query.limit(limit).offset(
-        (page - 1) * limit).order_by(Schedule.week_day, Schedule.start_time)
+    stmt = paginate(base_query, schedules_keyset, params)
 
     if acting_id is not None:
         stmt = stmt.filter(Schedule.acting_id == acting_id)
@@ -109,15 +115,17 @@ def get_schedules(current_user):
     if specialty_id is not None:
         stmt = stmt.filter(Specialty.id == specialty_id)
 
+    rows = session.execute(stmt).all()
     schedules = []
 
-    for sc in session.execute(stmt).all():
+    for sc in rows:
         schedules.append(sc._asdict())
         if not current_user[
                 "id"] and sc["professional_id"] != current_user["id"]:
             raise AuthorizationException(ResponseMessages.NOT_AUHORIZED_ACCESS)
 
-    return jsonify(schedules), 200
+    return jsonify(schedules), 200, cursor_headers(schedules_keyset, rows,
+                                                   params)
 
 
 @bp_api.route("/schedules/<int:schedule_id>", methods=["GET"])
@@ -179,8 +187,12 @@ def update_schedule(current_user, schedule_id):
             raise AuthorizationException(
                 ResponseMessages.NOT_AUHORIZED_OPERATION)
 
+    # clinic of schedule before it moves to another actuation
+    invalidate_schedules(schedule_id)
     stmt = update(Schedule).where(Schedule.id == schedule_id).values(**body)
     rowcount = session.execute(stmt).rowcount
+    if rowcount:
+        refresh_schedule_occupancy(schedule_id)
     session.commit()
 
     if not rowcount:
@@ -212,6 +224,10 @@ def delete_schedule(current_user, schedule_id):
             raise AuthorizationException(
                 ResponseMessages.NOT_AUHORIZED_OPERATION)
 
+    invalidate_schedules(schedule_id)
+    session.execute(
+        delete(ScheduleOccupancy).where(
+            ScheduleOccupancy.schedule_id == schedule_id))
     stmt = delete(Schedule).where(Schedule.id == schedule_id)
     session.execute(stmt)
     session.commit()
@@ -1,6 +1,4 @@
 from flask import request, jsonify
-from sqlalchemy import desc
-from flasgger import swag_from
 
 from . import bp_api
 from ..models import Specialty, session, select, delete, update
@@ -9,15 +7,23 @@ from ..utils import useless_params
 from ..constants import ResponseMessages
 from ..validations import validate_payload
 from ..middlewares import token_required, only_admin
+from ..helpers.pagination import Keyset, paginate, cursor_headers
+from ..helpers.streaming import wants_stream, stream_rows
+from ..helpers.etag import conditional_etag, not_modified, etag_headers, rows_etag
+from ..helpers.calendar_cache import invalidate_all
 
-from ..docs import specialty_specs
+from ..docs import swag_from, specialty_specs
 
 PARAMETERS_FOR_POST_SPECIALTY = ["description"]
 
-PARAMETERS_FOR_GET_SPECIALTY = ["description", "limit", "page", "order_by"]
+PARAMETERS_FOR_GET_SPECIALTY = [
+    "description", "limit", "page", "cursor", "stream", "order_by"
+]
 
 PARAMETERS_FOR_PUT_SPECIALTY = ["description"]
 
+specialties_keyset = Keyset(Specialty.created_at, Specialty.id, descending=True)
+
 # POST specialty #
 
 
@@ -39,7 +45,7 @@ def create_specialty(_):
     session.commit()
     session.refresh(specialty)
 
-    return jsonify(specialty.as_json()), 201
+    return jsonify(specialty.as_dict()), 201
 
 
 # END POST specialty #
@@ -55,20 +61,30 @@ def get_specialties(_):
     """
     params = request.args
     useless_params(params.keys(), PARAMETERS_FOR_GET_SPECIALTY)
+    stream = wants_stream(params)
 
-    page = int(params.get("page") or 1)
-    limit = int(params.get("limit") or 20)
     description = params.get("description")
 
-    stmt = select(Specialty).limit(limit).offset(
-        (page - 1) * limit).order_by(desc(Specialty.created_at))
+    stmt = paginate(select(Specialty),
+                    specialties_keyset,
+                    params,
+                    stream=stream)
 
     if description is not None:
         stmt = stmt.filter(Specialty.description.like("%" + description + "%"))
 
-    specialties = [p.as_json() for p in session.execute(stmt).scalars()]
+    if stream:
+        return stream_rows(stmt, scalars=True)
+
+    etag = conditional_etag(stmt, Specialty)
+    if (response := not_modified(etag)) is not None:
+        return response
 
-    return jsonify(specialties), 200
+    specialties = session.execute(stmt).scalars().all()
+
+    return jsonify([p.as_dict() for p in specialties]), 200, cursor_headers(
+        specialties_keyset, specialties, params) | etag_headers(
+            etag or rows_etag(specialties))
 
 
 @bp_api.route("/specialties/<int:specialty_id>", methods=["GET"])
@@ -79,6 +95,11 @@ def get_specialty_by_id(_, specialty_id):
     """
     Get specialty by id
     """
+    etag = conditional_etag(
+        select(Specialty).where(Specialty.id == specialty_id), Specialty)
+    if (response := not_modified(etag)) is not None:
+        return response
+
     specialty = session.get(Specialty, specialty_id)
 
     if specialty is None:
@@ -86,7 +107,8 @@ def get_specialty_by_id(_, specialty_id):
             ResponseMessages.ENTITY_NOT_FOUND.format("Specialty"),
             status_code=404)
 
-    return jsonify(specialty.as_json())
+    return jsonify(specialty.as_dict()), 200, etag_headers(
+        etag or rows_etag([specialty]))
 
 
 # END GET specialties #
@@ -109,6 +131,8 @@ def update_specialty(_, specialty_id):
 
     stmt = update(Specialty).where(Specialty.id == specialty_id).values(**body)
     rowcount = session.execute(stmt).rowcount
+    if rowcount:
+        invalidate_all()
     session.commit()
 
     if not rowcount:
@@ -116,7 +140,7 @@ def update_specialty(_, specialty_id):
 
     specialty = session.get(Specialty, specialty_id)
 
-    return jsonify(specialty.as_json()), 200
+    return jsonify(specialty.as_dict()), 200
 
 
 # END PUT specialty #
@@ -134,6 +158,7 @@ def delete_specialty(_, specialty_id):
     """
     stmt = delete(Specialty).where(Specialty.id == specialty_id)
     session.execute(stmt)
+    invalidate_all()
     session.commit()
 
     return "", 204
@@ -1,7 +1,4 @@
 from flask import request, jsonify
-from sqlalchemy import desc
-from passlib.hash import pbkdf2_sha256
-from flasgger import swag_from
 
 from . import bp_api
 from ..models import User, Clinic, session, select, delete, update
@@ -10,21 +7,28 @@ from ..utils import useless_params
 from ..constants import ResponseMessages, ValidationMessages
 from ..validations import validate_payload
 from ..middlewares import token_required, only_admin
+from ..helpers.passwords import hash_password
+from ..helpers.pagination import Keyset, paginate, cursor_headers
+from ..helpers.streaming import wants_stream, stream_rows
+from ..helpers.etag import conditional_etag, not_modified, etag_headers, rows_etag
 
-from ..docs import user_specs
+from ..docs import swag_from, user_specs
 
 PARAMETERS_FOR_POST_USER = [
     "name", "username", "email", "password", "clinic_id", "active"
 ]
 
 PARAMETERS_FOR_GET_USER = [
-    "name", "username", "email", "limit", "page", "order_by", "active"
+    "name", "username", "email", "limit", "page", "cursor", "stream",
+    "order_by", "active"
 ]
 
 PARAMETERS_FOR_PUT_USER = [
     "name", "username", "email", "clinic_id", "password", "active"
 ]
 
+users_keyset = Keyset(User.created_at, User.id, descending=True)
+
 # POST user #
 
 
@@ -41,15 +45,6 @@ def create_user(_):
     useless_params(body.keys(), PARAMETERS_FOR_POST_USER)
     validate_payload(body, User.validators)
 
-    if session.query(User.id).filter(
-            User.username == body["username"]).first() is not None:
-        raise ValidationException(
-            {"username": ValidationMessages.USERNAME_REGISTERED})
-    if session.query(
-            User.id).filter(User.email == body["email"]).first() is not None:
-        raise ValidationException(
-            {"email": ValidationMessages.EMAIL_REGISTERED})
-
     if session.query(
             Clinic.id).filter(Clinic.id == body["clinic_id"]).first() is None:
         raise ValidationException({
@@ -59,14 +54,14 @@ def create_user(_):
         })
 
     if "password" in body:
-        body["password"] = pbkdf2_sha256.hash(body["password"])
+        body["password"] = hash_password(body["password"])
 
     user = User(**body)
     session.add(user)
     session.commit()
     session.refresh(user)
 
-    return jsonify(user.as_json()), 201
+    return jsonify(user.as_dict()), 201
 
 
 # END POST user #
@@ -83,15 +78,13 @@ def get_users(_):
     """
     params = request.args
     useless_params(params.keys(), PARAMETERS_FOR_GET_USER)
+    stream = wants_stream(params)
 
-    page = int(params.get("page") or 1)
-    limit = int(params.get("limit") or 20)
     name = params.get("name")
     username = params.get("username")
     email = params.get("email")
 
-    stmt = select(User).limit(limit).offset(
-        (page - 1) * limit).order_by(desc(User.created_at))
+    stmt = paginate(select(User), users_keyset, params, stream=stream)
 
     if name is not None:
         stmt = stmt.filter(User.name.like("%" + name + "%"))
@@ -102,9 +95,18 @@ def get_users(_):
     if email is not None:
         stmt = stmt.filter(User.email.like("%" + email + "%"))
 
-    users = [p.as_json() for p in session.execute(stmt).scalars()]
+    if stream:
+        return stream_rows(stmt, scalars=True)
+
+    etag = conditional_etag(stmt, User)
+    if (response := not_modified(etag)) is not None:
+        return response
 
-    return jsonify(users), 200
+    users = session.execute(stmt).scalars().all()
+
+    return jsonify([p.as_dict() for p in users]), 200, cursor_headers(
+        users_keyset, users, params) | etag_headers(
+            etag or rows_etag(users))
 
 
 @bp_api.route("/users/<int:user_id>", methods=["GET"])
@@ -115,13 +117,19 @@ def get_user_by_id(_, user_id):
     """
     Get user by id
     """
+    etag = conditional_etag(
+        select(User).where(User.id == user_id), User)
+    if (response := not_modified(etag)) is not None:
+        return response
+
     user = session.get(User, user_id)
 
     if user is None:
         raise APIException(ResponseMessages.ENTITY_NOT_FOUND.format("User"),
                            status_code=404)
 
-    return jsonify(user.as_json())
+    return jsonify(user.as_dict()), 200, etag_headers(
+        etag or rows_etag([user]))
 
 
 @bp_api.route("/users/<string:user_username>/username", methods=["GET"])
@@ -139,7 +147,7 @@ def get_user_by_username(_, user_username):
         raise APIException(ResponseMessages.ENTITY_NOT_FOUND.format("User"),
                            status_code=404)
 
-    return jsonify(user.as_json())
+    return jsonify(user.as_dict())
 
 
 @bp_api.route("/users/<string:user_email>/email", methods=["GET"])
@@ -156,7 +164,7 @@ def get_user_by_email(_, user_email):
         raise APIException(ResponseMessages.ENTITY_NOT_FOUND.format("User"),
                            status_code=404)
 
-    return jsonify(user.as_json())
+    return jsonify(user.as_dict())
 
 
 # END GET users #
@@ -177,17 +185,6 @@ def update_user(_, user_id):
     useless_params(body.keys(), PARAMETERS_FOR_PUT_USER)
     validate_payload(body, User.validators_update)
 
-    if "username" in body and session.query(User.id).filter(
-            User.username == body["username"],
-            User.id != user_id).first() is not None:
-        raise ValidationException(
-            {"username": ValidationMessages.USERNAME_REGISTERED})
-    if "email" in body and session.query(User.id).filter(
-            User.email == body["email"],
-            User.id != user_id).first() is not None:
-        raise ValidationException(
-            {"email": ValidationMessages.EMAIL_REGISTERED})
-
     if "clinic_id" in body and session.query(
             Clinic.id).filter(Clinic.id == body["clinic_id"]).first() is None:
         raise ValidationException({
@@ -197,7 +194,7 @@ def update_user(_, user_id):
         })
 
     if "password" in body:
-        body["password"] = pbkdf2_sha256.hash(body["password"])
+        body["password"] = hash_password(body["password"])
 
     stmt = update(User).where(User.id == user_id).values(**body)
     rowcount = session.execute(stmt).rowcount
@@ -208,7 +205,7 @@ def update_user(_, user_id):
 
     user = session.get(User, user_id)
 
-    return jsonify(user.as_json()), 200
+    return jsonify(user.as_dict()), 200
 
 
 # END PUT user #
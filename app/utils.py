@@ -3,6 +3,8 @@ import re
 from .exceptions import APIException
 from .constants import ValidationMessages
 
+NON_DIGITS = re.compile(r"\D")
+
 
 def useless_params(params, useful_parameters):
     """
@@ -23,4 +25,4 @@ def remove_mask(obj: str) -> str:
     """
     Remove everything that is not number
     """
-    return re.sub(r"\D", "", obj)
+    return NON_DIGITS.sub("", obj)
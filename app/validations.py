@@ -1,12 +1,71 @@
 import re
 from enum import Enum
 from datetime import date
+from functools import partial
+from inspect import signature
+from operator import mul
 from dateutil.parser import isoparse
 
 from .exceptions import ValidationException
 from .constants import ValidationMessages
 from .utils import remove_mask
 
+CPF_PATTERN = re.compile(r"^\d{11}$")
+CNPJ_PATTERN = re.compile(r"^\d{14}$")
+PHONE_PATTERN = re.compile(r"^\d{10}$")
+MOBILE_PATTERN = re.compile(r"^\d{11}$")
+CPF_WEIGHTS = (11, 10, 9, 8, 7, 6, 5, 4, 3, 2)
+# pylint: disable=line-too-long
+EMAIL_PATTERN = re.compile(
+    r"^(([^<>()[\]\\.,;:\s@\"]+(\.[^<>()[\]\\.,;:\s@\"]+)*)|(\".+\"))@((\[[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\])|(([a-zA-Z\-0-9]+\.)+[a-zA-Z]{2,}))$"
+)
+
+
+def valid_cpf_digits(cpf: str) -> bool:
+    """
+    Check verification digits of a cpf with 11 digits
+    """
+    digits = list(map(int, cpf))
+    first = sum(map(mul, digits[:9], CPF_WEIGHTS[1:])) % 11
+    first = ((11 - first) % 11) % 10
+    second = (sum(map(mul, digits[:9], CPF_WEIGHTS[:9])) + first * 2) % 11
+    second = ((11 - second) % 11) % 10
+
+    return first == digits[9] and second == digits[10]
+
+
+def valid_cnpj_digits(cnpj: str) -> bool:
+    """
+    Check verification digits of a cnpj with 14 digits
+    """
+    digits = [int(d) for d in cnpj]
+    dvs = [0, 0]
+
+    i = 6
+    j = 5
+    for d in digits[:-2]:
+        dvs[0] += i * d
+        dvs[1] += j * d
+        i += 1 if i < 9 else -7
+        j += 1 if j < 9 else -7
+
+    dvs[0] = (dvs[0] % 11) % 10
+    dvs[1] = ((dvs[1] + dvs[0] * 9) % 11) % 10
+
+    return dvs[0] == digits[12] and dvs[1] == digits[13]
+
+
+def parse_date(value) -> date:
+    """
+    Parse an iso date, plain dates without dateutil
+    """
+    if isinstance(value, str) and len(value) == 10:
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            pass
+    return isoparse(value).date()
+
 
 def validate_cpf(field: str, body: dict) -> str or None:
     """
@@ -18,19 +77,8 @@ def validate_cpf(field: str, body: dict) -> str or None:
             validation message if invalid or none if valid
     """
     cpf = body[field] = remove_mask(body[field])
-    if re.match(r"^\d{11}$", cpf):
-        digits = [int(d) for d in cpf]
-        dvs = [0, 0]
-
-        for i in range(11, 2, -1):
-            dvs[0] += digits[11 - i] * (i - 1)
-            dvs[1] += digits[11 - i] * i
-
-        dvs[0] = ((11 - (dvs[0] % 11)) % 11) % 10
-        dvs[1] = ((11 - ((dvs[1] + (dvs[0] * 2)) % 11)) % 11) % 10
-
-        if dvs[0] == digits[9] and dvs[1] == digits[10]:
-            return None
+    if CPF_PATTERN.match(cpf) and valid_cpf_digits(cpf):
+        return None
     return ValidationMessages.INVALID_CPF.format(field)
 
 
@@ -44,23 +92,8 @@ def validate_cnpj(field: str, body: dict) -> str or None:
             validation message if invalid or none if valid
     """
     cnpj = body[field] = remove_mask(body[field])
-    if re.match(r"^\d{14}$", cnpj):
-        digits = [int(d) for d in cnpj]
-        dvs = [0, 0]
-
-        i = 6
-        j = 5
-        for d in digits[:-2]:
-            dvs[0] += i * d
-            dvs[1] += j * d
-            i += 1 if i < 9 else -7
-            j += 1 if j < 9 else -7
-
-        dvs[0] = (dvs[0] % 11) % 10
-        dvs[1] = ((dvs[1] + dvs[0] * 9) % 11) % 10
-
-        if dvs[0] == digits[12] and dvs[1] == digits[13]:
-            return None
+    if CNPJ_PATTERN.match(cnpj) and valid_cnpj_digits(cnpj):
+        return None
     return ValidationMessages.INVALID_CNPJ.format(field)
 
 
@@ -74,9 +107,9 @@ def validate_phone(field: str, body: dict) -> str or None:
             validation message if invalid or none if valid
     """
     phone = remove_mask(body[field])
-    if (re.match(r"^\d{11}$", phone) and phone[-9] == "9"):
+    if (MOBILE_PATTERN.match(phone) and phone[-9] == "9"):
         phone = phone[0:2] + phone[3:]
-    if re.match(r"^\d{10}$", phone):
+    if PHONE_PATTERN.match(phone):
         body[field] = phone
         return None
 
@@ -92,10 +125,7 @@ def validate_email(field: str, body: dict) -> str or None:
         returns:
             validation message if invalid or none if valid
     """
-    # pylint: disable=line-too-long
-    if re.match(
-            r"^(([^<>()[\]\\.,;:\s@\"]+(\.[^<>()[\]\\.,;:\s@\"]+)*)|(\".+\"))@((\[[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\])|(([a-zA-Z\-0-9]+\.)+[a-zA-Z]{2,}))$",
-            body[field]):
+    if EMAIL_PATTERN.match(body[field]):
         return None
 
     return ValidationMessages.INVALID_EMAIL
@@ -123,9 +153,11 @@ def validate_number(field: str, body: dict):
         returns:
             validation message if invalid or none if valid
     """
-    if not isinstance(body[field], date):
+    value = body[field]
+    # ints are kept as they are, bools are still converted
+    if type(value) is not int and not isinstance(value, date):  # pylint: disable=unidiomatic-typecheck
         try:
-            body[field] = int(body[field])
+            body[field] = int(value)
         except ValueError:
             return ValidationMessages.NOT_A_NUMBER.format(field)
     return None
@@ -142,7 +174,7 @@ def validate_date(field: str, body: dict):
     """
     if not isinstance(body[field], date):
         try:
-            body[field] = isoparse(body[field]).date()
+            body[field] = parse_date(body[field])
         except ValueError:
             return ValidationMessages.INVALID_DATE.format(field)
     return None
@@ -209,96 +241,136 @@ def validate_enum(field: str, body: dict, enum: Enum):
     return None
 
 
+def bind_rule(function, field: str, args: tuple):
+    """
+    Rule bound to field and its arguments, called with body only
+    """
+    names = list(signature(function).parameters)[2:]
+    return partial(function, field, **dict(zip(names, args)))
+
+
 class Validator:
 
     def __init__(self, field):
         self.field = field
-        self.validators = []
+        self.rules = []
         self.nullable = True
+        self.check = self._compose()
+
+    def _rule(self, function, *args):
+        self.rules.append((function, args))
+        self.check = self._compose()
+        return self
+
+    def _compose(self):
+        """
+        Function validating a body with rules bound beforehand, composed
+        again whenever a rule is added
+        """
+        field = self.field
+        rules = tuple(
+            bind_rule(function, field, args) for function, args in self.rules)
+
+        if self.nullable:
+
+            def check(body: dict) -> str or None:
+                if body.get(field) is None:
+                    return None
+                for rule in rules:
+                    if result := rule(body):
+                        return result
+                return None
+        else:
+
+            def check(body: dict) -> str or None:
+                for rule in rules:
+                    if result := rule(body):
+                        return result
+                return None
+
+        return check
 
     def required(self):
         """
         Add validate required to validators
         """
         self.nullable = False
-        self.validators.append(validate_required)
-        return self
+        return self._rule(validate_required)
 
     def cpf(self):
         """
         Add validate cpf to validators
         """
-        self.validators.append(validate_cpf)
-        return self
+        return self._rule(validate_cpf)
 
     def cnpj(self):
         """
         Add validate cnpj to validators
         """
-        self.validators.append(validate_cnpj)
-        return self
+        return self._rule(validate_cnpj)
 
     def phone(self):
         """
         Add validate phone to validators
         """
-        self.validators.append(validate_phone)
-        return self
+        return self._rule(validate_phone)
 
     def email(self):
         """
         Add validate email to validators
         """
-        self.validators.append(validate_email)
-        return self
+        return self._rule(validate_email)
 
     def number(self):
         """
         Add validate number to validators
         """
-        self.validators.append(validate_number)
-        return self
+        return self._rule(validate_number)
 
     def date(self):
         """
         Add validate date to validators
         """
-        self.validators.append(validate_date)
-        return self
+        return self._rule(validate_date)
 
     def range(self, min_value, max_value):
         """
         Add validate range to validators
         """
-        self.validators.append(
-            lambda f, b: validate_range(f, b, min_value, max_value))
-        return self
+        return self._rule(validate_range, min_value, max_value)
 
     def length(self, min_len=None, max_len=None):
         """
         Add validate length to validators
         """
-        self.validators.append(
-            lambda f, b: validate_length(f, b, min_len, max_len))
-        return self
+        return self._rule(validate_length, min_len, max_len)
 
     def enum(self, enum: Enum):
         """
         Add validate enum to validators
         """
-        self.validators.append(lambda f, b: validate_enum(f, b, enum))
-        return self
+        return self._rule(validate_enum, enum)
 
     def validate(self, obj: dict) -> str or None:
         """
         Validate field with validators
         """
-        if not (self.nullable and
-                (self.field not in obj or obj[self.field] is None)):
-            for validator in self.validators:
-                if result := validator(self.field, obj):
-                    return result
-        return None
+        return self.check(obj)
+
+
+def validation_errors(payload: dict,
+                      validators: dict[str, Validator],
+                      fields: list[str] = None) -> dict:
+    """
+    Validate fields of payload, all fields of validators whether none
+        returns:
+            validation message by field of invalid fields
+    """
+    errors = {}
+    for field in fields or validators:
+        if result := validators[field].check(payload):
+            errors[field] = result
+    return errors
 
 
 def validate_payload(payload: dict,
@@ -307,10 +379,6 @@ def validate_payload(payload: dict,
     """
     Validate fields of payload with validators
     """
-    errors = {}
-    for field in fields or validators:
-        result = validators[field].validate(payload)
-        if result:
-            errors[field] = result
+    errors = validation_errors(payload, validators, fields)
     if errors:
         raise ValidationException(errors)
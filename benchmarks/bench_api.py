@@ -0,0 +1,389 @@
+"""
+Measure latency and throughput of main api endpoints over a seeded database
+
+    python benchmarks/bench_api.py --scale small
+    python benchmarks/bench_api.py --scale full --database-uri sqlite:////tmp/bench.db
+    python benchmarks/bench_api.py --save-baseline
+    python benchmarks/bench_api.py --baseline benchmarks/baseline.json --fail-on-regression
+
+The database is seeded once with the builders of tests/factory and reused
+while it has data, use --reseed to drop it and seed again.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+# pylint: disable=wrong-import-position
+import jwt  # noqa: E402
+from passlib.hash import pbkdf2_sha256  # noqa: E402
+
+from factory import PatientBuilder, ClinicBuilder, ProfessionalBuilder, SpecialtyBuilder  # noqa: E402
+from app import create_app  # noqa: E402
+from app.config import TestingConfig  # noqa: E402
+from app.models import db, session, select, insert  # noqa: E402
+from app.models import Acting, Appointment, Clinic, Patient, Professional, Schedule, Specialty  # noqa: E402
+from app.models.occupancy import rebuild_occupancy  # noqa: E402
+from app.models.search import rebuild_search_index  # noqa: E402
+
+SCALES = {
+    "tiny": {
+        "clinics": 5,
+        "specialties": 5,
+        "professionals": 20,
+        "patients": 500,
+        "appointments": 5_000
+    },
+    "small": {
+        "clinics": 20,
+        "specialties": 10,
+        "professionals": 200,
+        "patients": 10_000,
+        "appointments": 100_000
+    },
+    "full": {
+        "clinics": 100,
+        "specialties": 30,
+        "professionals": 2_000,
+        "patients": 200_000,
+        "appointments": 2_000_000
+    }
+}
+
+BATCH_SIZE = 10_000
+FIRST_DAY = date(2024, 1, 1)
+DAYS = 365
+SIGNIN_USERNAME = "benchmark"
+SIGNIN_PASSWORD = "benchmark"
+
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+DEFAULT_OUTPUT = os.path.join(ROOT, "benchmarks", "results.json")
+
+
+def insert_batches(model, rows):
+    """
+    Insert rows generated lazily in batches
+    """
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            session.execute(insert(model), batch)
+            batch = []
+    if batch:
+        session.execute(insert(model), batch)
+
+
+def seed(volumes: dict):
+    """
+    Seed database with realistic volumes, unique columns are derived from
+    position to never collide
+    """
+    rnd = random.Random(42)
+
+    for i in range(volumes["clinics"]):
+        session.add(ClinicBuilder().complete().with_phone(
+            f"31{i:08d}").with_cnpj(f"{i:014d}").build_object())
+    for i in range(volumes["specialties"]):
+        session.add(SpecialtyBuilder().build_object())
+    session.flush()
+
+    password = pbkdf2_sha256.hash(SIGNIN_PASSWORD)
+    for i in range(volumes["professionals"]):
+        builder = ProfessionalBuilder().complete().with_phone(
+            f"32{i:08d}").with_username(f"professional{i}").with_email(
+                f"professional{i}@benchmark.com")
+        if i == 0:
+            builder.with_username(SIGNIN_USERNAME).with_password(password)
+        session.add(builder.build_object())
+    session.flush()
+
+    for start in range(0, volumes["patients"], BATCH_SIZE):
+        session.add_all([
+            PatientBuilder().with_phone(f"33{i:08d}").with_cpf(
+                f"{i:011d}").with_registration(f"R{i:010d}").build_object()
+            for i in range(start, min(start + BATCH_SIZE,
+                                      volumes["patients"]))
+        ])
+        session.flush()
+        session.expunge_all()
+
+    clinic_ids = list(session.execute(select(Clinic.id)).scalars())
+    specialty_ids = list(session.execute(select(Specialty.id)).scalars())
+    professional_ids = list(session.execute(select(Professional.id)).scalars())
+
+    insert_batches(Acting, ({
+        "clinic_id": clinic_ids[i % len(clinic_ids)],
+        "specialty_id": rnd.choice(specialty_ids),
+        "professional_id": professional_id
+    } for i, professional_id in enumerate(professional_ids)))
+    acting_ids = list(session.execute(select(Acting.id)).scalars())
+
+    insert_batches(Schedule, ({
+        "acting_id": acting_id,
+        "week_day": week_day,
+        "start_date": FIRST_DAY,
+        "start_time": start_time,
+        "end_time": start_time + 240,
+        "max_visits": 8
+    } for acting_id in acting_ids for week_day in range(5)
+        for start_time in (480, 780)))
+
+    patient_ids = list(session.execute(select(Patient.id)).scalars())
+    insert_batches(Appointment, ({
+        "acting_id": rnd.choice(acting_ids),
+        "patient_id": rnd.choice(patient_ids),
+        "scheduled_day": FIRST_DAY + timedelta(days=rnd.randrange(DAYS)),
+        "start_time": rnd.choice((480, 540, 600, 660, 780, 840, 900, 960)),
+        "complaint": "benchmark"
+    } for _ in range(volumes["appointments"])))
+
+    rebuild_occupancy()
+    rebuild_search_index(Patient.__tablename__, Patient.id, Patient.name)
+    rebuild_search_index(Professional.__tablename__, Professional.id,
+                         Professional.name)
+    session.commit()
+
+
+def build_scenarios(rnd: random.Random) -> dict:
+    """
+    Requests of each endpoint measured, chosen at random over seeded data
+    """
+    actuations = session.execute(
+        select(Acting.clinic_id, Acting.specialty_id)).all()
+    names = [
+        name.split()[0] for name in session.execute(
+            select(Patient.name).limit(1000)).scalars()
+    ]
+    acting_ids = list(session.execute(select(Acting.id)).scalars())
+    patient_ids = list(
+        session.execute(select(Patient.id).limit(1000)).scalars())
+
+    def calendar_specialties():
+        acting = rnd.choice(actuations)
+        return "GET", "/api/calendar/specialties", {
+            "clinic_id": acting.clinic_id
+        }, None
+
+    def calendar_free_days():
+        acting = rnd.choice(actuations)
+        return "GET", "/api/calendar/free/days", {
+            "clinic_id": acting.clinic_id,
+            "specialty_id": acting.specialty_id,
+            "start_date": (FIRST_DAY +
+                           timedelta(days=rnd.randrange(DAYS))).isoformat(),
+            "num_days": 10
+        }, None
+
+    def calendar_available_schedules():
+        acting = rnd.choice(actuations)
+        return "GET", "/api/calendar/available/schedules", {
+            "clinic_id": acting.clinic_id,
+            "specialty_id": acting.specialty_id,
+            "day": (FIRST_DAY +
+                    timedelta(days=rnd.randrange(DAYS))).isoformat()
+        }, None
+
+    def appointments_list():
+        acting = rnd.choice(actuations)
+        start = FIRST_DAY + timedelta(days=rnd.randrange(DAYS - 30))
+        return "GET", "/api/appointments", {
+            "clinic_id": acting.clinic_id,
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=30)).isoformat()
+        }, None
+
+    def patients_search():
+        return "GET", "/api/patients", {"name": rnd.choice(names)}, None
+
+    def signin():
+        return "POST", "/auth/signin", None, {
+            "username": SIGNIN_USERNAME,
+            "password": SIGNIN_PASSWORD
+        }
+
+    def appointments_book():
+        # days after seeded ones, in week days covered by schedules
+        day = FIRST_DAY + timedelta(days=DAYS + rnd.randrange(DAYS))
+        day -= timedelta(days=max(day.weekday() - 4, 0))
+        return "POST", "/api/appointments", None, {
+            "acting_id": rnd.choice(acting_ids),
+            "patient_id": rnd.choice(patient_ids),
+            "scheduled_day": day.isoformat(),
+            "start_time": rnd.choice((480, 540, 600, 660, 780, 840, 900, 960))
+        }
+
+    return {
+        "calendar_specialties": calendar_specialties,
+        "calendar_free_days": calendar_free_days,
+        "calendar_available_schedules": calendar_available_schedules,
+        "appointments_list": appointments_list,
+        "patients_search": patients_search,
+        "signin": signin,
+        # writes, so it runs after the read scenarios
+        "appointments_book": appointments_book
+    }
+
+
+def measure(app, scenario, requests: int, concurrency: int,
+            headers: dict) -> dict:
+    """
+    Run requests of scenario and summarize latency percentiles and throughput
+    """
+    def run(_):
+        method, path, query_string, body = scenario()
+        client = app.test_client()
+        start = time.perf_counter()
+        res = client.open(path,
+                          method=method,
+                          query_string=query_string,
+                          json=body,
+                          headers=headers)
+        elapsed = time.perf_counter() - start
+        return elapsed, res.status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = list(executor.map(run, range(requests)))
+    total = time.perf_counter() - start
+
+    latencies = sorted(elapsed * 1000 for elapsed, _ in samples)
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": requests,
+        "errors": sum(1 for _, status in samples if status >= 400),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(quantiles[49], 3),
+        "p95_ms": round(quantiles[94], 3),
+        "p99_ms": round(quantiles[98], 3),
+        "throughput_rps": round(requests / total, 1)
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Print results against baseline
+        returns:
+            names of scenarios whose p95 got slower than tolerance allows
+    """
+    regressions = []
+    print(f"\n{'scenario':<30}{'p95 ms':>10}{'baseline':>10}{'change':>9}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<30}{result['p95_ms']:>10.2f}{'-':>10}{'-':>9}")
+            continue
+
+        change = result["p95_ms"] / base["p95_ms"] - 1
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<30}{result['p95_ms']:>10.2f}{base['p95_ms']:>10.2f}"
+              f"{change:>+9.0%}{flag}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--database-uri",
+                        default="sqlite:///" +
+                        os.path.join(tempfile.gettempdir(), "bench_api.db"))
+    parser.add_argument("--scale", choices=SCALES.keys(), default="small")
+    parser.add_argument("--reseed", action="store_true")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--scenario", action="append", default=None)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--calendar-cache",
+                        choices=["local", "redis", "none"],
+                        default=TestingConfig.CALENDAR_CACHE_BACKEND)
+    args = parser.parse_args()
+
+    config = type("BenchmarkConfig", (TestingConfig, ), {
+        "TESTING": False,
+        "SQLALCHEMY_DATABASE_URI": args.database_uri,
+        "CALENDAR_CACHE_BACKEND": args.calendar_cache
+    })
+    app = create_app(config)
+
+    with app.app_context():
+        if args.reseed:
+            db.drop_all()
+        db.create_all(bind_key=None)
+        if session.execute(select(Patient.id).limit(1)).first() is None:
+            started = time.perf_counter()
+            seed(SCALES[args.scale])
+            print(f"seeded {args.scale} in {time.perf_counter() - started:.0f}s")
+
+        scenarios = build_scenarios(random.Random(7))
+        database = db.engine.url.get_backend_name()
+
+    headers = {
+        "Authorization":
+        "Bearer " + jwt.encode({
+            "id": 1,
+            "name": "Benchmark",
+            "username": SIGNIN_USERNAME,
+            "email": "benchmark@benchmark.com",
+            "admin": True
+        }, app.config["JWT_SECRET_KEY"], "HS256")
+    }
+
+    results = {}
+    for name, scenario in scenarios.items():
+        if args.scenario and name not in args.scenario:
+            continue
+        measure(app, scenario, min(10, args.requests), 1, headers)
+        results[name] = measure(app, scenario, args.requests,
+                                args.concurrency, headers)
+        print(f"{name:<30}{json.dumps(results[name])}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+            "scale": args.scale,
+            "volumes": SCALES[args.scale],
+            "database": database,
+            "concurrency": args.concurrency,
+            "calendar_cache": args.calendar_cache,
+            "python": platform.python_version()
+        },
+        "results": results
+    }
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"baseline saved to {args.baseline}")
+        return
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline["results"], args.tolerance)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+Compare throughput of sync (gunicorn) and async (uvicorn) serving modes at
+equal worker counts, over the heavy read endpoints served by the async session
+
+    python benchmarks/bench_asgi.py --scale tiny --workers 2 --concurrency 64
+    python benchmarks/bench_asgi.py --database-uri mysql+pymysql://u:p@127.0.0.1/bench
+
+Database is seeded as in bench_api.py. Gains grow with database latency, so
+results against a networked MySQL are the meaningful ones. Over sqlite, which
+answers in microseconds, --db-latency adds a round trip to each query: sync
+workers wait it blocked, as on a network socket, and the async session awaits
+it, as asyncmy does
+
+    python benchmarks/bench_asgi.py --scale tiny --db-latency 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from urllib.parse import urlencode
+
+# pylint: disable=wrong-import-position
+from bench_api import ROOT, SCALES, SIGNIN_USERNAME, build_scenarios, seed  # noqa: E402
+
+import jwt  # noqa: E402
+
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.util import await_only  # noqa: E402
+
+from app import create_app  # noqa: E402
+from app.asgi import create_asgi_app  # noqa: E402
+from app.config import TestingConfig  # noqa: E402
+from app.models import db, session, select, Patient  # noqa: E402
+
+SCENARIOS = [
+    "calendar_free_days", "calendar_available_schedules", "appointments_list"
+]
+DEFAULT_OUTPUT = os.path.join(ROOT, "benchmarks", "results_asgi.json")
+LATENCY_ENV = "BENCH_DB_LATENCY_MS"
+
+
+def db_latency() -> float:
+    """
+    Seconds added to each query by servers of benchmark
+    """
+    return float(os.environ.get(LATENCY_ENV) or 0) / 1000
+
+
+def _add_sync_latency(engine, latency: float):
+    event.listen(engine, "before_cursor_execute",
+                 lambda *_: time.sleep(latency))
+
+
+def sync_app():
+    """
+    Flask app served by gunicorn, with latency of benchmark
+    """
+    app = create_app()
+    if latency := db_latency():
+        with app.app_context():
+            for engine in db.engines.values():
+                _add_sync_latency(engine, latency)
+    return app
+
+
+def async_app():
+    """
+    ASGI app served by uvicorn, with latency of benchmark awaited by the
+    async session and slept by flask fallback
+    """
+    api = create_asgi_app()
+    if latency := db_latency():
+        with api.app.app_context():
+            for engine in db.engines.values():
+                _add_sync_latency(engine, latency)
+        event.listen(api.engine.sync_engine, "before_cursor_execute",
+                     lambda *_: await_only(asyncio.sleep(latency)))
+    return api
+
+
+def free_port() -> int:
+    """
+    Port not in use on localhost
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_command(mode: str, port: int, workers: int, threads: int):
+    """
+    Command line serving api in mode
+    """
+    if mode == "sync":
+        return [
+            sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py",
+            "--pythonpath", "benchmarks", "--bind", f"127.0.0.1:{port}",
+            "--workers",
+            str(workers), "--threads",
+            str(threads), "bench_asgi:sync_app()"
+        ]
+    return [
+        sys.executable, "-m", "uvicorn", "--factory", "--app-dir",
+        "benchmarks", "bench_asgi:async_app", "--host", "127.0.0.1", "--port",
+        str(port), "--workers",
+        str(workers), "--no-access-log"
+    ]
+
+
+def wait_port(port: int, timeout=30):
+    """
+    Wait server listen in port
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.1)
+    raise TimeoutError(f"server did not listen in {port}")
+
+
+async def fetch(port: int, path: str, params: dict, token: str):
+    """
+    Send a GET in a new connection
+        returns:
+            status of response
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write((f"GET {path}?{urlencode(params)} HTTP/1.1\r\n"
+                  f"Host: 127.0.0.1:{port}\r\n"
+                  f"Authorization: Bearer {token}\r\n"
+                  "Connection: close\r\n\r\n").encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return int(response.split(b" ", 2)[1])
+
+
+async def load(port: int, scenario, requests: int, concurrency: int,
+               token: str) -> dict:
+    """
+    Run requests of scenario with concurrency connections in flight and
+    summarize latency percentiles and throughput
+    """
+    pending = iter(range(requests))
+    samples = []
+
+    async def client():
+        for _ in pending:
+            _, path, params, _ = scenario()
+            start = time.perf_counter()
+            try:
+                status = await fetch(port, path, params, token)
+            except OSError:
+                status = 599
+            samples.append((time.perf_counter() - start, status))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    total = time.perf_counter() - start
+
+    latencies = sorted(elapsed * 1000 for elapsed, _ in samples)
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": requests,
+        "errors": sum(1 for _, status in samples if status >= 400),
+        "p50_ms": round(quantiles[49], 3),
+        "p95_ms": round(quantiles[94], 3),
+        "p99_ms": round(quantiles[98], 3),
+        "throughput_rps": round(requests / total, 1)
+    }
+
+
+def run_mode(mode: str, args, scenarios: dict, token: str) -> dict:
+    """
+    Start server in mode and measure each scenario against it
+    """
+    port = free_port()
+    env = {
+        **os.environ, "APP_CONFIG": "production",
+        "DATABASE_URI": args.database_uri,
+        "METRICS_ENABLED": "false",
+        "QUERY_STATS_ENABLED": "false",
+        "DB_POOL_SIZE": str(args.concurrency),
+        LATENCY_ENV: str(args.db_latency)
+    }
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    with subprocess.Popen(server_command(mode, port, args.workers,
+                                         args.threads),
+                          cwd=ROOT,
+                          env=env,
+                          stdout=subprocess.DEVNULL,
+                          stderr=subprocess.DEVNULL) as server:
+        try:
+            wait_port(port)
+            results = {}
+            for name in SCENARIOS:
+                asyncio.run(
+                    load(port, scenarios[name], min(20, args.requests), 4,
+                         token))
+                results[name] = asyncio.run(
+                    load(port, scenarios[name], args.requests,
+                         args.concurrency, token))
+                print(f"{mode:<6}{name:<30}{json.dumps(results[name])}")
+            return results
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--database-uri",
+                        default="sqlite:///" +
+                        os.path.join(tempfile.gettempdir(), "bench_api.db"))
+    parser.add_argument("--scale", choices=SCALES.keys(), default="tiny")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads",
+                        type=int,
+                        default=1,
+                        help="threads of each sync worker")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--db-latency",
+                        type=float,
+                        default=0,
+                        help="milliseconds added to each query")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    config = type("BenchmarkConfig", (TestingConfig, ), {
+        "TESTING": False,
+        "SQLALCHEMY_DATABASE_URI": args.database_uri
+    })
+    app = create_app(config)
+    with app.app_context():
+        db.create_all(bind_key=None)
+        if session.execute(select(Patient.id).limit(1)).first() is None:
+            seed(SCALES[args.scale])
+        scenarios = build_scenarios(random.Random(7))
+        database = db.engine.url.get_backend_name()
+
+    token = jwt.encode({
+        "id": 1,
+        "name": "Benchmark",
+        "username": SIGNIN_USERNAME,
+        "email": "benchmark@benchmark.com",
+        "admin": True
+    }, app.config["JWT_SECRET_KEY"], "HS256")
+
+    results = {
+        mode: run_mode(mode, args, scenarios, token)
+        for mode in ("sync", "async")
+    }
+
+    print(f"\n{'scenario':<30}{'sync rps':>10}{'async rps':>11}{'gain':>8}")
+    for name in SCENARIOS:
+        sync, async_ = results["sync"][name], results["async"][name]
+        gain = async_["throughput_rps"] / sync["throughput_rps"] - 1
+        print(f"{name:<30}{sync['throughput_rps']:>10.1f}"
+              f"{async_['throughput_rps']:>11.1f}{gain:>+8.0%}")
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump({
+            "meta": {
+                "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+                "scale": args.scale,
+                "database": database,
+                "workers": args.workers,
+                "threads": args.threads,
+                "concurrency": args.concurrency,
+                "db_latency_ms": args.db_latency,
+                "python": platform.python_version()
+            },
+            "results": results
+        }, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Compare json backends serializing appointment like rows
+
+    python benchmarks/bench_json.py --rows 1000 --repeat 200
+"""
+import argparse
+import os
+import sys
+import timeit
+from datetime import date, datetime, time, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.json import JSON_BACKENDS  # noqa: E402
+
+
+def make_rows(count: int) -> list[dict]:
+    """
+    Rows shaped like appointments listed by api
+    """
+    now = datetime(2024, 1, 1, 8, 0, 0, 123456)
+    return [{
+        "id": i,
+        "acting_id": i % 50,
+        "patient_id": i % 500,
+        "scheduled_day": date(2024, 1, 1) + timedelta(days=i % 365),
+        "start_time": 480 + i % 8 * 30,
+        "end_time": 510 + i % 8 * 30,
+        "start": time(8, i % 60),
+        "duration": timedelta(minutes=30),
+        "status": "scheduled",
+        "created_at": now,
+        "updated_at": now,
+    } for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    results = {}
+    for name, backend in JSON_BACKENDS.items():
+        seconds = timeit.timeit(
+            lambda backend=backend: backend.dumps(rows, separators=(",", ":")),
+            number=args.repeat)
+        results[name] = seconds / args.repeat * 1000
+        print(f"{name:>8}: {results[name]:.3f} ms per {args.rows} rows")
+
+    if len(results) > 1:
+        print(f"speedup: {results['stdlib'] / results['orjson']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Measure signin throughput with passwords hashed at different rounds
+
+    python benchmarks/bench_passwords.py --rounds 29000 --rounds 100000
+    python benchmarks/bench_passwords.py --concurrency 16 --workers 2
+
+Each round count runs against an app configured with it, so signin never
+rehashes while measured.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+# pylint: disable=wrong-import-position
+from factory import ProfessionalBuilder  # noqa: E402
+from app import create_app  # noqa: E402
+from app.config import TestingConfig  # noqa: E402
+from app.models import db, session  # noqa: E402
+
+USERNAME = "benchmark"
+PASSWORD = "benchmark"
+
+
+def measure(rounds: int, requests: int, concurrency: int, workers: int):
+    """
+    Sign in requests times with concurrency threads
+        returns:
+            p50 latency in ms and throughput
+    """
+    config = type("PasswordsConfig", (TestingConfig, ), {
+        "PASSWORD_ROUNDS": rounds,
+        "PASSWORD_HASH_WORKERS": workers,
+        "PASSWORD_HASH_TIMEOUT": 60,
+        "QUERY_STATS_ENABLED": False,
+        "METRICS_ENABLED": False
+    })
+    app = create_app(config)
+    with app.app_context():
+        db.create_all(bind_key=None)
+        session.add(ProfessionalBuilder().with_username(USERNAME).with_password(
+            app.extensions["password_hasher"].hash(PASSWORD)).build_object())
+        session.commit()
+
+    def run(_):
+        start = time.perf_counter()
+        res = app.test_client().post("/auth/signin",
+                                     json={
+                                         "username": USERNAME,
+                                         "password": PASSWORD
+                                     })
+        assert res.status_code == 200, res.get_json()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(run, range(requests)))
+    total = time.perf_counter() - start
+
+    return statistics.median(latencies) * 1000, requests / total
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--rounds", type=int, action="append")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers",
+                        type=int,
+                        default=TestingConfig.PASSWORD_HASH_WORKERS,
+                        help="threads computing hashes")
+    args = parser.parse_args()
+
+    print(f"{'rounds':>10}{'p50 ms':>10}{'signin/s':>10}")
+    for rounds in args.rounds or [10_000, 29_000, 100_000, 300_000]:
+        p50, throughput = measure(rounds, args.requests, args.concurrency,
+                                  args.workers)
+        print(f"{rounds:>10}{p50:>10.1f}{throughput:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Measure cold start of a worker, importing app and running create_app in a
+fresh interpreter, with api docs enabled and disabled
+
+    python benchmarks/bench_startup.py --runs 20
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+from app import create_app
+from app.config import TestingConfig
+imported = time.perf_counter()
+app = create_app(TestingConfig)
+created = time.perf_counter()
+app.test_client().get("/apispec_v1.json")
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "first_spec_ms": (time.perf_counter() - created) * 1000,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "flasgger_loaded": "flasgger" in sys.modules
+}))
+"""
+
+
+def probe(swagger_enabled: bool) -> dict:
+    """
+    Start an interpreter and time app start up
+    """
+    env = {**os.environ, "SWAGGER_ENABLED": str(swagger_enabled).lower()}
+    output = subprocess.run([sys.executable, "-c", PROBE],
+                            cwd=ROOT,
+                            env=env,
+                            capture_output=True,
+                            check=True,
+                            text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'swagger':<10}{'import ms':>11}{'create ms':>11}"
+          f"{'total ms':>10}{'rss MB':>9}")
+    for enabled in (True, False):
+        samples = [probe(enabled) for _ in range(args.runs)]
+        median = {
+            key: statistics.median(s[key] for s in samples)
+            for key in ("import_ms", "create_app_ms", "max_rss_mb")
+        }
+        print(f"{'on' if enabled else 'off':<10}{median['import_ms']:>11.0f}"
+              f"{median['create_app_ms']:>11.0f}"
+              f"{median['import_ms'] + median['create_app_ms']:>10.0f}"
+              f"{median['max_rss_mb']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Compare payload validation by rules of each validator called one by one with
+the rules bound to their fields, over patient and appointment payloads
+
+    python benchmarks/bench_validations.py --payloads 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models import Appointment, Patient  # noqa: E402
+from app.validations import validation_errors  # noqa: E402
+
+
+def patient_payloads(count: int) -> list[dict]:
+    """
+    Patients as posted by front end, with masks and every tenth invalid
+    """
+    return [{
+        "name": "Maria da Silva" if i % 10 else "M",
+        "cpf": "529.982.247-25" if i % 10 else "111.111.111-12",
+        "registration": f"{i:08}",
+        "phone": "(11) 98765-4321",
+        "birthdate": "1990-05-17" if i % 10 else "1990-02-30"
+    } for i in range(count)]
+
+
+def appointment_payloads(count: int) -> list[dict]:
+    """
+    Appointments as posted by front end, every tenth without patient
+    """
+    return [{
+        "scheduled_day": "2024-01-31",
+        "start_time": str(480 + i % 16 * 30),
+        "end_time": 510 + i % 16 * 30,
+        "patient_id": i if i % 10 else None,
+        "acting_id": str(i % 50)
+    } for i in range(count)]
+
+
+def legacy_validate(payload: dict, validators: dict) -> dict:
+    errors = {}
+    for field, validator in validators.items():
+        if validator.nullable and payload.get(validator.field) is None:
+            continue
+        for function, args in validator.rules:
+            if result := function(validator.field, payload, *args):
+                errors[field] = result
+                break
+    return errors
+
+
+def measure(validate, payloads: list[dict]) -> float:
+    """
+    Seconds validating copies of payloads, as bodies are normalized in place
+    """
+    bodies = [dict(payload) for payload in payloads]
+    start = time.perf_counter()
+    for body in bodies:
+        validate(body)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--payloads", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"{'schema':<14}{'legacy ms':>11}{'bound ms':>13}{'speedup':>9}")
+    for name, validators, payloads in (
+        ("patient", Patient.validators, patient_payloads(args.payloads)),
+        ("appointment", Appointment.validators,
+         appointment_payloads(args.payloads)),
+    ):
+        legacy = measure(
+            lambda body, validators=validators: legacy_validate(
+                body, validators), payloads)
+        bound = measure(
+            lambda body, validators=validators: validation_errors(
+                body, validators), payloads)
+        print(f"{name:<14}{legacy * 1000:>11.0f}{bound * 1000:>13.0f}"
+              f"{legacy / bound:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Gunicorn settings, run with: gunicorn "app:create_app()"
+
+Metrics of all workers are aggregated through files in PROMETHEUS_MULTIPROC_DIR,
+which must be set in environment before gunicorn starts
+"""
+import os
+import shutil
+
+from prometheus_client import multiprocess
+
+bind = os.environ.get("GUNICORN_BIND") or "0.0.0.0:5000"
+workers = int(os.environ.get("GUNICORN_WORKERS") or 2)
+threads = int(os.environ.get("GUNICORN_THREADS") or 1)
+
+
+def on_starting(_):
+    """
+    Clear metrics left by a previous run
+    """
+    if directory := os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(_, worker):
+    """
+    Drop live metrics of a dead worker
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def post_worker_init(worker):
+    """
+    Open database connections of worker pool before it accepts requests
+    """
+    from app.helpers.pool import warm_up_app  # pylint: disable=import-outside-toplevel
+
+    opened = warm_up_app(worker.wsgi)
+    worker.log.info("worker %s warmed up %s database connections", worker.pid,
+                    opened)
@@ -34,6 +34,8 @@ def fixture_app():
     config = app_configs["test"]
     flask_app = create_app(config)
     flask_app.test_client_class = TestClient
+    with flask_app.app_context():
+        set_up_db()
 
     yield flask_app
 
@@ -43,8 +45,6 @@ def fixture_client(app):
     """
     Client a flask test client
     """
-    with app.app_context():
-        set_up_db()
     return app.test_client()
 
 
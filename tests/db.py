@@ -1,7 +1,12 @@
+import sys
+from datetime import date
+
 from faker import Faker
 
-from factory import PatientBuilder, ClinicBuilder
-from app.models import db, session
+from factory import PatientBuilder, ClinicBuilder, ProfessionalBuilder, SpecialtyBuilder
+from app.models import db, session, Acting, Schedule, Appointment, Patient
+from app.models.occupancy import get_schedules_of_appointment, reserve_occupancies
+from app.models.search import index_document
 
 fake = Faker(["pt_BR"])
 
@@ -9,6 +14,19 @@ NUMBERS_PATIENTS = 5
 NUMBERS_CLINICS = 5
 
 
+def occupy(acting_id, scheduled_day: date, start_time: int):
+    """
+    Count visit of an appointment in schedules that cover it, whatever their
+    max visits
+    """
+    schedule_ids = get_schedules_of_appointment(acting_id, scheduled_day,
+                                                start_time)
+    reserve_occupancies(
+        {(schedule_id, scheduled_day): 1
+         for schedule_id in schedule_ids},
+        dict.fromkeys(schedule_ids, sys.maxsize))
+
+
 def _fk_pragma_on_connect(dbapi_con, _):
     """
     Enable FK constraint in sqllite
@@ -22,7 +40,7 @@ def set_up_db():
     """
     from sqlalchemy import event
     event.listen(db.engine, 'connect', _fk_pragma_on_connect)
-    db.create_all()
+    db.create_all(bind_key=None)
 
 
 def populate_patients(num_rows=NUMBERS_PATIENTS, created_patients=None):
@@ -36,12 +54,14 @@ def populate_patients(num_rows=NUMBERS_PATIENTS, created_patients=None):
             ) if i % 2 == 0 else PatientBuilder().build_object()
             db.session.add(patient)
             session.flush()
+            index_document(Patient.__tablename__, patient.id, patient.name)
             patients.append(patient.as_json())
 
         if created_patients:
             for patient in created_patients:
                 db.session.add(patient)
                 session.flush()
+                index_document(Patient.__tablename__, patient.id, patient.name)
                 patients.append(patient.as_json())
 
         session.commit()
@@ -69,3 +89,65 @@ def populate_clinics(num_rows=NUMBERS_CLINICS, created_clinics=None):
 
         session.commit()
     return clinics
+
+
+def populate_calendar(week_days, start_time=480, end_time=720, max_visits=1):
+    """
+    Populate a clinic with a specialty and schedules of a professional in week days
+    """
+    with db.session():
+        clinic = ClinicBuilder().build_object()
+        professional = ProfessionalBuilder().build_object()
+        specialty = SpecialtyBuilder().build_object()
+        patient = PatientBuilder().build_object()
+        db.session.add_all([clinic, professional, specialty, patient])
+        session.flush()
+
+        acting = Acting(clinic_id=clinic.id,
+                        professional_id=professional.id,
+                        specialty_id=specialty.id)
+        db.session.add(acting)
+        session.flush()
+
+        schedules = []
+        for week_day in week_days:
+            schedule = Schedule(start_date=date(2020, 1, 1),
+                                start_time=start_time,
+                                end_time=end_time,
+                                max_visits=max_visits,
+                                week_day=week_day,
+                                acting_id=acting.id)
+            db.session.add(schedule)
+            session.flush()
+            schedules.append(schedule.as_json())
+
+        calendar = {
+            "clinic_id": clinic.id,
+            "specialty_id": specialty.id,
+            "professional_id": professional.id,
+            "patient_id": patient.id,
+            "acting_id": acting.id,
+            "schedules": schedules
+        }
+        session.commit()
+    return calendar
+
+
+def populate_appointments(acting_id, patient_id, days, start_time=480):
+    """
+    Populate table appointments with one appointment in each day
+    """
+    appointments = []
+    with db.session():
+        for day in days:
+            appointment = Appointment(scheduled_day=day,
+                                      start_time=start_time,
+                                      patient_id=patient_id,
+                                      acting_id=acting_id)
+            db.session.add(appointment)
+            occupy(acting_id, day, start_time)
+            session.flush()
+            appointments.append(appointment.as_json())
+
+        session.commit()
+    return appointments
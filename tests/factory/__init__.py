@@ -1,2 +1,5 @@
 from .patient_builder import PatientBuilder
 from .clinic_builder import ClinicBuilder
+from .professional_builder import ProfessionalBuilder
+from .specialty_builder import SpecialtyBuilder
+from .user_builder import UserBuilder
@@ -0,0 +1,70 @@
+from faker import Faker
+
+from app.models import Professional
+
+fake = Faker(["pt_BR"])
+
+
+class ProfessionalBuilder():
+
+    def __init__(self):
+        self.professional = {
+            "name": fake.name(),
+            "phone": fake.msisdn()[-10:],
+            "username": fake.pystr(min_chars=8, max_chars=20),
+            "email": fake.email(),
+        }
+
+    def with_name(self, value: str):
+        """
+        Set a name to build
+        """
+        self.professional["name"] = value
+        return self
+
+    def with_phone(self, value: str):
+        """
+        Set a phone to build
+        """
+        self.professional["phone"] = value
+        return self
+
+    def with_username(self, value: str):
+        """
+        Set a username to build
+        """
+        self.professional["username"] = value
+        return self
+
+    def with_email(self, value: str):
+        """
+        Set a email to build
+        """
+        self.professional["email"] = value
+        return self
+
+    def with_password(self, value: str):
+        """
+        Set a password to build
+        """
+        self.professional["password"] = value
+        return self
+
+    def complete(self):
+        """
+        Complete with field no required
+        """
+        self.professional["reg_number"] = fake.pystr_format("CRM-####")
+        return self
+
+    def build(self):
+        """
+        Build professional
+        """
+        return self.professional
+
+    def build_object(self):
+        """
+        Build professional as object
+        """
+        return Professional(**self.professional)
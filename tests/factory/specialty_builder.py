@@ -0,0 +1,32 @@
+from faker import Faker
+
+from app.models import Specialty
+
+fake = Faker(["pt_BR"])
+
+
+class SpecialtyBuilder():
+
+    def __init__(self):
+        self.specialty = {
+            "description": fake.job()[:255],
+        }
+
+    def with_description(self, value: str):
+        """
+        Set a description to build
+        """
+        self.specialty["description"] = value
+        return self
+
+    def build(self):
+        """
+        Build specialty
+        """
+        return self.specialty
+
+    def build_object(self):
+        """
+        Build specialty as object
+        """
+        return Specialty(**self.specialty)
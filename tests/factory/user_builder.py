@@ -0,0 +1,56 @@
+from faker import Faker
+
+from app.models import User
+
+fake = Faker(["pt_BR"])
+
+
+class UserBuilder():
+
+    def __init__(self, clinic_id: int):
+        self.user = {
+            "name": fake.name(),
+            "username": fake.pystr(min_chars=8, max_chars=20),
+            "email": fake.email(),
+            "clinic_id": clinic_id,
+        }
+
+    def with_username(self, value: str):
+        """
+        Set a username to build
+        """
+        self.user["username"] = value
+        return self
+
+    def with_email(self, value: str):
+        """
+        Set a email to build
+        """
+        self.user["email"] = value
+        return self
+
+    def with_password(self, value: str):
+        """
+        Set a password to build
+        """
+        self.user["password"] = value
+        return self
+
+    def inactive(self):
+        """
+        Build a deactivated user
+        """
+        self.user["active"] = False
+        return self
+
+    def build(self):
+        """
+        Build user
+        """
+        return self.user
+
+    def build_object(self):
+        """
+        Build user as object
+        """
+        return User(**self.user)
@@ -0,0 +1,127 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text, inspect
+
+from app.models import db, session, select, Appointment, Schedule, Acting, Patient
+from app.models.principal import principal_statement
+from app.helpers.pagination import paginate
+from app.routes import appointment, schedule, acting, patient
+
+
+def query_plan(stmt):
+    """
+    Obtain sqlite query plan details of statement
+    """
+    sql = str(stmt.compile(db.engine, compile_kwargs={"literal_binds": True}))
+    return " | ".join(row[-1] for row in session.execute(
+        text("EXPLAIN QUERY PLAN " + sql)).all())
+
+
+def test_appointments_base_query_should_use_acting_day_start_index(app):
+    """
+    Should search appointments by acting and day using composite index
+    """
+    with app.app_context():
+        plan = query_plan(
+            appointment.base_query.where(
+                Appointment.acting_id == 1,
+                Appointment.scheduled_day >= date(2024, 1, 1)).order_by(
+                    Appointment.scheduled_day, Appointment.start_time))
+
+    assert "USING INDEX ix_appointments_acting_day_start" in plan
+
+
+def test_schedules_base_query_should_use_acting_week_day_index(app):
+    """
+    Should search schedules by acting using composite index
+    """
+    with app.app_context():
+        plan = query_plan(
+            schedule.base_query.where(Schedule.acting_id == 1,
+                                      Schedule.week_day == 0))
+
+    assert "USING INDEX ix_schedules_acting_week_day" in plan
+
+
+def test_actuations_base_query_should_use_clinic_specialty_index(app):
+    """
+    Should search actuations by clinic and specialty using composite index
+    """
+    with app.app_context():
+        plan = query_plan(
+            acting.base_query.where(Acting.clinic_id == 1,
+                                    Acting.specialty_id == 1))
+
+    assert "USING INDEX ix_actuations_clinic_specialty" in plan
+
+
+def test_calendar_schedules_query_should_use_composite_indexes(app):
+    """
+    Should search calendar schedules only with composite indexes
+    """
+    with app.app_context():
+        plan = query_plan(
+            select(Schedule.id).join(
+                Acting, Acting.id == Schedule.acting_id).where(
+                    Acting.clinic_id == 1, Acting.specialty_id == 1,
+                    Schedule.week_day == 0))
+
+    assert "INDEX ix_actuations_clinic_specialty" in plan
+    assert "INDEX ix_schedules_acting_week_day" in plan
+
+
+def test_db_upgrade_command_should_create_missing_indexes(app):
+    """
+    Should create indexes missing in existing database
+    """
+    with app.app_context():
+        session.execute(text("DROP INDEX ix_appointments_acting_day_start"))
+        session.commit()
+
+    result = app.test_cli_runner().invoke(args=["db", "upgrade"])
+
+    assert result.exit_code == 0
+    assert "index ix_appointments_acting_day_start created on appointments" in result.output
+
+    with app.app_context():
+        indexes = inspect(db.engine).get_indexes("appointments")
+    assert "ix_appointments_acting_day_start" in [ix["name"] for ix in indexes]
+
+
+def test_principal_query_should_use_username_and_email_indexes(app):
+    """
+    Should search users and professionals login only with indexes
+    """
+    with app.app_context():
+        plan = query_plan(principal_statement("login", "login"))
+
+    for index in ("ix_users_username", "ix_users_email",
+                  "ix_professionals_username", "ix_professionals_email"):
+        assert f"INDEX {index}" in plan
+
+
+@pytest.mark.parametrize("stmt, keyset, cursor, index", [
+    (select(Patient), patient.patients_keyset,
+     {"created_at": datetime(2024, 1, 1), "id": 10}, "ix_patients_created_at_id"),
+    (acting.base_query, acting.actuations_keyset,
+     {"created_at": datetime(2024, 1, 1), "id": 10}, "ix_actuations_created_at_id"),
+    (appointment.base_query, appointment.appointments_keyset,
+     {"scheduled_day": date(2024, 1, 1), "start_time": 480, "end_time": None, "id": 10},
+     "ix_appointments_day_start_end"),
+    (schedule.base_query.where(Schedule.acting_id == 1), schedule.schedules_keyset,
+     {"week_day": 0, "start_time": 480, "id": 10}, "ix_schedules_acting_week_day"),
+])
+def test_cursor_pages_should_scan_sort_key_index_without_sorting(app, stmt, keyset, cursor, index):
+    """
+    Should read pages after a cursor from the index of their sort key, in
+    its order
+    """
+    with app.app_context():
+        plan = query_plan(
+            paginate(stmt, keyset,
+                     {"cursor": keyset.encode(SimpleNamespace(**cursor))}))
+
+    assert f"INDEX {index}" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,121 @@
+from datetime import date
+
+from db import populate_calendar, occupy
+
+from app.models import Appointment, ScheduleOccupancy, session, select
+from app.models.occupancy import rebuild_occupancy, reserve_occupancies
+
+MONDAY = date(2024, 1, 1)
+
+
+def add_appointments(calendar, days, start_time):
+    """
+    Add appointments without maintaining occupancy
+    """
+    for day in days:
+        session.add(
+            Appointment(scheduled_day=day,
+                        start_time=start_time,
+                        patient_id=calendar["patient_id"],
+                        acting_id=calendar["acting_id"]))
+    session.commit()
+
+
+def test_should_rebuild_occupancy_from_existing_appointments(app):
+    """
+    Should count appointments in schedule time on schedule week day
+    """
+    with app.app_context():
+        calendar = populate_calendar([0], start_time=480, end_time=720)
+        add_appointments(calendar, [MONDAY, MONDAY, date(2024, 1, 8)], 480)
+        # out of schedule time and week day
+        add_appointments(calendar, [MONDAY, date(2024, 1, 2)], 720)
+
+        assert rebuild_occupancy() == 2
+        session.commit()
+
+        occupancy = session.execute(
+            select(ScheduleOccupancy.scheduled_day,
+                   ScheduleOccupancy.booked).order_by(
+                       ScheduleOccupancy.scheduled_day)).all()
+
+    assert [tuple(o) for o in occupancy] == [(MONDAY, 2), (date(2024, 1, 8), 1)]
+
+
+def test_should_reserve_and_release_occupancies_in_one_pass(app):
+    """
+    Should add visits to days already booked, create days booked first time
+    and release visits of days booked, skipping released days never booked
+    """
+    with app.app_context():
+        calendar = populate_calendar([0], max_visits=5)
+        schedule_id = calendar["schedules"][0]["id"]
+        occupy(calendar["acting_id"], MONDAY, 480)
+        occupy(calendar["acting_id"], date(2024, 1, 15), 480)
+
+        assert reserve_occupancies(
+            {
+                (schedule_id, MONDAY): 2,
+                (schedule_id, date(2024, 1, 8)): 3,
+                (schedule_id, date(2024, 1, 15)): -1,
+                (schedule_id, date(2024, 1, 22)): -1
+            }, {schedule_id: 5})
+        session.commit()
+
+        occupancy = session.execute(
+            select(ScheduleOccupancy.scheduled_day,
+                   ScheduleOccupancy.booked).order_by(
+                       ScheduleOccupancy.scheduled_day)).all()
+
+    assert [tuple(o) for o in occupancy] == [(MONDAY, 3), (date(2024, 1, 8), 3),
+                                             (date(2024, 1, 15), 0)]
+
+
+def test_should_keep_writes_of_transaction_whether_reservation_fails(app):
+    """
+    Should roll back only visits of a failed reservation, keeping writes made
+    before it in current transaction
+    """
+    with app.app_context():
+        calendar = populate_calendar([0], max_visits=1)
+        schedule_id = calendar["schedules"][0]["id"]
+        occupy(calendar["acting_id"], MONDAY, 480)
+        session.commit()
+
+        appointment = Appointment(
+            scheduled_day=date(2024, 1, 8),
+            start_time=480,
+            patient_id=calendar["patient_id"],
+            acting_id=calendar["acting_id"])
+        session.add(appointment)
+        session.flush()
+
+        assert not reserve_occupancies(
+            {
+                (schedule_id, date(2024, 1, 8)): 1,
+                (schedule_id, MONDAY): 1
+            }, {schedule_id: 1})
+        session.commit()
+
+        days = session.execute(select(Appointment.scheduled_day)).scalars().all()
+        occupancy = session.execute(
+            select(ScheduleOccupancy.scheduled_day,
+                   ScheduleOccupancy.booked).order_by(
+                       ScheduleOccupancy.scheduled_day)).all()
+
+    assert days == [date(2024, 1, 8)]
+    assert [tuple(o) for o in occupancy] == [(MONDAY, 1), (date(2024, 1, 8), 0)]
+
+
+def test_should_rebuild_occupancy_with_cli_command(app):
+    """
+    Should rebuild occupancy when occupancy rebuild command is invoked
+    """
+    with app.app_context():
+        calendar = populate_calendar([0])
+        add_appointments(calendar, [MONDAY], 480)
+
+    result = app.test_cli_runner().invoke(args=["occupancy", "rebuild"])
+
+    assert result.exit_code == 0
+    assert "1 schedule occupancy rows rebuilt" in result.output
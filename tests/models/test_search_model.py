@@ -0,0 +1,136 @@
+from sqlalchemy.dialects import mysql
+
+from factory import PatientBuilder
+
+from app.models import Patient, SearchDocument, session, select
+from app.models.search import normalize, trigrams, search_text, search_digits, index_document
+
+
+def search_patients(criteria):
+    """
+    Obtain names of patients matching criteria
+    """
+    return sorted(session.execute(select(Patient.name).where(criteria)).scalars())
+
+
+def add_patients(*names, cpf=None):
+    """
+    Add and index patients with names
+    """
+    for name in names:
+        builder = PatientBuilder().with_name(name)
+        if cpf:
+            builder.with_cpf(cpf)
+        patient = builder.build_object()
+        session.add(patient)
+        session.flush()
+        index_document(Patient.__tablename__, patient.id, patient.name)
+
+
+def test_should_normalize_accents_case_and_punctuation():
+    """
+    Should fold accents, lower case and collapse not alphanumeric characters
+    """
+    assert normalize("  José da SILVA-Ávila ") == "jose da silva avila"
+    assert normalize("Conceição") == "conceicao"
+    assert trigrams("joao") == {"joa", "oao"}
+    assert trigrams("jo") == set()
+
+
+def test_should_search_patients_by_substring_of_name_ignoring_accents(app):
+    """
+    Should find patients whose name contains the text searched
+    """
+    with app.app_context():
+        add_patients("João Gonçalves", "Maria da Conceição", "Joana Alves")
+
+        assert search_patients(search_text("patients", Patient.id, "goncal")) == ["João Gonçalves"]
+        assert search_patients(search_text("patients", Patient.id, "JOAO G")) == ["João Gonçalves"]
+        assert search_patients(search_text("patients", Patient.id, "alves")) == ["Joana Alves", "João Gonçalves"]
+        assert search_patients(search_text("patients", Patient.id, "jo")) == ["Joana Alves", "João Gonçalves"]
+        assert search_patients(search_text("patients", Patient.id, "aoga")) == []
+        assert search_patients(search_text("patients", Patient.id, "100%")) == []
+
+
+def test_should_search_patients_by_prefix_of_cpf_digits(app):
+    """
+    Should find patients whose cpf starts with digits searched
+    """
+    with app.app_context():
+        add_patients("Foo Bar", cpf="52998224725")
+
+        assert search_patients(search_digits(Patient.cpf, "529.982")) == ["Foo Bar"]
+        assert search_patients(search_digits(Patient.cpf, "52998224725")) == ["Foo Bar"]
+        assert search_patients(search_digits(Patient.cpf, "998224725")) == []
+        assert search_patients(search_digits(Patient.cpf, "not digits")) == []
+
+
+def punctuation_first(left: str, right: str) -> int:
+    """
+    Collation ordering punctuation before digits, as accent insensitive
+    collations of mysql do
+    """
+    def key(value):
+        return [(c.isalnum(), c) for c in value]
+
+    return (key(left) > key(right)) - (key(left) < key(right))
+
+
+def test_should_search_prefix_of_digits_whatever_the_collation(app):
+    """
+    Should find cpf prefix under a collation ordering punctuation before
+    digits, compiled to a LIKE prefix on mysql
+    """
+    with app.app_context():
+        add_patients("Foo Bar", cpf="52998224725")
+        session.connection().connection.driver_connection.create_collation(
+            "punctuation_first", punctuation_first)
+
+        assert search_patients(
+            search_digits(Patient.cpf.collate("punctuation_first"),
+                          "529.982")) == ["Foo Bar"]
+
+    sql = str(
+        search_digits(Patient.cpf, "529.982").compile(
+            dialect=mysql.dialect(), compile_kwargs={"literal_binds": True}))
+    assert sql == "patients.cpf LIKE concat('529982', '%%') ESCAPE '/'"
+
+
+def test_should_keep_search_index_in_sync_with_patient_routes(app, client):
+    """
+    Should reindex patient when updated and remove it when deleted
+    """
+    patient = PatientBuilder().with_name("Ana Conceição").build()
+    patient_id = client.post("/api/patients", json=patient).get_json()["id"]
+
+    res = client.get("/api/patients", query_string={"name": "conceicao"})
+    assert [p["id"] for p in res.get_json()] == [patient_id]
+
+    patient = PatientBuilder().with_name("Ana Souza").build()
+    assert client.put(f"/api/patients/{patient_id}", json=patient).status_code == 200
+
+    assert client.get("/api/patients", query_string={"name": "conceicao"}).get_json() == []
+    res = client.get("/api/patients", query_string={"name": "souza"})
+    assert [p["id"] for p in res.get_json()] == [patient_id]
+
+    client.delete(f"/api/patients/{patient_id}")
+
+    with app.app_context():
+        assert session.execute(select(SearchDocument.id)).first() is None
+
+
+def test_should_rebuild_search_index_with_cli_command(app):
+    """
+    Should index existing patients when search rebuild command is invoked
+    """
+    with app.app_context():
+        session.add(PatientBuilder().with_name("Ana Conceição").build_object())
+        session.commit()
+
+    result = app.test_cli_runner().invoke(args=["search", "rebuild"])
+
+    assert result.exit_code == 0
+    assert "1 patients indexed" in result.output
+
+    with app.app_context():
+        assert search_patients(search_text("patients", Patient.id, "ceic")) == ["Ana Conceição"]
@@ -0,0 +1,22 @@
+from contextlib import contextmanager
+
+from flask import g, request, request_finished
+
+
+@contextmanager
+def assert_max_queries(app, max_count):
+    """
+    Assert that each request done inside block issues at most max_count queries
+    """
+    captured = []
+
+    def on_request_finished(_, **__):
+        captured.append((request.method, request.path, g.last_query_stats))
+
+    with request_finished.connected_to(on_request_finished, app):
+        yield captured
+
+    assert captured, "no request was done"
+    for method, path, stats in captured:
+        assert stats.count <= max_count, \
+            f"{method} {path} issued more than {max_count} queries, {stats.report()}"
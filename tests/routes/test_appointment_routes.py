@@ -0,0 +1,277 @@
+import json
+from datetime import date, timedelta
+
+from werkzeug.datastructures import Headers
+
+from db import populate_calendar, populate_appointments
+from queries import assert_max_queries
+
+from app.models import Appointment, Patient, session, select, update
+from app.models.occupancy import ScheduleOccupancy
+
+MONDAY = date(2024, 1, 1)
+
+
+def test_should_return_all_appointments_following_next_cursor_ordered_by_day_and_time(
+        app, client):
+    """
+    Should return status 200 and all appointments once following next cursor header
+    """
+    days = [MONDAY + timedelta(weeks=w) for w in range(5)]
+    with app.app_context():
+        calendar = populate_calendar([0], max_visits=10)
+        appointments = populate_appointments(calendar["acting_id"], calendar["patient_id"], days, 600)
+        appointments += populate_appointments(calendar["acting_id"], calendar["patient_id"], days, 480)
+        appointments += populate_appointments(calendar["acting_id"], calendar["patient_id"], days, 480)
+        session.execute(
+            update(Appointment).where(Appointment.id == appointments[-1]["id"]).values(end_time=540))
+        session.commit()
+    appointments[-1]["end_time"] = 540
+
+    res = client.get("/api/appointments", query_string={"limit": 4})
+    res_appointments = res.get_json()
+    cursor = res.headers.get("X-Next-Cursor")
+
+    while cursor:
+        res = client.get("/api/appointments", query_string={"limit": 4, "cursor": cursor})
+        assert res.status_code == 200
+        res_appointments.extend(res.get_json())
+        cursor = res.headers.get("X-Next-Cursor")
+
+    expected = sorted(appointments,
+                      key=lambda a: (a["scheduled_day"], a["start_time"], a.get("end_time") or -1, a["id"]))
+
+    assert [a["id"] for a in res_appointments] == [a["id"] for a in expected]
+
+
+def test_should_stream_appointments_of_clinic_in_period_as_ndjson(app, client):
+    """
+    Should return status 200 and every appointment of clinic in period, one json per line
+    """
+    days = [MONDAY + timedelta(weeks=w) for w in range(30)]
+    with app.app_context():
+        calendar = populate_calendar([0], max_visits=2)
+        appointments = populate_appointments(calendar["acting_id"], calendar["patient_id"], days)
+        populate_appointments(calendar["acting_id"], calendar["patient_id"], [days[-1] + timedelta(weeks=1)])
+
+    res = client.get("/api/appointments",
+                     query_string={
+                         "clinic_id": calendar["clinic_id"],
+                         "start_date": days[0].isoformat(),
+                         "end_date": (days[-1] + timedelta(days=1)).isoformat(),
+                         "stream": "true"
+                     })
+
+    assert res.status_code == 200
+    assert res.mimetype == "application/x-ndjson"
+
+    res_appointments = [json.loads(line) for line in res.get_data().splitlines()]
+    assert [a["id"] for a in res_appointments] == [a["id"] for a in appointments]
+    assert res_appointments[0]["scheduled_day"] == days[0].isoformat()
+    assert res_appointments[0]["clinic_id"] == calendar["clinic_id"]
+
+
+def bulk_item(calendar, day, start_time=480, **fields):
+    """
+    Appointment of bulk payload in calendar
+    """
+    return {
+        "scheduled_day": day.isoformat(),
+        "start_time": start_time,
+        "patient_id": calendar["patient_id"],
+        "acting_id": calendar["acting_id"],
+        **fields
+    }
+
+
+def test_should_create_all_appointments_of_bulk_and_occupy_their_schedules(
+        app, client):
+    """
+    Should return status 201 and all appointments created with joined columns
+    """
+    days = [MONDAY + timedelta(weeks=w) for w in range(10)]
+    with app.app_context():
+        calendar = populate_calendar([0])
+
+    # reservation of visits runs in a savepoint, begun and released
+    with assert_max_queries(app, 12):
+        res = client.post("/api/appointments/bulk",
+                          json={
+                              "appointments": [
+                                  bulk_item(calendar, day, complaint="pain")
+                                  for day in days
+                              ]
+                          })
+
+    assert res.status_code == 201
+    res_appointments = res.get_json()
+    assert [a["scheduled_day"] for a in res_appointments] == [d.isoformat() for d in days]
+    assert all(a["clinic_id"] == calendar["clinic_id"] for a in res_appointments)
+    assert res_appointments[0]["complaint"] == "pain"
+
+    res = client.get("/api/calendar/free/days",
+                     query_string={
+                         "clinic_id": calendar["clinic_id"],
+                         "specialty_id": calendar["specialty_id"],
+                         "start_date": MONDAY.isoformat(),
+                         "num_days": 1
+                     })
+    assert res.get_json() == [(MONDAY + timedelta(weeks=10)).isoformat()]
+
+
+def test_should_return_422_and_create_nothing_whether_bulk_items_are_invalid(
+        app, client):
+    """
+    Should return status 422 with errors by item and field and create no appointment
+    """
+    with app.app_context():
+        calendar = populate_calendar([0])
+
+    res = client.post("/api/appointments/bulk",
+                      json={
+                          "appointments": [
+                              bulk_item(calendar, MONDAY),
+                              bulk_item(calendar, MONDAY, start_time="x"),
+                              bulk_item(calendar, MONDAY, patient_id=999),
+                              "not an appointment"
+                          ]
+                      })
+
+    assert res.status_code == 422
+    assert set(res.get_json().keys()) == {"appointments[1].start_time", "appointments[3]"}
+
+    res = client.post("/api/appointments/bulk",
+                      json={
+                          "appointments": [
+                              bulk_item(calendar, MONDAY),
+                              bulk_item(calendar, MONDAY, patient_id=999),
+                              bulk_item(calendar, MONDAY, acting_id=999)
+                          ]
+                      })
+
+    assert res.status_code == 422
+    assert set(res.get_json().keys()) == {"appointments[1].patient_id", "appointments[2].acting_id"}
+
+    with app.app_context():
+        assert session.execute(select(Appointment.id)).first() is None
+
+
+def test_should_return_422_with_items_whose_schedule_is_fully_booked(
+        app, client):
+    """
+    Should return status 422 with items exceeding schedule visits, counting booked and previous items
+    """
+    with app.app_context():
+        calendar = populate_calendar([0], max_visits=2)
+        populate_appointments(calendar["acting_id"], calendar["patient_id"], [MONDAY])
+
+    res = client.post("/api/appointments/bulk",
+                      json={
+                          "appointments": [
+                              bulk_item(calendar, MONDAY),
+                              bulk_item(calendar, MONDAY + timedelta(weeks=1)),
+                              bulk_item(calendar, MONDAY, start_time=600),
+                              bulk_item(calendar, MONDAY + timedelta(days=1))
+                          ]
+                      })
+
+    assert res.status_code == 422
+    assert list(res.get_json().keys()) == ["appointments[2].start_time"]
+
+    with app.app_context():
+        assert len(session.execute(select(Appointment.id)).all()) == 1
+
+
+def test_should_return_422_whether_schedule_is_fully_booked(app, client):
+    """
+    Should return status 422 and keep occupancy whether no visit is left in day
+    """
+    with app.app_context():
+        calendar = populate_calendar([0], max_visits=1)
+
+    res = client.post("/api/appointments", json=bulk_item(calendar, MONDAY))
+    assert res.status_code == 201
+
+    res = client.post("/api/appointments",
+                      json=bulk_item(calendar, MONDAY, start_time=600))
+    assert res.status_code == 422
+    assert list(res.get_json().keys()) == ["start_time"]
+
+    with app.app_context():
+        assert len(session.execute(select(Appointment.id)).all()) == 1
+        assert session.execute(select(ScheduleOccupancy.booked)).scalars().all() == [1]
+
+
+def test_should_move_appointment_in_its_fully_booked_day_but_not_to_another(
+        app, client):
+    """
+    Should update time of an appointment in a fully booked day and return 422
+    whether it is moved to another fully booked day
+    """
+    next_monday = MONDAY + timedelta(weeks=1)
+    with app.app_context():
+        calendar = populate_calendar([0], max_visits=1)
+        appointment_id = populate_appointments(
+            calendar["acting_id"], calendar["patient_id"], [MONDAY])[0]["id"]
+        populate_appointments(calendar["acting_id"], calendar["patient_id"],
+                              [next_monday])
+
+    res = client.put(f"/api/appointments/{appointment_id}",
+                     json=bulk_item(calendar, MONDAY, start_time=600))
+    assert res.status_code == 200
+
+    res = client.put(f"/api/appointments/{appointment_id}",
+                     json=bulk_item(calendar, next_monday))
+    assert res.status_code == 422
+
+    with app.app_context():
+        assert session.execute(
+            select(ScheduleOccupancy.scheduled_day,
+                   ScheduleOccupancy.booked).order_by(
+                       ScheduleOccupancy.scheduled_day)).tuples().all() == [
+                           (MONDAY, 1), (next_monday, 1)]
+
+
+def test_should_return_422_whether_bulk_is_empty_or_too_large(app, client):
+    """
+    Should return status 422 whether bulk has no appointments or more than allowed
+    """
+    with app.app_context():
+        calendar = populate_calendar([0])
+
+    res = client.post("/api/appointments/bulk", json={"appointments": []})
+    assert res.status_code == 422
+
+    res = client.post("/api/appointments/bulk",
+                      json={"appointments": [bulk_item(calendar, MONDAY)] * 101})
+    assert res.status_code == 422
+    assert "appointments" in res.get_json()
+
+
+def test_should_change_appointments_etag_whether_joined_patient_changes(
+        app, client):
+    """
+    Should return status 200 and a new etag whether patient of a listed
+    appointment is renamed, 304 before it
+    """
+    with app.app_context():
+        calendar = populate_calendar([0])
+        populate_appointments(calendar["acting_id"], calendar["patient_id"], [MONDAY])
+
+    res = client.get("/api/appointments")
+    etag = res.headers["ETag"]
+
+    with assert_max_queries(app, 1):
+        res = client.get("/api/appointments", headers=Headers({"If-None-Match": etag}))
+    assert res.status_code == 304
+
+    with app.app_context():
+        session.execute(
+            update(Patient).where(Patient.id == calendar["patient_id"]).values(
+                name="Renamed"))
+        session.commit()
+
+    res = client.get("/api/appointments", headers=Headers({"If-None-Match": etag}))
+    assert res.status_code == 200
+    assert res.headers["ETag"] != etag
+    assert res.get_json()[0]["patient_name"] == "Renamed"
@@ -0,0 +1,90 @@
+import jwt
+import pytest
+from passlib.hash import pbkdf2_sha256
+
+from factory import ClinicBuilder, ProfessionalBuilder, UserBuilder
+from queries import assert_max_queries
+from app.models import session
+
+PASSWORD = "secret"
+HASHED = pbkdf2_sha256.hash(PASSWORD)
+
+
+@pytest.fixture(name="principals")
+def fixture_principals(app, client):
+    """
+    Populate an active user, an inactive user and professionals with login
+    """
+    with app.app_context():
+        clinic = ClinicBuilder().build_object()
+        session.add(clinic)
+        session.flush()
+        session.add_all([
+            UserBuilder(clinic.id).with_username("shared").with_email(
+                "admin@clinic.com").with_password(HASHED).build_object(),
+            UserBuilder(clinic.id).with_username("retired").with_password(
+                HASHED).inactive().build_object(),
+            ProfessionalBuilder().with_username("shared").with_password(
+                HASHED).build_object(),
+            ProfessionalBuilder().with_username("retired").with_password(
+                HASHED).build_object(),
+            ProfessionalBuilder().with_username("doctor").with_email(
+                "doctor@clinic.com").with_password(HASHED).build_object()
+        ])
+        session.commit()
+    return client
+
+
+def signin(client, username, password=PASSWORD):
+    """
+    Sign in and decode access token whether succeeded
+    """
+    res = client.post("/auth/signin",
+                      json={
+                          "username": username,
+                          "password": password
+                      })
+    token = res.get_json().get("access_token")
+    return res, token and jwt.decode(token, options={"verify_signature": False})
+
+
+@pytest.mark.parametrize("username", ["doctor", "doctor@clinic.com"])
+def test_should_sign_in_professional_in_one_query(app, principals, username):
+    """
+    Should return status 200 and professional token with a single query
+    """
+    with assert_max_queries(app, 1):
+        res, payload = signin(principals, username)
+
+    assert res.status_code == 200
+    assert payload["username"] == "doctor"
+    assert payload["admin"] is False
+
+
+def test_should_prefer_user_over_professional_with_same_login(principals):
+    """
+    Should sign in as admin user whether a professional has the same username
+    """
+    res, payload = signin(principals, "shared")
+
+    assert res.status_code == 200
+    assert payload["admin"] is True
+    assert payload["email"] == "admin@clinic.com"
+
+
+def test_should_ignore_inactive_users(principals):
+    """
+    Should sign in professional whether user with same username is inactive
+    """
+    res, payload = signin(principals, "retired")
+
+    assert res.status_code == 200
+    assert payload["admin"] is False
+
+
+def test_should_return_401_whether_credentials_are_wrong(principals):
+    """
+    Should return status 401 with wrong password or unknown login
+    """
+    assert signin(principals, "doctor", "wrong")[0].status_code == 401
+    assert signin(principals, "nobody")[0].status_code == 401
@@ -0,0 +1,212 @@
+from datetime import date, timedelta
+
+from db import populate_calendar, populate_appointments
+from queries import assert_max_queries
+
+MONDAY = date(2024, 1, 1)
+
+
+def get_free_days(client, calendar, start_date, **params):
+    """
+    Request free days of calendar
+    """
+    return client.get("/api/calendar/free/days",
+                      query_string={
+                          "clinic_id": calendar["clinic_id"],
+                          "specialty_id": calendar["specialty_id"],
+                          "start_date": start_date.isoformat(),
+                          **params
+                      })
+
+
+def test_should_return_next_days_of_schedules_week_days(app, client):
+    """
+    Should return status 200 and next days matching schedules week days
+    """
+    with app.app_context():
+        calendar = populate_calendar([0, 2])
+
+    res = get_free_days(client, calendar, MONDAY, num_days=4)
+
+    assert res.status_code == 200
+    assert res.get_json() == ["2024-01-01", "2024-01-03", "2024-01-08", "2024-01-10"]
+
+
+def test_should_skip_days_with_all_visits_booked(app, client):
+    """
+    Should return status 200 and only days with schedules not fully booked
+    """
+    with app.app_context():
+        calendar = populate_calendar([0, 2])
+        populate_appointments(calendar["acting_id"], calendar["patient_id"],
+                              [MONDAY, MONDAY + timedelta(days=2)])
+
+    res = get_free_days(client, calendar, MONDAY, num_days=4)
+
+    assert res.status_code == 200
+    assert res.get_json() == ["2024-01-08", "2024-01-10", "2024-01-15", "2024-01-17"]
+
+
+def test_should_search_beyond_fully_booked_weeks(app, client):
+    """
+    Should return status 200 and free days after many fully booked weeks
+    """
+    booked_days = [MONDAY + timedelta(weeks=w) for w in range(30)]
+    with app.app_context():
+        calendar = populate_calendar([0], max_visits=2)
+        populate_appointments(calendar["acting_id"], calendar["patient_id"],
+                              booked_days)
+        populate_appointments(calendar["acting_id"], calendar["patient_id"],
+                              booked_days)
+
+    with assert_max_queries(app, 6):
+        res = get_free_days(client, calendar, MONDAY, num_days=2)
+
+    assert res.status_code == 200
+    assert res.get_json() == [(MONDAY + timedelta(weeks=30)).isoformat(),
+                              (MONDAY + timedelta(weeks=31)).isoformat()]
+
+
+def test_should_ignore_first_day_schedules_starting_before_first_day_startime(
+        app, client):
+    """
+    Should return status 200 without first day whether its schedules start before first_day_startime
+    """
+    with app.app_context():
+        calendar = populate_calendar([0, 2], start_time=480)
+
+    res = get_free_days(client, calendar, MONDAY, num_days=2, first_day_startime=600)
+
+    assert res.status_code == 200
+    assert res.get_json() == ["2024-01-03", "2024-01-08"]
+
+
+def test_should_return_empty_list_whether_specialty_has_no_schedules(
+        app, client):
+    """
+    Should return status 200 and empty list whether specialty has no schedules in clinic
+    """
+    with app.app_context():
+        calendar = populate_calendar([])
+
+    res = get_free_days(client, calendar, MONDAY)
+
+    assert res.status_code == 200
+    assert res.get_json() == []
+
+
+def test_should_return_only_schedules_not_fully_booked_in_day(app, client):
+    """
+    Should return status 200 and schedules of day that are not fully booked
+    """
+    with app.app_context():
+        calendar = populate_calendar([0])
+        query_string = {
+            "clinic_id": calendar["clinic_id"],
+            "specialty_id": calendar["specialty_id"],
+            "day": MONDAY.isoformat()
+        }
+
+        res = client.get("/api/calendar/available/schedules", query_string=query_string)
+
+        assert res.status_code == 200
+        assert [sc["id"] for sc in res.get_json()] == [calendar["schedules"][0]["id"]]
+
+        populate_appointments(calendar["acting_id"], calendar["patient_id"], [MONDAY])
+
+    res = client.get("/api/calendar/available/schedules", query_string=query_string)
+
+    assert res.status_code == 200
+    assert res.get_json() == []
+
+
+def test_should_update_free_days_when_appointments_are_created_and_deleted(
+        app, client):
+    """
+    Should return status 200 and free days following appointments created and deleted
+    """
+    with app.app_context():
+        calendar = populate_calendar([0])
+
+    res = client.post("/api/appointments",
+                      json={
+                          "scheduled_day": MONDAY.isoformat(),
+                          "start_time": 480,
+                          "patient_id": calendar["patient_id"],
+                          "acting_id": calendar["acting_id"]
+                      })
+    assert res.status_code == 201
+    appointment_id = res.get_json()["id"]
+
+    res = get_free_days(client, calendar, MONDAY, num_days=1)
+    assert res.get_json() == ["2024-01-08"]
+
+    res = client.delete(f"/api/appointments/{appointment_id}")
+    assert res.status_code == 204
+
+    res = get_free_days(client, calendar, MONDAY, num_days=1)
+    assert res.get_json() == ["2024-01-01"]
+
+
+def test_should_serve_cached_specialties_until_schedule_is_created(app, client):
+    """
+    Should return status 200 without queries on repeated requests and new
+    specialties once a schedule is created in clinic
+    """
+    with app.app_context():
+        calendar = populate_calendar([0])
+        other = populate_calendar([1])
+    query_string = {"clinic_id": calendar["clinic_id"]}
+
+    res = client.get("/api/calendar/specialties", query_string=query_string)
+    assert [sp["id"] for sp in res.get_json()] == [calendar["specialty_id"]]
+
+    with assert_max_queries(app, 0):
+        res = client.get("/api/calendar/specialties", query_string=query_string)
+    assert res.status_code == 200
+    assert [sp["id"] for sp in res.get_json()] == [calendar["specialty_id"]]
+
+    res = client.put(f"/api/actuations/{other['acting_id']}",
+                     json={
+                         "clinic_id": calendar["clinic_id"],
+                         "professional_id": other["professional_id"],
+                         "specialty_id": other["specialty_id"]
+                     })
+    assert res.status_code == 200
+
+    res = client.get("/api/calendar/specialties", query_string=query_string)
+    assert res.status_code == 200
+    assert {sp["id"] for sp in res.get_json()} == {
+        calendar["specialty_id"], other["specialty_id"]
+    }
+
+
+def test_should_refresh_cached_schedules_when_appointments_are_booked(
+        app, client):
+    """
+    Should return status 200 without schedules fully booked by an appointment
+    created after the response was cached
+    """
+    with app.app_context():
+        calendar = populate_calendar([0])
+    query_string = {
+        "clinic_id": calendar["clinic_id"],
+        "specialty_id": calendar["specialty_id"],
+        "day": MONDAY.isoformat()
+    }
+
+    res = client.get("/api/calendar/available/schedules", query_string=query_string)
+    assert len(res.get_json()) == 1
+
+    res = client.post("/api/appointments",
+                      json={
+                          "scheduled_day": MONDAY.isoformat(),
+                          "start_time": 480,
+                          "patient_id": calendar["patient_id"],
+                          "acting_id": calendar["acting_id"]
+                      })
+    assert res.status_code == 201
+
+    res = client.get("/api/calendar/available/schedules", query_string=query_string)
+    assert res.status_code == 200
+    assert res.get_json() == []
@@ -1,7 +1,11 @@
+import json
+
 from faker import Faker
 from dateutil.parser import isoparse
+from werkzeug.datastructures import Headers
 
 from db import populate_patients
+from queries import assert_max_queries
 from factory import PatientBuilder
 from app.models import Patient, session, select
 
@@ -242,6 +246,76 @@ def test_should_return_diferent_patients_with_page_change_ordered_by_create_at_d
             assert page2_patients[i]["id"] != p["id"]
 
 
+def test_should_return_all_patients_following_next_cursor_ordered_by_created_at_descending(
+        app, client):
+    """
+    Should return status 200 and all patients once following next cursor header
+    """
+    with app.app_context():
+        patients = populate_patients(45)
+    patients = sorted(patients, key=lambda d: (d["created_at"], d["id"]), reverse=True)
+
+    res = client.get("/api/patients?page=1")
+    assert res.headers.get("X-Next-Cursor")
+
+    res_patients = []
+    cursor = ""
+    while True:
+        res = client.get("/api/patients", query_string={"cursor": cursor})
+        assert res.status_code == 200
+        res_patients.extend(res.get_json())
+        cursor = res.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert [p["id"] for p in res_patients] == [p["id"] for p in patients]
+
+
+def test_should_stream_all_patients_as_ndjson_ordered_by_created_at_descending(
+        app, client):
+    """
+    Should return status 200 and all patients, one json per line, whether stream is requested
+    """
+    with app.app_context():
+        patients = populate_patients(45)
+    patients = sorted(patients, key=lambda d: (d["created_at"], d["id"]), reverse=True)
+
+    res = client.get("/api/patients", query_string={"stream": "true"})
+
+    assert res.status_code == 200
+    assert res.mimetype == "application/x-ndjson"
+    assert "X-Next-Cursor" not in res.headers
+
+    res_patients = [json.loads(line) for line in res.get_data().splitlines()]
+    assert [p["id"] for p in res_patients] == [p["id"] for p in patients]
+
+
+def test_should_stream_n_patients_whether_accept_ndjson_and_limit(app, client):
+    """
+    Should return status 200 and n patients as ndjson whether Accept header asks ndjson
+    """
+    with app.app_context():
+        populate_patients(30)
+
+    res = client.get("/api/patients",
+                     query_string={"limit": 25},
+                     headers=Headers({"Accept": "application/x-ndjson"}))
+
+    assert res.status_code == 200
+    assert res.mimetype == "application/x-ndjson"
+    assert len(res.get_data().splitlines()) == 25
+
+
+def test_should_return_422_whether_cursor_is_invalid(client):
+    """
+    Should return status 422 whether cursor is not valid
+    """
+    res = client.get("/api/patients", query_string={"cursor": "not a cursor"})
+
+    assert res.status_code == 422
+    assert "cursor" in res.get_json()
+
+
 def test_should_return_should_return_first_n_patients_match_filter_name_ordered_by_created_at(
         app, client):
     """
@@ -350,6 +424,69 @@ def test_should_return_404_if_patient_not_exists_on_get_patient(client):
 
 #  GET  #
 
+def test_should_return_304_whether_patient_has_not_changed_since_etag(
+        app, client):
+    """
+    Should return status 304 without body while patient keeps the etag sent
+    in If-None-Match and 200 with a new etag once it is updated
+    """
+    with app.app_context():
+        patient_id = populate_patients(1)[0]["id"]
+
+    res = client.get(f"/api/patients/{patient_id}")
+    etag = res.headers["ETag"]
+
+    with assert_max_queries(app, 1):
+        res = client.get(f"/api/patients/{patient_id}",
+                         headers=Headers({"If-None-Match": etag}))
+    assert res.status_code == 304
+    assert res.data == b""
+    assert res.headers["ETag"] == etag
+
+    res = client.put(f"/api/patients/{patient_id}",
+                     json=PatientBuilder().complete().build())
+    assert res.status_code == 200
+
+    res = client.get(f"/api/patients/{patient_id}",
+                     headers=Headers({"If-None-Match": etag}))
+    assert res.status_code == 200
+    assert res.headers["ETag"] not in ("", etag)
+
+
+def test_should_return_304_whether_patients_page_has_not_changed_since_etag(
+        app, client):
+    """
+    Should return status 304 while no patient of the page changes, with the
+    same etag whether request is conditional or not
+    """
+    with app.app_context():
+        populate_patients(5)
+
+    res = client.get("/api/patients", query_string={"limit": 3})
+    etag = res.headers["ETag"]
+
+    res = client.get("/api/patients",
+                     query_string={"limit": 3},
+                     headers=Headers({"If-None-Match": '"other"'}))
+    assert res.status_code == 200
+    assert res.headers["ETag"] == etag
+
+    with assert_max_queries(app, 1):
+        res = client.get("/api/patients",
+                         query_string={"limit": 3},
+                         headers=Headers({"If-None-Match": etag}))
+    assert res.status_code == 304
+
+    with app.app_context():
+        populate_patients(1)
+
+    res = client.get("/api/patients",
+                     query_string={"limit": 3},
+                     headers=Headers({"If-None-Match": etag}))
+    assert res.status_code == 200
+    assert res.headers["ETag"] != etag
+
+
 #  PUT  #
 
 
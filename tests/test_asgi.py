@@ -0,0 +1,227 @@
+import asyncio
+import json
+from datetime import date, timedelta
+from urllib.parse import urlencode
+
+import jwt
+import pytest
+from prometheus_client import REGISTRY
+
+import conftest
+from db import set_up_db, populate_calendar, populate_appointments
+from app import create_app
+from app.asgi import AsyncAPI, async_database_uri
+from app.config import TestingConfig
+
+MONDAY = date(2024, 1, 1)
+
+TOKEN = jwt.encode({
+    "id": 1,
+    "name": "Test",
+    "username": "test",
+    "email": "test@test.com",
+    "admin": True
+}, TestingConfig.JWT_SECRET_KEY, "HS256")
+
+
+@pytest.fixture(name="asgi_app")
+def fixture_asgi_app(tmp_path):
+    """
+    Instantiate ASGI application over a sqlite file shared by both sessions
+    """
+    config = type("AsyncConfig", (TestingConfig, ), {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'api.db'}"
+    })
+    flask_app = create_app(config)
+    flask_app.test_client_class = conftest.TestClient
+    with flask_app.app_context():
+        set_up_db()
+
+    yield AsyncAPI(flask_app)
+
+
+async def _call(asgi_app, path, params, method, headers):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await asgi_app({
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": urlencode(params or {}).encode(),
+        "headers": [(k.lower().encode(), v.encode())
+                    for k, v in headers.items()],
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 5000)
+    }, receive, send)
+    await asgi_app.engine.dispose()
+
+    start = messages[0]
+    body = b"".join(m.get("body", b"") for m in messages[1:])
+    return start["status"], {
+        k.decode(): v.decode()
+        for k, v in start["headers"]
+    }, json.loads(body) if body else None
+
+
+def call(asgi_app, path, params=None, method="GET", headers=None):
+    """
+    Send a request to ASGI application
+        returns:
+            status, headers and json body of response
+    """
+    headers = {"Authorization": f"Bearer {TOKEN}", **(headers or {})}
+    return asyncio.run(_call(asgi_app, path, params, method, headers))
+
+
+def populate(asgi_app):
+    """
+    Populate a calendar with a booked monday
+    """
+    with asgi_app.app.app_context():
+        calendar = populate_calendar([0, 2], max_visits=1)
+        populate_appointments(calendar["acting_id"], calendar["patient_id"],
+                              [MONDAY, MONDAY + timedelta(days=7)])
+    return calendar
+
+
+def test_should_convert_database_uri_to_async_driver():
+    """
+    Should use asyncio drivers of mysql and sqlite
+    """
+    assert async_database_uri("mysql+pymysql://u:p@db/api") == \
+        "mysql+asyncmy://u:p@db/api"
+    assert async_database_uri("sqlite:////tmp/api.db") == \
+        "sqlite+aiosqlite:////tmp/api.db"
+
+
+@pytest.mark.parametrize("path, params", [
+    ("/api/calendar/free/days", {"start_date": "2024-01-01", "num_days": 4}),
+    ("/api/calendar/available/schedules", {"day": "2024-01-03"}),
+    ("/api/appointments", {"start_date": "2024-01-01", "limit": 1}),
+    ("/api/professionals", {}),
+])
+def test_should_respond_as_sync_api(asgi_app, path, params):
+    """
+    Should return the same body and cursor of flask routes
+    """
+    calendar = populate(asgi_app)
+    if "calendar" in path:
+        params = {"clinic_id": calendar["clinic_id"],
+                  "specialty_id": calendar["specialty_id"], **params}
+
+    expected = asgi_app.app.test_client().get(path, query_string=params)
+    status, headers, body = call(asgi_app, path, params)
+
+    assert status == expected.status_code == 200
+    assert body == expected.get_json()
+    assert headers.get("x-next-cursor") == expected.headers.get("X-Next-Cursor")
+    assert headers.get("etag") == expected.headers.get("ETag")
+
+
+def test_should_return_free_days_skipping_booked_days(asgi_app):
+    """
+    Should return status 200 and days not fully booked
+    """
+    calendar = populate(asgi_app)
+
+    status, _, body = call(asgi_app, "/api/calendar/free/days", {
+        "clinic_id": calendar["clinic_id"],
+        "specialty_id": calendar["specialty_id"],
+        "start_date": MONDAY.isoformat(),
+        "num_days": 3
+    })
+
+    assert status == 200
+    assert body == ["2024-01-03", "2024-01-10", "2024-01-15"]
+
+
+def test_should_return_422_whether_params_are_invalid(asgi_app):
+    """
+    Should return validation errors as flask routes do
+    """
+    status, _, body = call(asgi_app, "/api/calendar/free/days",
+                           {"clinic_id": "a"})
+
+    assert status == 422
+    assert set(body) == {"clinic_id", "specialty_id"}
+
+    status, _, body = call(asgi_app, "/api/appointments", {"foo": 1})
+
+    assert status == 422
+    assert body["detail"] == {"foo": "useless"}
+
+
+def test_should_return_401_without_token(asgi_app):
+    """
+    Should reject requests without a valid token
+    """
+    status, _, _ = call(asgi_app, "/api/professionals",
+                        headers={"Authorization": "Bearer invalid"})
+
+    assert status == 401
+
+
+def test_should_fall_back_to_flask_in_other_routes(asgi_app):
+    """
+    Should serve routes without async handler with flask app
+    """
+    calendar = populate(asgi_app)
+
+    status, _, body = call(asgi_app,
+                           f"/api/professionals/{calendar['professional_id']}")
+
+    assert status == 200
+    assert body["id"] == calendar["professional_id"]
+
+
+def test_should_answer_through_flask_pipeline(asgi_app):
+    """
+    Should apply CORS, Server-Timing and metrics of flask app to async
+    routes and let flask answer conditional requests
+    """
+    populate(asgi_app)
+    labels = {"method": "GET", "route": "/api/appointments", "status": "200"}
+    requests = REGISTRY.get_sample_value("http_request_duration_seconds_count", labels) or 0
+
+    status, headers, _ = call(asgi_app, "/api/appointments",
+                              headers={"Origin": "http://front.end"})
+
+    assert status == 200
+    assert headers["access-control-allow-origin"] == "http://front.end"
+    assert "ETag" in headers["access-control-expose-headers"]
+    assert headers["server-timing"].endswith('desc="1 queries"')
+    assert REGISTRY.get_sample_value("http_request_duration_seconds_count", labels) == requests + 1
+
+    status, headers, body = call(asgi_app, "/api/appointments",
+                                 headers={"If-None-Match": headers["etag"]})
+    assert status == 304
+    assert body is None
+
+
+def test_should_serve_available_schedules_from_calendar_cache(asgi_app):
+    """
+    Should cache available schedules served by async route as flask does
+    """
+    calendar = populate(asgi_app)
+    params = {"clinic_id": calendar["clinic_id"],
+              "specialty_id": calendar["specialty_id"], "day": "2024-01-03"}
+    cache = asgi_app.app.extensions["calendar_cache"]
+    hits = cache.hits
+
+    first = call(asgi_app, "/api/calendar/available/schedules", params)
+    second = call(asgi_app, "/api/calendar/available/schedules", params)
+
+    assert (first[0], first[2]) == (second[0], second[2])
+    assert cache.hits == hits + 1
+    assert second[1]["server-timing"].endswith('desc="0 queries"')
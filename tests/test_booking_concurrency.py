@@ -0,0 +1,171 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import func
+
+import conftest
+from db import populate_calendar
+from app import create_app
+from app.config import TestingConfig
+from app.models import db, session, select, Appointment
+from app.models.occupancy import ScheduleOccupancy
+
+MONDAY = date(2024, 1, 1)
+BOOKING_THREADS = 16
+
+
+@pytest.fixture(name="stress_app")
+def fixture_stress_app(tmp_path):
+    """
+    Instantiate application in a sqlite file, or in the disposable database
+    of STRESS_DATABASE_URI, so each thread books through its own connection
+    """
+    uri = os.environ.get("STRESS_DATABASE_URI") or \
+        f"sqlite:///{tmp_path / 'stress.db'}"
+    config = type("StressConfig", (TestingConfig, ),
+                  {"SQLALCHEMY_DATABASE_URI": uri})
+    flask_app = create_app(config)
+    flask_app.test_client_class = conftest.TestClient
+
+    with flask_app.app_context():
+        db.drop_all(bind_key=None)
+        db.create_all(bind_key=None)
+
+    yield flask_app
+
+    with flask_app.app_context():
+        db.drop_all(bind_key=None)
+
+
+def book_in_parallel(app,
+                     requests: list[tuple[str, dict]],
+                     method="POST") -> list[int]:
+    """
+    Send requests from many threads at once
+        returns:
+            status code of each request
+    """
+
+    def send(request):
+        path, payload = request
+        return app.test_client().open(path, method=method,
+                                      json=payload).status_code
+
+    with ThreadPoolExecutor(BOOKING_THREADS) as executor:
+        return list(executor.map(send, requests))
+
+
+def appointment(calendar, day, start_time=480) -> dict:
+    return {
+        "scheduled_day": day.isoformat(),
+        "start_time": start_time,
+        "patient_id": calendar["patient_id"],
+        "acting_id": calendar["acting_id"]
+    }
+
+
+def booked_and_created(app, calendar) -> dict[date, tuple[int, int]]:
+    """
+    Visits booked in occupancy and appointments created by day
+    """
+    with app.app_context():
+        booked = dict(
+            session.execute(
+                select(ScheduleOccupancy.scheduled_day,
+                       ScheduleOccupancy.booked)).tuples().all())
+        created = dict(
+            session.execute(
+                select(Appointment.scheduled_day,
+                       func.count(Appointment.id)).where(
+                           Appointment.acting_id == calendar["acting_id"]).
+                group_by(Appointment.scheduled_day)).tuples().all())
+
+    return {
+        day: (booked.get(day, 0), created.get(day, 0))
+        for day in booked.keys() | created.keys()
+    }
+
+
+def test_should_never_overbook_a_schedule_booked_concurrently(stress_app):
+    """
+    Should create exactly max visits of a day booked by many threads at once
+    and answer the others as fully booked
+    """
+    with stress_app.app_context():
+        calendar = populate_calendar([0], max_visits=3)
+
+    statuses = book_in_parallel(
+        stress_app,
+        [("/api/appointments", appointment(calendar, MONDAY))] * 48)
+
+    assert statuses.count(201) == 3
+    assert statuses.count(422) == 45
+    assert booked_and_created(stress_app, calendar) == {MONDAY: (3, 3)}
+
+
+def test_should_book_distinct_days_concurrently_without_rejections(
+        stress_app):
+    """
+    Should create every appointment of days with free visits booked by many
+    threads at once, alone and in bulk
+    """
+    with stress_app.app_context():
+        calendar = populate_calendar([0], max_visits=4)
+
+    days = [MONDAY + timedelta(weeks=w) for w in range(12)]
+    requests = []
+    for day in days:
+        requests += [("/api/appointments", appointment(calendar, day))] * 2
+        requests.append(("/api/appointments/bulk", {
+            "appointments": [appointment(calendar, day, 600)] * 2
+        }))
+
+    statuses = book_in_parallel(stress_app, requests)
+
+    assert statuses == [201] * len(requests)
+    assert booked_and_created(stress_app,
+                              calendar) == {day: (4, 4)
+                                            for day in days}
+
+
+def test_should_reject_bulk_whose_day_is_filled_concurrently(stress_app):
+    """
+    Should keep booked visits equal to appointments created whether bulks
+    and single bookings race for the last visits of a day
+    """
+    with stress_app.app_context():
+        calendar = populate_calendar([0], max_visits=5)
+
+    requests = [("/api/appointments/bulk", {
+        "appointments": [appointment(calendar, MONDAY)] * 2
+    }), ("/api/appointments", appointment(calendar, MONDAY))] * 8
+
+    statuses = book_in_parallel(stress_app, requests)
+
+    assert set(statuses) <= {201, 422}
+    booked, created = booked_and_created(stress_app, calendar)[MONDAY]
+    assert booked == created <= 5
+    assert created == sum(
+        (2 if path.endswith("bulk") else 1)
+        for (path, _), status in zip(requests, statuses) if status == 201)
+
+
+def test_should_release_appointment_deleted_concurrently_once(stress_app):
+    """
+    Should release visit of an appointment deleted by many threads at once
+    only by the delete that removed it
+    """
+    with stress_app.app_context():
+        calendar = populate_calendar([0], max_visits=3)
+
+    res = stress_app.test_client().post("/api/appointments",
+                                        json=appointment(calendar, MONDAY))
+    assert res.status_code == 201
+    path = f"/api/appointments/{res.get_json()['id']}"
+
+    statuses = book_in_parallel(stress_app, [(path, None)] * 16, "DELETE")
+
+    assert statuses == [204] * 16
+    assert booked_and_created(stress_app, calendar) == {MONDAY: (0, 0)}
@@ -0,0 +1,94 @@
+from db import populate_calendar
+from app.helpers.calendar_cache import CalendarCache, LocalCacheBackend, RedisCacheBackend, \
+    invalidate_actings
+from app.models import session
+
+
+class FakeRedis:
+
+    def __init__(self):
+        """
+        Redis client keeping values in a dict, as redis returns them in bytes
+        """
+        self.values = {}
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1).encode()
+        return int(self.values[key])
+
+
+def test_should_hit_entry_until_clinic_is_invalidated():
+    """
+    Should return content cached for clinic until its version is bumped
+    """
+    cache = CalendarCache(LocalCacheBackend(10))
+
+    key, content = cache.get("specialties", 1)
+    assert content is None
+    cache.set(key, b"[]")
+
+    assert cache.get("specialties", 1) == (key, b"[]")
+    assert cache.get("specialties", 2)[1] is None
+
+    cache.invalidate([2])
+    assert cache.get("specialties", 1)[1] == b"[]"
+
+    cache.invalidate([1])
+    assert cache.get("specialties", 1)[1] is None
+    assert cache.stats() == {"hits": 2, "misses": 3}
+
+
+def test_should_invalidate_all_clinics():
+    """
+    Should miss entries of every clinic after invalidating all clinics
+    """
+    cache = CalendarCache(LocalCacheBackend(10))
+    for clinic_id in (1, 2):
+        cache.set(cache.get("specialties", clinic_id)[0], b"[]")
+
+    cache.invalidate([None])
+
+    assert cache.get("specialties", 1)[1] is None
+    assert cache.get("specialties", 2)[1] is None
+
+
+def test_should_share_entries_and_versions_in_redis():
+    """
+    Should hit entries set by another worker and miss after it invalidates
+    """
+    client = FakeRedis()
+    worker, other_worker = (CalendarCache(RedisCacheBackend(client)),
+                            CalendarCache(RedisCacheBackend(client)))
+
+    key, _ = worker.get("schedules", 1, 2, "2024-01-01")
+    worker.set(key, b"[]")
+    assert other_worker.get("schedules", 1, 2, "2024-01-01")[1] == b"[]"
+
+    other_worker.invalidate([1])
+    assert worker.get("schedules", 1, 2, "2024-01-01")[1] is None
+
+
+def test_should_invalidate_only_after_commit(app):
+    """
+    Should keep entries whether transaction rolls back and drop them on commit
+    """
+    cache = app.extensions["calendar_cache"]
+    with app.app_context():
+        calendar = populate_calendar([0])
+        clinic_id = calendar["clinic_id"]
+        cache.set(cache.get("specialties", clinic_id)[0], b"[]")
+
+        invalidate_actings(calendar["acting_id"])
+        session.rollback()
+        session.commit()
+        assert cache.get("specialties", clinic_id)[1] == b"[]"
+
+        invalidate_actings(calendar["acting_id"])
+        session.commit()
+        assert cache.get("specialties", clinic_id)[1] is None
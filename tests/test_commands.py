@@ -0,0 +1,117 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.dialects import mysql
+from sqlalchemy.schema import CreateColumn
+
+from app import create_app
+from app.commands import changed_columns
+from app.config import TestingConfig
+from app.models import db, session, select, Clinic, User
+
+
+def test_should_not_touch_database_on_start_up():
+    """
+    Should create app without creating tables
+    """
+    app = create_app(TestingConfig)
+
+    with app.app_context():
+        assert inspect(db.engine).get_table_names() == []
+
+
+def test_should_create_tables_and_seed_with_cli_commands():
+    """
+    Should create tables with db init and initial data once with seed
+    """
+    app = create_app(TestingConfig)
+    runner = app.test_cli_runner()
+
+    assert "database initialized" in runner.invoke(args=["db", "init"]).output
+    assert "database seeded" in runner.invoke(args=["seed"]).output
+    assert "database seeded" in runner.invoke(args=["seed"]).output
+
+    with app.app_context():
+        assert len(session.execute(select(Clinic.id)).all()) == 1
+        assert session.execute(select(User.username)).scalars().all() == ["admin"]
+
+
+def test_should_set_up_database_on_start_up_whether_configured():
+    """
+    Should create tables and seed in create_app with legacy flag
+    """
+    app = create_app(
+        type("LegacyConfig", (TestingConfig, ), {"DB_SETUP_ON_STARTUP": True}))
+
+    with app.app_context():
+        assert session.execute(select(User.username)).scalar() == "admin"
+
+
+def test_should_recreate_indexes_made_unique_with_db_upgrade():
+    """
+    Should recreate an index of an older schema as unique on db upgrade
+    """
+    app = create_app(TestingConfig)
+    runner = app.test_cli_runner()
+    runner.invoke(args=["db", "init"])
+
+    with app.app_context(), db.engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_users_username"))
+        connection.execute(
+            text("CREATE INDEX ix_users_username ON users (username)"))
+
+    output = runner.invoke(args=["db", "upgrade"]).output
+    assert "index ix_users_username recreated on users" in output
+
+    with app.app_context():
+        indexes = {
+            ix["name"]: ix["unique"]
+            for ix in inspect(db.engine).get_indexes("users")
+        }
+    assert indexes["ix_users_username"]
+
+
+def test_should_recreate_indexes_whose_columns_changed_with_db_upgrade():
+    """
+    Should recreate an index of an older schema with the columns of the
+    sort key it now serves on db upgrade
+    """
+    app = create_app(TestingConfig)
+    runner = app.test_cli_runner()
+    runner.invoke(args=["db", "init"])
+
+    with app.app_context(), db.engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_schedules_acting_week_day"))
+        connection.execute(
+            text("CREATE INDEX ix_schedules_acting_week_day ON schedules (acting_id, week_day)"))
+
+    output = runner.invoke(args=["db", "upgrade"]).output
+    assert "index ix_schedules_acting_week_day recreated on schedules" in output
+
+    with app.app_context():
+        indexes = {
+            ix["name"]: ix["column_names"]
+            for ix in inspect(db.engine).get_indexes("schedules")
+        }
+    assert indexes["ix_schedules_acting_week_day"] == [
+        "acting_id", "week_day", "start_time", "id"
+    ]
+
+
+def test_should_find_columns_narrower_than_models_to_modify_on_db_upgrade():
+    """
+    Should find password columns of an older schema, shorter than hashes of
+    configured rounds, as modified on MySQL by db upgrade
+    """
+    app = create_app(TestingConfig)
+    app.test_cli_runner().invoke(args=["db", "init"])
+
+    with app.app_context(), db.engine.begin() as connection:
+        connection.execute(text("ALTER TABLE users DROP COLUMN password"))
+        connection.execute(
+            text("ALTER TABLE users ADD COLUMN password CHAR(87)"))
+
+        columns = changed_columns(inspect(connection), User.__table__)
+
+    assert [column.name for column in columns] == ["password"]
+    assert str(
+        CreateColumn(columns[0]).compile(
+            dialect=mysql.dialect())) == "password VARCHAR(255)"
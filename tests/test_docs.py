@@ -0,0 +1,30 @@
+from app import create_app
+from app.config import TestingConfig
+
+
+def test_should_serve_spec_built_once(app):
+    """
+    Should build spec on first request and serve same bytes next ones
+    """
+    client = app.test_client()
+
+    first = client.get("/apispec_v1.json")
+    second = client.get("/apispec_v1.json")
+
+    assert first.status_code == 200
+    assert first.mimetype == "application/json"
+    assert "/api/appointments" in first.get_json()["paths"]
+    assert "/auth/signin" in first.get_json()["paths"]
+    assert first.data == second.data
+
+
+def test_should_not_serve_docs_whether_disabled():
+    """
+    Should not register docs routes whether swagger is disabled
+    """
+    app = create_app(
+        type("NoDocsConfig", (TestingConfig, ), {"SWAGGER_ENABLED": False}))
+    client = app.test_client()
+
+    assert client.get("/apispec_v1.json").status_code == 404
+    assert client.get("/apidocs/").status_code == 404
@@ -0,0 +1,63 @@
+from datetime import date
+
+import pytest
+from sqlalchemy.dialects import mysql
+from sqlalchemy.schema import CreateColumn
+from werkzeug.datastructures import Headers
+
+from app.models import Patient
+
+from db import populate_calendar, populate_appointments
+from queries import assert_max_queries
+
+# path of each joined route by ids of calendar and its appointment, with the
+# queries loading its rows
+JOINED_ROUTES = [
+    (lambda ids: "/api/appointments", 1),
+    (lambda ids: f"/api/appointments/{ids['appointment_id']}", 1),
+    (lambda ids: "/api/actuations", 1),
+    (lambda ids: f"/api/actuations/{ids['acting_id']}", 1),
+    (lambda ids: "/api/professionals", 2),
+    (lambda ids: f"/api/professionals/{ids['professional_id']}", 2),
+]
+
+
+@pytest.mark.parametrize("path, queries", JOINED_ROUTES)
+def test_should_tag_joined_rows_loaded_as_their_conditional_request(
+        app, client, path, queries):
+    """
+    Should compute etag of unconditional requests from rows loaded, without
+    an aggregate query, equal to etag of conditional requests
+    """
+    with app.app_context():
+        calendar = populate_calendar([0])
+        appointment = populate_appointments(calendar["acting_id"],
+                                            calendar["patient_id"],
+                                            [date(2024, 1, 1)])[0]
+    path = path({**calendar, "appointment_id": appointment["id"]})
+
+    with assert_max_queries(app, queries):
+        res = client.get(path)
+    assert res.status_code == 200
+    body = res.get_json()
+    rows = body if isinstance(body, list) else [body]
+    assert not any(key.startswith("version_") for row in rows for key in row)
+    etag = res.headers["ETag"]
+
+    res = client.get(path, headers=Headers({"If-None-Match": etag}))
+    assert res.status_code == 304
+    assert res.headers["ETag"] == etag
+
+
+def test_should_keep_microseconds_of_row_versions_on_mysql():
+    """
+    Should store versions of rows with microseconds on MySQL, so rows
+    changed twice in a second get distinct etags, modifying columns of older
+    schemas on db upgrade
+    """
+    dialect = mysql.dialect()
+    column = Patient.__table__.c.updated_at
+
+    assert column.type.compile(dialect=dialect) == "DATETIME(6)"
+    assert str(CreateColumn(column).compile(
+        dialect=dialect)) == "updated_at DATETIME(6)"
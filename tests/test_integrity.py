@@ -0,0 +1,101 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from db import populate_clinics
+from factory import ProfessionalBuilder, UserBuilder
+
+from app.helpers.integrity import violated_constraint, integrity_validation
+from app.constants import ValidationMessages
+from app.models import session
+
+
+class FakeMySQLError(Exception):
+    """
+    Error of pymysql, which reports only the key of the constraint
+    """
+
+
+def mysql_error(statement: str, key: str) -> IntegrityError:
+    return IntegrityError(
+        statement, {},
+        FakeMySQLError(1062, f"Duplicate entry '31999999999' for key '{key}'"))
+
+
+@pytest.mark.parametrize(
+    "statement, key",
+    [
+        ("INSERT INTO patients (name, cpf) VALUES (%s, %s)",
+         "patients.uq_patients_cpf"),
+        ("UPDATE `patients` SET cpf=%s WHERE patients.id = %s", "cpf"),
+    ])
+def test_should_find_constraint_of_mysql_duplicate_entry(statement, key):
+    """
+    Should find constraint by its name and, on older schemas, by its column
+    """
+    assert violated_constraint(mysql_error(statement,
+                                           key)) == "uq_patients_cpf"
+
+
+def test_should_not_map_errors_other_than_unique_violations():
+    """
+    Should return none for errors not violating a known unique constraint
+    """
+    error = IntegrityError("INSERT INTO users (clinic_id) VALUES (?)", {},
+                           Exception("FOREIGN KEY constraint failed"))
+    assert integrity_validation(error) is None
+
+
+def test_should_find_constraint_of_sqlite_unique_index(app):
+    """
+    Should find unique index by columns listed by sqlite
+    """
+    with app.app_context():
+        clinic_id = populate_clinics(1)[0]["id"]
+        session.add(
+            UserBuilder(clinic_id).with_username("duplicated").build_object())
+        session.add(
+            UserBuilder(clinic_id).with_username("duplicated").build_object())
+        with pytest.raises(IntegrityError) as error:
+            session.flush()
+        session.rollback()
+
+    assert integrity_validation(error.value).errors == {
+        "username": ValidationMessages.USERNAME_REGISTERED
+    }
+
+
+def test_should_return_422_whether_professional_email_is_already_in_use(
+        app, client):
+    """
+    Should answer a duplicated email with its validation message
+    """
+    professional = ProfessionalBuilder().build()
+    with app.app_context():
+        session.add(ProfessionalBuilder().with_email(
+            professional["email"]).build_object())
+        session.commit()
+
+    res = client.post("/api/professionals", json=professional)
+
+    assert res.status_code == 422
+    assert res.get_json() == {"email": ValidationMessages.EMAIL_REGISTERED}
+
+
+def test_should_return_422_whether_user_username_is_already_in_use_on_update(
+        app, client):
+    """
+    Should answer a duplicated username on update with its validation message
+    """
+    with app.app_context():
+        clinic_id = populate_clinics(1)[0]["id"]
+        users = [UserBuilder(clinic_id).build_object() for _ in range(2)]
+        session.add_all(users)
+        session.commit()
+        user_id, username = users[0].id, users[1].username
+
+    res = client.put(f"/api/users/{user_id}", json={"username": username})
+
+    assert res.status_code == 422
+    assert res.get_json() == {
+        "username": ValidationMessages.USERNAME_REGISTERED
+    }
@@ -0,0 +1,65 @@
+import json
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from app import create_app
+from app.config import TestingConfig
+from app.json import JSON_BACKENDS, get_json_backend
+from app.models import ClinicType
+
+ROW = {
+    "id": 1,
+    "name": "Clínica",
+    "type": ClinicType.DENTISTRY,
+    "scheduled_day": date(2024, 1, 1),
+    "created_at": datetime(2024, 1, 1, 10, 30, 15, 123456),
+    "updated_at": None,
+    "start": time(8, 30),
+    "duration": timedelta(minutes=30),
+}
+
+EXPECTED = {
+    "id": 1,
+    "name": "Clínica",
+    "type": ClinicType.DENTISTRY.value,
+    "scheduled_day": "2024-01-01",
+    "created_at": "2024-01-01T10:30:15.123456",
+    "updated_at": None,
+    "start": "08:30:00",
+    "duration": "0:30:00",
+}
+
+
+@pytest.mark.parametrize("backend", JSON_BACKENDS.keys())
+def test_should_serialize_dates_times_and_enums_with_every_backend(backend):
+    """
+    Should serialize rows with same result in every backend
+    """
+    result = JSON_BACKENDS[backend].dumps([ROW], sort_keys=True)
+
+    assert json.loads(result) == [EXPECTED]
+
+
+def test_should_prefer_orjson_whether_installed():
+    """
+    Should choose orjson on auto whether it is installed
+    """
+    assert get_json_backend("auto").name == ("orjson" if "orjson" in JSON_BACKENDS else "stdlib")
+    assert get_json_backend("stdlib").name == "stdlib"
+
+
+@pytest.mark.parametrize("backend", JSON_BACKENDS.keys())
+def test_should_respond_json_with_configured_backend(backend):
+    """
+    Should respond with json serialized by configured backend
+    """
+    config = type("Config", (TestingConfig, ), {"JSON_BACKEND": backend})
+    app = create_app(config)
+
+    with app.app_context():
+        res = app.json.response([ROW])
+
+    assert app.json.backend.name == backend
+    assert res.mimetype == "application/json"
+    assert json.loads(res.get_data()) == [EXPECTED]
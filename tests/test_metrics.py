@@ -0,0 +1,108 @@
+import os
+import subprocess
+import sys
+
+from prometheus_client import REGISTRY
+
+from db import populate_patients
+from app.models import db
+
+
+def sample(name, **labels):
+    """
+    Current value of metric sample, zero whether not collected yet
+    """
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_should_collect_latency_and_sql_time_by_route_and_status(app, client):
+    """
+    Should observe latency by route and status and sql time by route
+    """
+    with app.app_context():
+        populate_patients(2)
+    labels = {"method": "GET", "route": "/api/patients", "status": "200"}
+    requests = sample("http_request_duration_seconds_count", **labels)
+    queries = sample("db_request_queries_sum", route="/api/patients")
+
+    client.get("/api/patients")
+    client.get("/api/patients")
+
+    assert sample("http_request_duration_seconds_count", **labels) == requests + 2
+    assert sample("db_request_queries_sum", route="/api/patients") == queries + 2
+    assert sample("http_requests_in_progress") == 0
+
+
+def test_should_label_not_found_paths_as_unmatched(client):
+    """
+    Should observe requests without route in a single unmatched route
+    """
+    labels = {"method": "GET", "route": "unmatched", "status": "404"}
+    requests = sample("http_request_duration_seconds_count", **labels)
+
+    client.get("/api/not/a/route/1")
+    client.get("/api/not/a/route/2")
+
+    assert sample("http_request_duration_seconds_count", **labels) == requests + 2
+
+
+def test_should_count_token_cache_hits_and_misses(app, client):
+    """
+    Should count lookups of token cache by result
+    """
+    app.extensions["token_cache"].invalidate()
+    hits = sample("jwt_cache_lookups_total", result="hit")
+    misses = sample("jwt_cache_lookups_total", result="miss")
+
+    client.get("/api/patients")
+    client.get("/api/patients")
+
+    assert sample("jwt_cache_lookups_total", result="miss") == misses + 1
+    assert sample("jwt_cache_lookups_total", result="hit") == hits + 1
+
+
+def test_should_expose_metrics_in_text_format(client):
+    """
+    Should return status 200 and metrics in prometheus text format
+    """
+    client.get("/api/patients")
+
+    res = client.get("/metrics")
+
+    assert res.status_code == 200
+    assert res.mimetype == "text/plain"
+    body = res.get_data(as_text=True)
+    for name in ("http_request_duration_seconds_bucket", "http_requests_in_progress",
+                 "db_pool_checkout_wait_seconds_count", "db_request_duration_seconds_sum",
+                 "jwt_cache_lookups_total", "json_serialization_seconds_count"):
+        assert name in body
+
+
+def test_should_time_pool_checkout_of_session_even_after_pool_is_recreated(app, client):
+    """
+    Should observe a checkout wait for the connection of a request, also
+    after engine disposes its pool
+    """
+    checkouts = sample("db_pool_checkout_wait_seconds_count")
+
+    client.get("/api/patients")
+    with app.app_context():
+        db.engine.dispose()
+    client.get("/api/patients")
+
+    assert sample("db_pool_checkout_wait_seconds_count") == checkouts + 2
+
+
+def test_should_create_multiprocess_directory_before_metrics(tmp_path):
+    """
+    Should import metrics whether multiprocess directory does not exist yet
+    """
+    directory = tmp_path / "metrics"
+    result = subprocess.run(
+        [sys.executable, "-c", "import app.middlewares.metrics"],
+        env={**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(directory)},
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True, text=True, check=False)
+
+    assert result.returncode == 0, result.stderr
+    assert directory.is_dir()
@@ -0,0 +1,126 @@
+import json
+import time
+import datetime
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt, jwt as google_jwt
+
+from factory import ProfessionalBuilder
+from app.helpers.oauth import CachedRequest
+from app.models import session
+
+CLIENT_ID = "client-id.apps.googleusercontent.com"
+KEY_ID = "local"
+
+
+class FakeResponse:
+
+    def __init__(self, data: dict, status=200, max_age=None):
+        self.status = status
+        self.headers = {
+            "Cache-Control": f"public, max-age={max_age}, must-revalidate"
+        } if max_age is not None else {}
+        self.data = json.dumps(data).encode()
+
+
+class FakeRequest:
+
+    def __init__(self, response: FakeResponse):
+        """
+        Transport answering every request with response, counting calls
+        """
+        self.response = response
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self.response
+
+
+def local_key_set():
+    """
+    Generate a RSA key and its self signed certificate as google publishes
+        returns:
+            signer of tokens and certificates by key id
+    """
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "local")])
+    now = datetime.datetime.utcnow()
+    cert = x509.CertificateBuilder().subject_name(name).issuer_name(
+        name).public_key(key.public_key()).serial_number(1).not_valid_before(
+            now).not_valid_after(now + datetime.timedelta(days=1)).sign(
+                key, hashes.SHA256())
+
+    pem_key = key.private_bytes(serialization.Encoding.PEM,
+                                serialization.PrivateFormat.PKCS8,
+                                serialization.NoEncryption())
+    signer = crypt.RSASigner.from_string(pem_key, KEY_ID)
+    certs = {KEY_ID: cert.public_bytes(serialization.Encoding.PEM).decode()}
+    return signer, certs
+
+
+def test_should_cache_response_while_max_age_allows():
+    """
+    Should fetch again only after max-age seconds
+    """
+    now = [0]
+    fake = FakeRequest(FakeResponse({}, max_age=60))
+    request = CachedRequest(fake, timer=lambda: now[0])
+
+    request("https://certs")
+    now[0] = 59
+    request("https://certs")
+    assert fake.calls == 1
+
+    now[0] = 61
+    request("https://certs")
+    assert fake.calls == 2
+
+
+def test_should_not_cache_failures_or_responses_without_max_age():
+    """
+    Should fetch every time whether response is an error or has no max-age
+    """
+    for response in (FakeResponse({}), FakeResponse({}, 500, max_age=60)):
+        fake = FakeRequest(response)
+        request = CachedRequest(fake)
+
+        request("https://certs")
+        request("https://certs")
+
+        assert fake.calls == 2
+
+
+def test_should_sign_in_with_google_fetching_certificates_once(app, client):
+    """
+    Should verify tokens of local key set fetching certificates only once
+    """
+    signer, certs = local_key_set()
+    fake = FakeRequest(FakeResponse(certs, max_age=3600))
+    app.extensions["google_request"] = CachedRequest(fake)
+    app.config["GOOGLE_OAUTH_CLIENTID"] = CLIENT_ID
+
+    with app.app_context():
+        session.add(ProfessionalBuilder().with_email(
+            "doctor@clinic.com").build_object())
+        session.commit()
+
+    now = int(time.time())
+    token = google_jwt.encode(
+        signer, {
+            "iss": "https://accounts.google.com",
+            "aud": CLIENT_ID,
+            "email": "doctor@clinic.com",
+            "iat": now,
+            "exp": now + 600
+        }).decode()
+
+    for _ in range(3):
+        res = client.post("/auth/signin/google", json={"token": token})
+        assert res.status_code == 200
+        assert "access_token" in res.get_json()
+
+    assert fake.calls == 1
@@ -0,0 +1,108 @@
+import threading
+
+import pytest
+from passlib.hash import bcrypt
+
+from factory import ProfessionalBuilder
+from app import create_app
+from app.config import TestingConfig
+from app.exceptions import APIException
+from app.helpers.passwords import PasswordHasher
+from app.models import session, select, Professional, User
+from db import set_up_db
+
+
+def test_should_hash_with_configured_rounds():
+    """
+    Should hash with rounds given and verify without rehash
+    """
+    hasher = PasswordHasher(rounds=1000)
+
+    hashed = hasher.hash("secret")
+
+    assert hashed.startswith("$pbkdf2-sha256$1000$")
+    assert hasher.verify("secret", hashed) == (True, None)
+    assert hasher.verify("wrong", hashed) == (False, None)
+
+
+def test_should_return_new_hash_whether_rounds_differ():
+    """
+    Should rehash passwords stored with fewer or more rounds
+    """
+    hasher = PasswordHasher(rounds=2000)
+
+    for rounds in (1000, 3000):
+        verified, new_hash = hasher.verify(
+            "secret", PasswordHasher(rounds=rounds).hash("secret"))
+
+        assert verified
+        assert new_hash.startswith("$pbkdf2-sha256$2000$")
+
+
+def test_should_raise_503_whether_no_thread_is_free_in_time():
+    """
+    Should stop waiting a hash after timeout with all threads busy
+    """
+    hasher = PasswordHasher(workers=1, timeout=0.05)
+    release = threading.Event()
+    hasher._executor.submit(release.wait)  # pylint: disable=protected-access
+
+    with pytest.raises(APIException) as err:
+        hasher.hash("secret")
+    release.set()
+
+    assert err.value.status_code == 503
+
+
+def test_should_rehash_password_on_signin():
+    """
+    Should sign in with password hashed with other rounds and store a hash
+    with configured rounds
+    """
+    app = create_app(type("RoundsConfig", (TestingConfig, ),
+                          {"PASSWORD_ROUNDS": 2000}))
+    with app.app_context():
+        set_up_db()
+        session.add(ProfessionalBuilder().with_username("doctor").with_password(
+            PasswordHasher(rounds=1000).hash("secret")).build_object())
+        session.commit()
+
+    res = app.test_client().post("/auth/signin",
+                                 json={
+                                     "username": "doctor",
+                                     "password": "secret"
+                                 })
+
+    assert res.status_code == 200
+    assert "access_token" in res.get_json()
+    with app.app_context():
+        assert session.execute(select(Professional.password)).scalar(
+        ).startswith("$pbkdf2-sha256$2000$")
+
+
+def test_should_reject_unknown_or_unavailable_scheme_on_start_up(monkeypatch):
+    """
+    Should raise a clear error creating hasher whether its scheme is unknown
+    or has no backend, instead of failing on first hash
+    """
+    with pytest.raises(ValueError, match="Unknown password scheme"):
+        PasswordHasher("not_a_scheme")
+
+    monkeypatch.setattr(bcrypt, "has_backend", lambda *_: False)
+    with pytest.raises(ValueError, match="no backend available"):
+        PasswordHasher("bcrypt")
+
+
+def test_should_store_and_verify_hashes_of_many_rounds():
+    """
+    Should fit hashes of rounds higher than passlib default in password
+    columns and verify them
+    """
+    hasher = PasswordHasher(rounds=600000)
+
+    hashed = hasher.hash("secret")
+
+    assert len(hashed) > 87
+    assert len(hashed) <= Professional.password.type.length
+    assert len(hashed) <= User.password.type.length
+    assert hasher.verify("secret", hashed) == (True, None)
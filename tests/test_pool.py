@@ -0,0 +1,51 @@
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from app.config import pool_options
+from app.helpers.pool import pool_stats, warm_up_pool
+
+
+def test_should_read_pool_options_from_environment(monkeypatch):
+    """
+    Should build pool options from environment with defaults
+    """
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+    monkeypatch.delenv("DB_POOL_RECYCLE", raising=False)
+
+    options = pool_options()
+
+    assert options["pool_size"] == 20
+    assert options["pool_pre_ping"] is False
+    assert options["pool_recycle"] == 1800
+
+
+def test_should_warm_up_pool_with_at_most_its_size(tmp_path):
+    """
+    Should open connections up to pool size and keep them checked in
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}",
+                           poolclass=QueuePool,
+                           pool_size=3,
+                           max_overflow=2)
+
+    assert pool_stats(engine)["checked_in"] == 0
+    assert warm_up_pool(engine, 5) == 3
+    assert pool_stats(engine) == {
+        "size": 3,
+        "checked_in": 3,
+        "checked_out": 0,
+        "overflow": 0
+    }
+
+    with engine.connect():
+        assert pool_stats(engine)["checked_out"] == 1
+
+
+def test_should_expose_pool_connections_in_metrics(client):
+    """
+    Should return pool connections by state in metrics
+    """
+    res = client.get("/metrics")
+
+    assert 'db_pool_connections{state="checked_out"}' in res.get_data(as_text=True)
@@ -0,0 +1,75 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from db import populate_patients
+from queries import assert_max_queries
+
+from app.middlewares.queries import QueryStats, fingerprint
+from app.models import session
+
+
+def test_should_fingerprint_statements_ignoring_literals_and_in_lists():
+    """
+    Should obtain same fingerprint for same statement with other parameters
+    """
+    assert fingerprint("SELECT * FROM patients WHERE id = 1 AND name = 'a'") == \
+        fingerprint("SELECT *\n FROM patients WHERE id = 20 AND name = 'b''c'")
+    assert fingerprint("SELECT id FROM t WHERE id IN (?, ?, ?)") == \
+        fingerprint("SELECT id FROM t WHERE id IN (?)")
+
+
+def test_should_report_statements_repeated_at_least_threshold_times():
+    """
+    Should count queries, duration and statements repeated
+    """
+    stats = QueryStats()
+    for i in range(3):
+        stats.record(f"SELECT name FROM patients WHERE id = {i}", 0.001)
+    stats.record("SELECT count(*) FROM clinics", 0.002)
+
+    assert stats.count == 4
+    assert round(stats.duration, 3) == 0.005
+    assert stats.repeated(3) == {"SELECT name FROM patients WHERE id = ?": 3}
+
+
+def test_should_expose_queries_of_request_in_server_timing_header(app, client):
+    """
+    Should return Server-Timing header with database time and number of queries
+    """
+    with app.app_context():
+        populate_patients(3)
+
+    with assert_max_queries(app, 1) as requests:
+        res = client.get("/api/patients")
+
+    assert res.status_code == 200
+    assert res.headers["Server-Timing"].startswith("db;dur=")
+    assert res.headers["Server-Timing"].endswith('desc="1 queries"')
+    assert requests[0][2].count == 1
+
+
+def test_should_fail_whether_request_issues_more_queries_than_allowed(
+        app, client):
+    """
+    Should raise assertion error whether request issues more queries than allowed
+    """
+    with app.app_context():
+        populate_patients(1)
+
+    with pytest.raises(AssertionError, match="GET /api/patients issued more than 0 queries"):
+        with assert_max_queries(app, 0):
+            client.get("/api/patients")
+
+
+def test_should_not_leave_start_of_failed_statement_in_connection(app):
+    """
+    Should discard start time of a statement that fails
+    """
+    with app.app_context():
+        connection = session.connection()
+        with pytest.raises(OperationalError):
+            connection.execute(text("SELECT * FROM not_a_table"))
+
+        assert connection.info.get("query_start") == {}
+        session.rollback()
@@ -0,0 +1,86 @@
+import pytest
+
+import conftest
+from factory import PatientBuilder
+from app import create_app
+from app.config import TestingConfig
+from app.models import db, session, select, Patient
+
+
+@pytest.fixture(name="replica_app")
+def fixture_replica_app(tmp_path):
+    """
+    Instantiate application with primary and read replica in two sqlite files
+    """
+    config = type(
+        "ReplicaConfig", (TestingConfig, ), {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'primary.db'}",
+            "SQLALCHEMY_BINDS": {
+                "replica": f"sqlite:///{tmp_path / 'replica.db'}"
+            }
+        })
+    flask_app = create_app(config)
+    flask_app.test_client_class = conftest.TestClient
+
+    with flask_app.app_context():
+        db.create_all(bind_key=None)
+        db.metadata.create_all(db.engines["replica"])
+
+    yield flask_app
+
+
+def add_patient(app, bind_key=None):
+    """
+    Insert a patient straight in primary or replica database
+    """
+    patient = PatientBuilder().build()
+    with app.app_context():
+        engine = db.engines[bind_key]
+        with engine.begin() as conn:
+            conn.execute(db.insert(Patient).values(**patient))
+    return patient
+
+
+def test_should_read_from_replica_in_get_requests(replica_app):
+    """
+    Should return rows of replica in GET requests
+    """
+    add_patient(replica_app)
+    replica_patient = add_patient(replica_app, "replica")
+    client = replica_app.test_client()
+
+    res = client.get("/api/patients")
+
+    assert res.status_code == 200
+    assert [p["cpf"] for p in res.get_json()] == [replica_patient["cpf"]]
+
+
+def test_should_write_and_reselect_in_primary(replica_app):
+    """
+    Should create in primary and return created row read from primary
+    """
+    client = replica_app.test_client()
+    patient = PatientBuilder().build()
+
+    res = client.post("/api/patients", json=patient)
+
+    assert res.status_code == 201
+    assert res.get_json()["cpf"] == patient["cpf"]
+
+    with replica_app.app_context():
+        assert session.execute(select(Patient.id)).first() is not None
+        replica = db.engines["replica"]
+        with replica.connect() as conn:
+            assert conn.execute(select(Patient.id)).first() is None
+
+
+def test_should_read_from_primary_after_write_in_same_request(replica_app):
+    """
+    Should read from primary what was just written whether request writes after routed to replica
+    """
+    with replica_app.test_request_context("/api/patients"):
+        replica_app.preprocess_request()
+        session.execute(db.insert(Patient).values(**PatientBuilder().build()))
+
+        assert session.execute(select(Patient.id)).first() is not None
+        session.rollback()
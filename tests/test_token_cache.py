@@ -0,0 +1,91 @@
+import time
+import datetime
+
+import jwt
+import pytest
+
+from app.helpers.auth import TokenCache
+from app.exceptions import AuthenticationException
+
+SECRET = "secret"
+
+
+def encode(expire=60, **payload):
+    """
+    Encode a token expiring in seconds
+    """
+    return jwt.encode({
+        "id": 1,
+        "exp": datetime.datetime.utcnow() + datetime.timedelta(seconds=expire),
+        **payload
+    }, SECRET, "HS256")
+
+
+def test_should_decode_token_only_on_first_use():
+    """
+    Should count miss on first decode and hit on next ones
+    """
+    cache = TokenCache(10, 300)
+    token = encode()
+
+    assert cache.decode(token, SECRET, "HS256")["id"] == 1
+    assert cache.decode(token, SECRET, "HS256")["id"] == 1
+    assert cache.decode(token, SECRET, "HS256")["id"] == 1
+
+    assert cache.stats() == {"size": 1, "maxsize": 10, "hits": 2, "misses": 1}
+
+
+def test_should_not_cache_invalid_tokens():
+    """
+    Should raise authentication exception on every use of invalid token
+    """
+    cache = TokenCache(10, 300)
+    token = encode()[:-2]
+
+    for _ in range(2):
+        with pytest.raises(AuthenticationException):
+            cache.decode(token, SECRET, "HS256")
+
+    assert cache.stats()["size"] == 0
+
+
+def test_should_expire_cached_token_with_token_exp():
+    """
+    Should decode again and raise token expired after token exp
+    """
+    cache = TokenCache(10, 300)
+    token = encode(expire=1)
+    cache.decode(token, SECRET, "HS256")
+
+    time.sleep(1.1)
+
+    with pytest.raises(AuthenticationException, match="expired"):
+        cache.decode(token, SECRET, "HS256")
+
+
+def test_should_evict_least_recently_used_and_invalidated_tokens():
+    """
+    Should keep at most maxsize tokens and remove invalidated ones
+    """
+    cache = TokenCache(2, 300)
+    tokens = [encode(id=i) for i in range(3)]
+    for token in tokens:
+        cache.decode(token, SECRET, "HS256")
+
+    assert cache.stats()["size"] == 2
+
+    cache.invalidate(tokens[2])
+    assert cache.stats()["size"] == 1
+
+    cache.invalidate()
+    assert cache.stats()["size"] == 0
+
+
+def test_should_use_token_cache_on_authenticated_routes(app, client):
+    """
+    Should hit token cache on repeated requests with same token
+    """
+    client.get("/api/specialties")
+    client.get("/api/specialties")
+
+    assert app.extensions["token_cache"].stats()["hits"] >= 1
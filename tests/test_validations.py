@@ -1,11 +1,15 @@
 import re
 from datetime import date
 from faker import Faker
+import pytest
 
-from app.validations import validate_cpf, validate_phone, validate_required, validate_date, \
-    validate_length, validate_cnpj, validate_enum, validate_email, validate_number, validate_range
+from app.validations import Validator, validation_errors, validate_payload, validate_cpf, validate_phone, \
+    validate_required, validate_date, validate_length, validate_cnpj, validate_enum, validate_email, validate_number, \
+    validate_range
 from app.constants import ValidationMessages
-from app.models import ClinicType
+from app.exceptions import ValidationException
+from app.models import ClinicType, Patient, Appointment, Schedule, Clinic, Professional, \
+    Specialty, User
 
 fake = Faker(["pt_BR"])
 
@@ -302,3 +306,102 @@ def test_validate_length_should_return_validation_message_if_number_is_not_in_en
     result = validate_enum(field, payload, ClinicType)
     assert result == ValidationMessages.NOT_IN_ENUM.format(
         value, ClinicType.__qualname__)
+
+
+SCHEMA_VALUES = [
+    None, "", " ", "a", "abcd", "42", "-7", "4.2", "x" * 300, 0, 3, 9, True,
+    date(2024, 1, 31), "2024-01-31", "2024-02-30", "2024-01-31T10:00:00",
+    "20240131", "(11) 98765-4321", "1187654321", "11987654321", "123",
+    "email@example.com", "email@@example", '"quoted"@example.com',
+    ClinicType.PEDIATRIC.value, 99
+]
+
+
+def schema_payloads(validators: dict):
+    """
+    Payloads setting each value of SCHEMA_VALUES, besides a valid cpf and
+    cnpj, to every field and to each field alone
+    """
+    yield {}
+    for value in SCHEMA_VALUES + [fake.cpf(), fake.cnpj(), fake.ssn()]:
+        yield {field: value for field in validators}
+        for field in validators:
+            yield {field: value}
+
+
+def legacy_errors(payload: dict, validators: dict, fields=None) -> dict:
+    """
+    Errors of rules of each validator called one by one, as validators did
+    before rules were bound to their fields
+    """
+    errors = {}
+    for field in fields or validators:
+        validator = validators[field]
+        if validator.nullable and payload.get(validator.field) is None:
+            continue
+        for function, args in validator.rules:
+            if result := function(validator.field, payload, *args):
+                errors[field] = result
+                break
+    return errors
+
+
+@pytest.mark.parametrize(
+    "validators",
+    [
+        Patient.validators, Appointment.validators, Schedule.validators,
+        Clinic.validators, Professional.validators,
+        Professional.validators_update, Specialty.validators, User.validators
+    ])
+def test_bound_validators_should_match_their_rules(validators):
+    """
+    Should return same errors and normalize payload as rules of each
+    validator called one by one
+    """
+    for payload in schema_payloads(validators):
+        bound_payload, legacy_payload = dict(payload), dict(payload)
+
+        try:
+            expected = legacy_errors(legacy_payload, validators)
+        except TypeError:
+            with pytest.raises(TypeError):
+                validation_errors(bound_payload, validators)
+            continue
+
+        assert validation_errors(bound_payload, validators) == expected
+        assert bound_payload == legacy_payload
+
+
+def test_validation_errors_should_validate_only_fields():
+    """
+    Should validate only fields given and fail on fields without validator
+    """
+    validators = Patient.validators
+
+    assert validation_errors({}, validators, ["phone"]) == {
+        "phone": ValidationMessages.REQUIRED_FIELD.format("phone")
+    }
+    with pytest.raises(KeyError):
+        validate_payload({}, validators, ["unknown"])
+
+
+def test_bound_validators_should_check_required_after_other_rules():
+    """
+    Should keep order of rules whether required is not the first one
+    """
+    validators = {"code": Validator("code").length(2, 4).required()}
+
+    for payload in ({"code": "a"}, {"code": "abc"}, {"code": "abcdef"}):
+        assert validation_errors(dict(payload), validators) == \
+            legacy_errors(dict(payload), validators)
+
+
+def test_validate_payload_should_raise_errors_of_bound_validators():
+    """
+    Should raise validation exception with errors by field
+    """
+    with pytest.raises(ValidationException) as error:
+        validate_payload({"name": "a"}, Specialty.validators)
+    assert error.value.errors == {
+        "description": ValidationMessages.REQUIRED_FIELD.format("description")
+    }